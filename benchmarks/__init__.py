@@ -0,0 +1,3 @@
+"""
+Benchmarks of the env loop, run with `python -m benchmarks <name> [options]`.
+"""
@@ -0,0 +1,24 @@
+"""
+python -m benchmarks {env,startup,read_plan,exchange} [options]
+"""
+import sys
+
+from benchmarks import bench_env, bench_exchange, bench_read_plan, bench_startup
+
+BENCHMARKS = {
+    "env": bench_env.main,
+    "startup": bench_startup.main,
+    "read_plan": bench_read_plan.main,
+    "exchange": bench_exchange.main,
+}
+
+
+def main() -> int:
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"usage: python -m benchmarks {{{','.join(BENCHMARKS)}}} [options]")
+        return 2
+    return BENCHMARKS[sys.argv[1]](sys.argv[2:]) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+EplusEnv benchmark: step throughput, reset latency by phase, per-callback overhead and
+RSS growth across episodes, against the fake or a real EnergyPlus backend.
+
+Reset phases are timed with calling point hooks:
+    state_creation     reset() called -> input processed (after_component_get_input)
+    sizing             input processed -> last begin_new_environment (the run period)
+    warmup             run period began -> warmup complete
+    first_observation  warmup complete -> reset() returned
+
+Each episode also reports its wall time and the size of its output directory, which
+--prune-outputs reduces by running the training variant of the IDF.
+
+    python -m benchmarks env --backend fake --out results.json --check
+    python -m benchmarks env --backend real --config my_configuration.json --episodes 2
+    python -m benchmarks env --backend real --config 5zone_configuration.json --episodes 2 --prune-outputs
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(root_dir)
+import numpy as np
+from gym_energyplus.env.eplus_env import EplusEnv
+from gym_energyplus.simulators.fake_api import FakeEnergyPlusAPI
+
+THRESHOLDS_FILE = os.path.join(current_dir, "thresholds.json")
+PHASE_POINTS = ("after_component_get_input", "begin_new_environment", "after_new_environment_warmup_complete")
+
+
+def rss_mb() -> float:
+    """
+    Current resident set size (MB), the peak one where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as stream:
+            return int(stream.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def dir_size_mb(path: Optional[str]) -> Optional[float]:
+    """
+    Total size (MB) of the files under path.
+    """
+    if not path or not os.path.isdir(path):
+        return None
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 2**20
+
+
+def make_fake_config(directory: str, n_variables: int, n_meters: int, n_actuators: int) -> str:
+    """
+    Handle configuration for the fake backend, writing episodes under directory.
+    """
+    out_path = os.path.join(directory, "out")
+    os.makedirs(out_path, exist_ok=True)
+    conf = {
+        "variables": {f"VAR_{i}": {"variable_name": "Zone Mean Air Temperature", "variable_key": f"ZONE {i}"}
+                      for i in range(n_variables)},
+        "meters": {f"METER_{i}": {"meter_name": f"Meter{i}:Electricity"} for i in range(n_meters)},
+        "internal_variables": {},
+        "actuators": {f"ACT_{i}": {"component_type": "Schedule:Compact", "control_type": "Schedule Value",
+                                   "actuator_type": f"SETPOINT {i}"} for i in range(n_actuators)},
+        "path": {"weather_file": "fake.epw", "idf_file": "fake.idf", "out_path": out_path}
+    }
+    conf_path = os.path.join(directory, "fake_configuration.json")
+    with open(conf_path, "w", encoding="utf-8") as stream:
+        json.dump(conf, stream)
+    return conf_path
+
+
+def zero_reward(obs):
+    return 0.0, {}
+
+
+class PhaseClock:
+
+    def __init__(self, env: EplusEnv) -> None:
+        """
+        Timestamps of the reset phase calling points, recorded by hooks in the simulation thread.
+        """
+        self.events: List[tuple] = []
+        for calling_point in PHASE_POINTS:
+            env.add_hook(calling_point, self._hook(calling_point))
+
+    def _hook(self, calling_point: str):
+        def record(state):
+            self.events.append((calling_point, time.perf_counter()))
+        return record
+
+    def phases(self, start: float, end: float) -> Dict[str, Optional[float]]:
+        def last(calling_point, before):
+            times = [t for point, t in self.events if point == calling_point and start <= t <= before]
+            return times[-1] if times else None
+        warmup_done = last("after_new_environment_warmup_complete", end)
+        run_period = last("begin_new_environment", warmup_done or end)
+        first_input = next((t for point, t in self.events if point == "after_component_get_input" and t >= start), None)
+        span = lambda a, b: None if a is None or b is None else b - a
+        return {
+            "state_creation": span(start, first_input),
+            "sizing": span(first_input, run_period),
+            "warmup": span(run_period, warmup_done),
+            "first_observation": span(warmup_done, end),
+            "total": end - start
+        }
+
+
+def run(env: EplusEnv, episodes: int, max_steps: Optional[int], action: Optional[List[float]]) -> Dict[str, Any]:
+    phase_clock = PhaseClock(env)
+    actuators = env.schema.slices["actuators"]
+    results: List[Dict[str, Any]] = []
+    for _ in range(episodes):
+        phase_clock.events.clear()
+        start = time.perf_counter()
+        obs, info = env.reset()
+        reset_end = time.perf_counter()
+        # hold the actuators at their current values unless an action is given
+        step_action = list(action) if action is not None else obs[actuators].tolist()
+        steps = 0
+        terminated = truncated = False
+        while not (terminated or truncated) and (max_steps is None or steps < max_steps):
+            obs, reward, terminated, truncated, info = env.step(step_action)
+            steps += 1
+        elapsed = time.perf_counter() - reset_end
+        simulator = env.energyplus_simulator
+        if terminated and simulator.energyplus_thread is not None:
+            # outputs are complete once the run returns
+            simulator.energyplus_thread.join()
+        callbacks = {
+            name[len("callback."):]: {key: section[key] for key in ("count", "mean_us", "p99_us", "max_us")}
+            for name, section in env.profiler.summary()["sections"].items() if name.startswith("callback.")
+        }
+        results.append({
+            "reset": phase_clock.phases(start, reset_end),
+            "steps": steps,
+            "step_s": elapsed,
+            "episode_s": elapsed + (reset_end - start),
+            "out_dir_mb": dir_size_mb(simulator.current_path),
+            "steps_per_s": steps / elapsed if elapsed else None,
+            "transitions": sum(env.transitions.values()),
+            "callbacks": callbacks,
+            "rss_mb": rss_mb()
+        })
+    return {"episodes": results, "summary": summarize(results)}
+
+
+def summarize(episodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Throughput and reset latency medians; RSS growth after the first episode, which
+    includes one-off allocations (imports, caches, buffers).
+    """
+    median = lambda values: float(np.median(values)) if values else None
+    rss = [episode["rss_mb"] for episode in episodes]
+    callback_means = [section["mean_us"] for episode in episodes for section in episode["callbacks"].values()]
+    return {
+        "steps_per_s": median([e["steps_per_s"] for e in episodes if e["steps_per_s"]]),
+        "reset_s": {phase: median([e["reset"][phase] for e in episodes if e["reset"][phase] is not None])
+                    for phase in episodes[0]["reset"]},
+        "callback_mean_us": max(callback_means) if callback_means else None,
+        "episode_s": median([e["episode_s"] for e in episodes]),
+        "out_dir_mb": median([e["out_dir_mb"] for e in episodes if e["out_dir_mb"] is not None]),
+        "rss_mb": rss[-1],
+        "rss_growth_mb": rss[-1] - rss[0]
+    }
+
+
+def check(summary: Dict[str, Any], thresholds: Dict[str, float]) -> List[str]:
+    """
+    Regressions of the summary against the thresholds of a backend.
+    """
+    measured = {
+        "min_steps_per_s": summary["steps_per_s"],
+        "max_reset_s": summary["reset_s"]["total"],
+        "max_callback_mean_us": summary["callback_mean_us"],
+        "max_rss_growth_mb": summary["rss_growth_mb"]
+    }
+    failures = []
+    for key, limit in thresholds.items():
+        value = measured.get(key)
+        if value is None:
+            continue
+        if (key.startswith("min_") and value < limit) or (key.startswith("max_") and value > limit):
+            failures.append(f"{key}: measured {value:.4g}, threshold {limit:.4g}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("fake", "real"), default="fake")
+    parser.add_argument("--config", help="handle configuration, required by the real backend.")
+    parser.add_argument("--episodes", type=int, default=3)
+    parser.add_argument("--max-steps", type=int, default=None, help="steps per episode, the whole run by default.")
+    parser.add_argument("--action", type=float, nargs="*", default=None)
+    parser.add_argument("--decision-interval", type=int, default=1)
+    parser.add_argument("--prune-outputs", action="store_true", help="run the training variant of the IDF.")
+    parser.add_argument("--run-days", type=int, default=30, help="fake backend run period.")
+    parser.add_argument("--timesteps-per-hour", type=int, default=4, help="fake backend zone timesteps per hour.")
+    parser.add_argument("--warmup-days", type=int, default=6, help="fake backend warmup days.")
+    parser.add_argument("--sensors", type=int, nargs=3, default=(20, 4, 4), metavar=("VARIABLES", "METERS", "ACTUATORS"),
+                        help="fake backend handles.")
+    parser.add_argument("--out", help="write the results to this json file.")
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE)
+    parser.add_argument("--check", action="store_true", help="exit with 1 if a threshold is not met.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        api = None
+        if args.backend == "fake":
+            api = FakeEnergyPlusAPI(run_days=args.run_days, timesteps_per_hour=args.timesteps_per_hour,
+                                    warmup_days=args.warmup_days)
+            config = make_fake_config(tmp_dir, *args.sensors)
+        elif args.config is None:
+            parser.error("--config is required by the real backend.")
+        else:
+            config = args.config
+        # profiling adds two clock reads per callback, included in the throughput
+        env = EplusEnv(config, zero_reward, simulator_name="bench", decision_interval=args.decision_interval,
+                       profile=True, copy=False, api=api, prune_outputs=args.prune_outputs)
+        try:
+            results = run(env, args.episodes, args.max_steps, args.action)
+        finally:
+            env.close()
+
+    with open(args.thresholds, encoding="utf-8") as stream:
+        thresholds = json.load(stream).get(args.backend, {})
+    failures = check(results["summary"], thresholds)
+    results.update({
+        "backend": args.backend,
+        "config": vars(args),
+        "platform": {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()},
+        "thresholds": thresholds,
+        "regressions": failures
+    })
+
+    summary = results["summary"]
+    print(f"backend: {args.backend}, episodes: {args.episodes}")
+    print(f"steps/s            {summary['steps_per_s']:12.1f}")
+    for phase, value in summary["reset_s"].items():
+        print(f"reset {phase:18s} {value * 1e3 if value is not None else float('nan'):9.3f} ms")
+    print(f"max callback mean  {summary['callback_mean_us'] or float('nan'):12.2f} us")
+    print(f"episode            {summary['episode_s']:12.3f} s")
+    print(f"output dir         {summary['out_dir_mb'] or float('nan'):12.3f} MB")
+    print(f"rss                {summary['rss_mb']:12.1f} MB (+{summary['rss_growth_mb']:.1f} MB)")
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as stream:
+            json.dump(results, stream, indent=2)
+    return 1 if args.check and failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
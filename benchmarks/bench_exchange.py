@@ -0,0 +1,82 @@
+"""
+Round-trip latency per step between the agent and a stand-in simulator thread: the
+former obs/info/act Queue trio against the StepMailbox.
+
+The stand-in thread runs the same protocol as the EnergyPlus callbacks: at each
+timestep it picks up a pending action without blocking, then publishes one
+observation and its info.
+
+    python benchmarks/bench_exchange.py --steps 20000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from queue import Queue
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(root_dir)
+from gym_energyplus.simulators.exchange import StepMailbox
+
+
+def run_queues(n_steps:int) -> float:
+    obs_queue = Queue(maxsize=1)
+    info_queue = Queue(maxsize=1)
+    act_queue = Queue(maxsize=1)
+
+    def simulator():
+        for timestep in range(n_steps + 1):
+            if not act_queue.empty():
+                act_queue.get()
+            obs_queue.put(timestep)
+            info_queue.put({"timestep": timestep})
+
+    thread = threading.Thread(target=simulator, daemon=True)
+    thread.start()
+    obs_queue.get()
+    info_queue.get()
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        act_queue.put(0.0, timeout=2)
+        obs_queue.get(timeout=2)
+        info_queue.get(timeout=2)
+    elapsed = time.perf_counter() - start
+    thread.join()
+    return elapsed
+
+
+def run_mailbox(n_steps:int) -> float:
+    mailbox = StepMailbox()
+
+    def simulator():
+        for timestep in range(n_steps + 1):
+            mailbox.take_action()
+            mailbox.publish(timestep, {"timestep": timestep})
+        mailbox.finish()
+
+    thread = threading.Thread(target=simulator, daemon=True)
+    thread.start()
+    mailbox.get()
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        mailbox.step(0.0, timeout=2)
+    elapsed = time.perf_counter() - start
+    thread.join()
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"steps per run: {args.steps}")
+    for label, func in [("queue trio", run_queues), ("step mailbox", run_mailbox)]:
+        best = min(func(args.steps) for _ in range(args.repeat)) / args.steps
+        print(f"{label:16s} {best * 1e6:9.2f} us/step")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+EplusEnv construction time per worker: every measurement runs in a fresh process, as
+a worker starts, and reports the package import time and the EplusEnv construction
+time, with the eppy model deferred (default) or loaded at construction (eager).
+
+    python -m benchmarks startup --repeat 5
+    python -m benchmarks startup --idf model.idf --idd Energy+.idd --out startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(root_dir)
+import numpy as np
+
+MODES = ("lazy", "eager")
+
+
+def child(mode: str, config: str, idd: Optional[str]) -> Dict[str, float]:
+    start = time.perf_counter()
+    from gym_energyplus.env.eplus_env import EplusEnv
+    from gym_energyplus.simulators.fake_api import FakeEnergyPlusAPI
+    imported = time.perf_counter()
+    env = EplusEnv(config, lambda obs: (0.0, {}), simulator_name="startup", api=FakeEnergyPlusAPI())
+    if mode == "eager":
+        if idd is not None:
+            env.generator.idd_file = idd
+        if os.path.exists(env.generator.idf_file):
+            env.generator.load_idf()
+        else:
+            # what Generator.__init__ used to do without a model: import eppy and set the IDD
+            from eppy.modeleditor import IDF
+            IDF.setiddname(env.generator.idd_file)
+            IDF()
+    constructed = time.perf_counter()
+    env.close()
+    return {"import_s": imported - start, "construct_s": constructed - imported, "total_s": constructed - start}
+
+
+def measure(mode: str, config: str, idd: Optional[str], repeat: int) -> Dict[str, float]:
+    runs: List[Dict[str, float]] = []
+    for _ in range(repeat):
+        command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--config", config]
+        if idd is not None:
+            command += ["--idd", idd]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: float(np.median([run[key] for run in runs])) for key in runs[0]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--idf", help="model loaded by the eager mode, none by default.")
+    parser.add_argument("--idd", help="IDD of the model, $ENERGYPLUS_DIR/Energy+.idd by default.")
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--out", help="write the results to this json file.")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(child(args.child, args.config, args.idd)))
+        return 0
+
+    from benchmarks.bench_env import make_fake_config
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = make_fake_config(tmp_dir, 20, 4, 4)
+        if args.idf:
+            with open(config, encoding="utf-8") as stream:
+                conf = json.load(stream)
+            conf["path"]["idf_file"] = os.path.abspath(args.idf)
+            with open(config, "w", encoding="utf-8") as stream:
+                json.dump(conf, stream)
+        results = {mode: measure(mode, config, args.idd, args.repeat) for mode in MODES}
+    results["saved_per_worker_s"] = results["eager"]["total_s"] - results["lazy"]["total_s"]
+
+    print(f"fresh processes per mode: {args.repeat}")
+    for mode in MODES:
+        timing = results[mode]
+        print(f"{mode:6s} import {timing['import_s'] * 1e3:8.1f} ms  construct {timing['construct_s'] * 1e3:8.1f} ms"
+              f"  total {timing['total_s'] * 1e3:8.1f} ms")
+    print(f"saved per worker {results['saved_per_worker_s'] * 1e3:8.1f} ms")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as stream:
+            json.dump(results, stream, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
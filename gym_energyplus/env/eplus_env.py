@@ -1,13 +1,18 @@
 """
 Gymnasium environment for simulation with energyplus
 """
+import time
 import numpy as np
-from queue import Empty, Full, Queue
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from ..generator.generator import Generator
+from ..simulators.exchange import SimulationStatus, StepMailbox
 from ..simulators.gym_energyplus import GymEnergyPlus
+from ..simulators.handle_cache import HandleCache
+from ..simulators.read_plan import ObservationView
+from .observation_schema import ObservationSchema
 from ..util.logger import Logger
+from ..util.profiler import CallbackProfiler
 from ..util.constant import LOG_LEVEL_GYM_ENV
 
 class EplusEnv:
@@ -16,14 +21,51 @@ class EplusEnv:
 
     def __init__(self,
         configure_path: str,
-        reward_func,        
+        reward_func,
+        simulator_name: str = "eplus",
+        handle_cache: bool = False,
+        decision_interval: int = 1,
+        reductions: Optional[Dict[str, str]] = None,
+        prefetch: bool = False,
+        prefetch_at: float = 90.0,
+        profile: bool = False,
+        copy: bool = True,
+        api=None,
+        prune_outputs: bool = False,
         ) -> None:
+        """
+        Args:
+            configure_path (str): handle and path configuration file.
+            reward_func: callable taking the observation mapping, returning (reward, reward terms).
+            simulator_name (str): name of the simulator, prefix of the episode output dirs.
+            handle_cache (bool): reuse resolved api handles across episodes and processes
+                through the on-disk HandleCache. Defaults to False.
+            decision_interval (int): zone timesteps per step, the action is held and the
+                observations are reduced over them. Defaults to 1.
+            reductions (Dict[str, str], optional): per-observation reduction rule, "mean",
+                "sum" or "last", see GymEnergyPlus.
+            prefetch (bool): start the next episode's simulation while the current one is in
+                its last steps, so that reset() finds its first observation ready. Runs two
+                EnergyPlus states in the process for a while. Defaults to False.
+            prefetch_at (float): simulation progress (%) at which the next episode starts.
+            profile (bool): time simulator callbacks and mailbox waits per episode, read through
+                `profiler.summary()` or `profiler.dump_json(path)`. Defaults to False.
+            copy (bool): return a new observation array from reset() and step(). With False the
+                env returns its own float32 buffer, overwritten by the next call, for consumers
+                that copy it into their own replay buffer. Defaults to True.
+            api (optional): EnergyPlus api object shared by the simulators, e.g. a
+                FakeEnergyPlusAPI to run without EnergyPlus. Defaults to pyenergyplus.
+            prune_outputs (bool): run a cached training variant of the IDF without the output
+                files training never reads (tables, SQLite, ESO, ...), see
+                Generator.run_idf_file. Defaults to False.
+        """
         # env info
         self.env_name = "eplus-env-v1"
         # conf
         self.conf_path = configure_path
         self.generator = Generator()
         self.generator.load_by_data(self.conf_path)
+        self.generator.prune_outputs = prune_outputs
 
         # variables
         self.variables = self.generator.variables
@@ -33,80 +75,144 @@ class EplusEnv:
         # actuator
         self.actuators = self.generator.actuators
 
-        # observation
-        self.observation_variables = list(self.variables.keys()) \
-            + list(self.meters.keys()) \
-            + list(self.internal_variables.keys())
-        
         # action
         self.action_variables = list(self.actuators.keys())
 
+        # fixed observation layout: variables, meters, internal variables, then actuator values
+        self.schema = ObservationSchema.from_generator(self.generator)
+        # observation names in buffer order, as observation_names
+        self.observation_variables = list(self.schema.names)
+        self.observation_index = self.schema.index
+        try:
+            self.observation_space = self.schema.observation_space()
+            self.action_space = self.schema.action_space()
+        except ImportError:
+            self.observation_space = self.action_space = None
+        self.copy = copy
+        self._obs_buffer = np.zeros(self.schema.size, dtype=np.float32)
+
+        # resolve the reward variables to observation columns once
+        if hasattr(reward_func, "compile"):
+            reward_func.compile(self.schema.index)
+
         # simulation info
         self.timestep = 0
         self.episode = 0
 
-        # queues for comunicating with eplus
-        self.obs_queue = Queue(maxsize=1)
-        self.info_queue = Queue(maxsize=1)
-        self.act_queue = Queue(maxsize=1)
+        # mailbox for comunicating with eplus
+        self.mailbox = StepMailbox()
 
         # last obs, action and info
-        self.last_obs: Optional[Dict[str, float]] = None
+        self.last_obs: Optional[np.ndarray] = None
         self.last_info: Optional[Dict[str, Any]] = None
         self.last_action: Optional[Dict[float]] = None
 
         # reward function
         self.reward_func = reward_func
 
-        self.energyplus_simulator = GymEnergyPlus(
+        # simulator settings
+        self.simulator_name = simulator_name
+        self.handle_cache = HandleCache() if handle_cache else None
+        self.decision_interval = decision_interval
+        self.reductions = reductions
+        self.profiler = CallbackProfiler(enabled=profile)
+        self.api = api
+        self._hooks: List[Tuple[str, Any]] = []
+
+        self.energyplus_simulator = self._make_simulator(self.mailbox)
+
+        # prefetch: simulator started ahead for the next episode, and a finished one to reuse
+        self.prefetch = prefetch
+        self.prefetch_at = prefetch_at
+        self._standby: Optional[GymEnergyPlus] = None
+        self._spare: Optional[GymEnergyPlus] = None
+
+        # stats
+        self.stats: Dict[str, Any] = {
+            "reset_latency": [],
+            "prefetched_resets": 0
+        }
+
+    def _make_simulator(self, mailbox: StepMailbox, profiler: Optional[CallbackProfiler] = None) -> GymEnergyPlus:
+        simulator = GymEnergyPlus(
             self.logger,
             self.generator,
-            self.obs_queue,
-            self.info_queue,
-            self.act_queue
+            mailbox,
+            self.simulator_name,
+            self.handle_cache,
+            self.decision_interval,
+            self.reductions,
+            profiler or self.profiler,
+            self.api
         )
+        for calling_point, hook in self._hooks:
+            simulator.add_hook(calling_point, hook)
+        return simulator
+
+    def add_hook(self, calling_point: str, hook) -> None:
+        """
+        Run a user hook at an EnergyPlus calling point, from the next episode on.
+        See GymEnergyPlus.add_hook.
+        """
+        self._hooks.append((calling_point, hook))
+        self.energyplus_simulator.add_hook(calling_point, hook)
+        if self._standby is not None:
+            self._standby.add_hook(calling_point, hook)
 
     def reset(self):
         """
         reset the environment.
         """
+        reset_start = time.perf_counter()
         self.episode += 1
         self.timestep = 0
+        self.profiler.start_episode()
 
         # ------------preparation for new episode --------------
         print("#-----------------------------------------------#")
         self.logger.info(f"start a new episode... [{self.env_name}][episode {self.episode}]")
-        self.energyplus_simulator.reset()
-        self.logger.debug(f"out path: {self.energyplus_simulator.generator.current_path}")
-        # start the simulator
-        self.energyplus_simulator.run()
-        self.logger.debug(f"episode {self.episode} started.")
+        prefetched = self._standby is not None
+        if prefetched:
+            # the next episode is already running, parked at its first observation
+            self._swap_standby()
+            self.logger.debug(f"episode {self.episode} prefetched.")
+        else:
+            self.energyplus_simulator.reset(episode=self.episode if self.prefetch else None)
+            # start the simulator
+            self.energyplus_simulator.run()
+            self.logger.debug(f"episode {self.episode} started.")
+        self.logger.debug(f"out path: {self.energyplus_simulator.current_path}")
 
         # wait for simulator warmup complete
         if not self.energyplus_simulator.system_ready:
             self.logger.debug("waiting for finish warmup process.")
-            # self.energyplus_simulator.warmup_queue.get()
+            # self.energyplus_simulator.warmup_event.wait()
             self.logger.debug("warmup process finished.")
 
         # wait for receive simulation first observation and info
-        try:
-            obs = self.obs_queue.get()
-        except Empty:
-            self.logger.warning("Reset: Observation queue empty.")
-        
-        try:
-            info = self.info_queue.get()
-        except Empty:
-            self.logger.warning("Reset: info queue empty.")
+        wait_start = time.perf_counter_ns()
+        received = self.mailbox.get()
+        if self.profiler.enabled:
+            self.profiler.record("env.reset.wait", time.perf_counter_ns() - wait_start)
+        if received is None:
+            self.logger.critical(f"Reset: no observation received, simulation {self.mailbox.status.value}.")
+            raise RuntimeError(f"EnergyPlus simulation {self.mailbox.status.value} before the first observation.")
+        obs, info = received
+        if self.energyplus_simulator.observation_names != self.schema.names:
+            raise RuntimeError("simulator observation layout does not match the env observation schema.")
 
         info.update({"timestep": self.timestep})
         self.last_obs = obs
         self.last_info = info
 
-        self.logger.debug(f"Reset: observation received: {obs}")
-        self.logger.debug(f"Reset: info received: {info}")
+        self.stats["reset_latency"].append(time.perf_counter() - reset_start)
+        if prefetched:
+            self.stats["prefetched_resets"] += 1
 
-        return np.array(list(obs.values()), dtype=np.float32), info
+        self.logger.debug("Reset: observation received: %s", obs)
+        self.logger.debug("Reset: info received: %s", info)
+
+        return self._emit(obs), info
 
     def step(self, action):
         # timestep + 1 and flags initialization
@@ -123,26 +229,37 @@ class EplusEnv:
             # self.logger.critical(f"energyplus failed with exit code {self.energyplus_simulator.sim_results["exit_code"]}")
             raise err
         
-        if self.energyplus_simulator.simulation_complete:
-            self.logger.debug(
-                'trying step in a completed simulator, changing truncated flag to true')
-            terminated = True
-            obs = self.last_obs
-            info = self.last_info
+        # a completed simulation may still hold its last observation in the mailbox, which
+        # returns it before reporting the end
+        time_out = 2
+        if self.profiler.enabled:
+            wait_start = time.perf_counter_ns()
+            received = self.mailbox.step(action, timeout=time_out)
+            self.profiler.record("env.step.wait", time.perf_counter_ns() - wait_start)
         else:
-            time_out = 2
-            try:
-                self.act_queue.put(action, timeout=time_out)
-                self.last_obs = obs = self.obs_queue.get(timeout=time_out)
-                self.last_info = info = self.info_queue.get(timeout=time_out)
-            except (Full, Empty):
+            received = self.mailbox.step(action, timeout=time_out)
+        if received is not None:
+            self.last_obs, self.last_info = obs, info = received
+        else:
+            if self.mailbox.status is SimulationStatus.FAILED:
+                raise RuntimeError(
+                    f"energyplus failed with exit code {self.energyplus_simulator.sim_results.get('exit_code')}")
+            if self.mailbox.status is SimulationStatus.FINISHED:
+                self.logger.debug("simulation completed, changing terminated flag to true")
+                terminated = True
+            else:
                 self.logger.debug(
-                    "step queue not receive value, simualtion must be compeleted. Change truncated flag to True")
+                    "step mailbox not receive value, simualtion must be compeleted. Change truncated flag to True")
                 truncated = True
-                obs = self.last_obs
-                info = self.last_info
+            obs = self.last_obs
+            info = self.last_info
+        # start the next episode ahead
+        if self.prefetch and self._standby is None and (
+            terminated or truncated or self.energyplus_simulator.progress >= self.prefetch_at):
+            self._launch_standby()
+
         # Calculate reward
-        reward, rw_terms = self.reward_func(obs)
+        reward, rw_terms = self.reward_func(ObservationView(self.schema.index, obs, info.get("clock")))
 
         # update info
         info.update({"action": action})
@@ -150,13 +267,61 @@ class EplusEnv:
         info.update(rw_terms)
 
         # debug
-        self.logger.debug(f"step observation: {obs}")
-        self.logger.debug(f"step reward: {reward}")
-        self.logger.debug(f"step terminated: {terminated}")
-        self.logger.debug(f"step info: {info}")
+        self.logger.debug("step observation: %s", obs)
+        self.logger.debug("step reward: %s", reward)
+        self.logger.debug("step terminated: %s", terminated)
+        self.logger.debug("step info: %s", info)
+
+        return self._emit(obs), reward, terminated, truncated, info
 
-        return np.array(list(obs.values()), dtype=np.float32), reward, terminated, truncated, info
+    def _emit(self, obs: np.ndarray) -> np.ndarray:
+        """
+        Cast the simulator observation into the reusable float32 buffer.
+        """
+        np.copyto(self._obs_buffer, obs, casting="same_kind")
+        return self._obs_buffer.copy() if self.copy else self._obs_buffer
     
+    def _launch_standby(self) -> None:
+        """
+        Start the simulation of the next episode, reusing a finished simulator if any.
+        The standby records into its own profiler until it becomes the current simulator,
+        so that its warmup is not counted in the current episode.
+        """
+        profiler = CallbackProfiler(enabled=self.profiler.enabled)
+        if self._spare is not None and not self._spare.is_running:
+            standby, self._spare = self._spare, None
+            standby.profiler = profiler
+        else:
+            standby = self._make_simulator(StepMailbox(), profiler)
+        standby.reset(episode=self.episode + 1)
+        standby.run()
+        self._standby = standby
+        self.logger.debug(f"episode {self.episode + 1} prefetch started.")
+
+    def _swap_standby(self) -> None:
+        """
+        Make the prefetched simulator the current one.
+        """
+        previous = self.energyplus_simulator
+        if previous.is_running:
+            # the standby state is running, keep its callbacks
+            previous.stop(clear_callbacks=False)
+        self._spare = previous
+        # the standby's records so far belong to the episode starting now
+        self.profiler.merge(self._standby.profiler)
+        self.energyplus_simulator = self._standby
+        self.mailbox = self._standby.mailbox
+        self._standby = None
+
+    def close(self) -> None:
+        """
+        Stop the running simulation, if any.
+        """
+        if self._standby is not None:
+            self._standby.stop(clear_callbacks=False)
+            self._standby = None
+        self.energyplus_simulator.stop()
+
     def render(self, model:str = 'human') -> None:
         """
         Environemt rendering.
@@ -183,6 +348,24 @@ class EplusEnv:
     def internal_var_handlers(self) -> Optional[str]:
         return self.energyplus_simulator.internal_var_handlers
 
+    @property
+    def clock(self):
+        """
+        Clock snapshot of the last observation.
+        """
+        return None if self.last_info is None else self.last_info.get("clock")
+
+    @property
+    def transitions(self) -> Dict[str, int]:
+        """
+        Python transitions made by EnergyPlus in the current episode, by calling point.
+        """
+        return self.energyplus_simulator.transitions
+
+    @property
+    def observation_names(self) -> Tuple[str, ...]:
+        return self.schema.names
+
     @property
     def is_running(self) -> bool:
         return self.energyplus_simulator.is_running
@@ -0,0 +1,100 @@
+"""
+Fixed observation layout of an EplusEnv, computed once from its Generator.
+"""
+import numpy as np
+from typing import Any, Dict, List, Tuple
+
+from ..generator.generator import Generator
+
+try:
+    from gymnasium import spaces
+except ImportError:
+    spaces = None
+
+# observation groups, in buffer order (the order GymEnergyPlus reads them)
+OBSERVATION_GROUPS = ("variables", "meters", "internal_variables", "actuators")
+
+
+class ObservationSchema:
+
+    def __init__(self, groups: Dict[str, List[str]], action_names: List[str]) -> None:
+        """
+        Observation layout: names in buffer order, name -> index map and the slice of each
+        group (variables, meters, internal variables and actuator values). Groups other
+        than OBSERVATION_GROUPS, added by wrappers (e.g. "forecast"), follow them in the
+        order given.
+        Args:
+            groups (Dict[str, List[str]]): observation names by group.
+            action_names (List[str]): actuator names, in action order.
+        """
+        names: List[str] = []
+        self.slices: Dict[str, slice] = {}
+        extra_groups = [group for group in groups if group not in OBSERVATION_GROUPS]
+        for group in OBSERVATION_GROUPS + tuple(extra_groups):
+            start = len(names)
+            names.extend(groups.get(group, []))
+            self.slices[group] = slice(start, len(names))
+        self.names: Tuple[str, ...] = tuple(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.action_names: Tuple[str, ...] = tuple(action_names)
+
+    @classmethod
+    def from_generator(cls, generator: Generator) -> "ObservationSchema":
+        return cls(
+            {
+                "variables": list(generator.variables.keys()),
+                "meters": list(generator.meters.keys()),
+                "internal_variables": list(generator.internal_variables.keys()),
+                "actuators": list(generator.actuators.keys())
+            },
+            list(generator.actuators.keys())
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.names)
+
+    @property
+    def action_size(self) -> int:
+        return len(self.action_names)
+
+    def indices(self, names: List[str]) -> np.ndarray:
+        """
+        Buffer indices of the given observation names.
+        """
+        return np.array([self.index[name] for name in names], dtype=np.intp)
+
+    def as_dict(self, obs: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Split a flat observation into per-group views, matching `dict_space`.
+        """
+        return {group: obs[group_slice] for group, group_slice in self.slices.items()}
+
+    def observation_space(self, dtype: Any = np.float32) -> "spaces.Box":
+        """
+        Flat gymnasium Box of the observation buffer.
+        """
+        self._check_gymnasium()
+        return spaces.Box(low=-np.inf, high=np.inf, shape=(self.size,), dtype=dtype)
+
+    def dict_space(self, dtype: Any = np.float32) -> "spaces.Dict":
+        """
+        gymnasium Dict space with one Box per observation group.
+        """
+        self._check_gymnasium()
+        return spaces.Dict({
+            group: spaces.Box(low=-np.inf, high=np.inf, shape=(group_slice.stop - group_slice.start,), dtype=dtype)
+            for group, group_slice in self.slices.items()
+        })
+
+    def action_space(self, dtype: Any = np.float32) -> "spaces.Box":
+        """
+        gymnasium Box of the actuator values. Actuators carry no bounds in the configuration.
+        """
+        self._check_gymnasium()
+        return spaces.Box(low=-np.inf, high=np.inf, shape=(self.action_size,), dtype=dtype)
+
+    @staticmethod
+    def _check_gymnasium() -> None:
+        if spaces is None:
+            raise ImportError("gymnasium is required for observation and action spaces.")
@@ -0,0 +1,227 @@
+"""
+Replay of recorded EplusEnv episodes through memory-mapped columns, without EnergyPlus.
+"""
+import json
+import os
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+from ..util.logger import Logger
+from ..util.constant import LOG_LEVEL_GYM_ENV
+from ..wrappers.recorder import CLOCK_COLUMNS, SCHEMA_FILE, iter_chunks, read_schema
+from .observation_schema import ObservationSchema
+
+REPLAY_DIR = "replay"
+EPISODES_FILE = "episodes.npy"
+
+
+def compact_recording(recording_dir: str, out_dir: Optional[str] = None) -> str:
+    """
+    Convert a TrajectoryRecorder recording into one .npy file per column and an episode
+    index, so that it can be memory-mapped. Chunks are streamed, the recording is never
+    held in memory as a whole.
+    Args:
+        recording_dir (str): recorder out_dir.
+        out_dir (str, optional): output directory. Defaults to <recording_dir>/replay.
+    Returns:
+        str: out_dir.
+    """
+    out_dir = out_dir or os.path.join(recording_dir, REPLAY_DIR)
+    schema = read_schema(recording_dir)
+    # first pass: shapes and dtypes, reading the columns only
+    layout: Dict[str, Tuple[Tuple[int, ...], np.dtype]] = {}
+    n_rows = 0
+    for chunk in iter_chunks(recording_dir, schema):
+        n_rows += len(chunk["reward"])
+        for key, array in chunk.items():
+            layout[key] = (array.shape[1:], array.dtype)
+    if not n_rows:
+        raise ValueError(f"recording {recording_dir} has no rows.")
+
+    os.makedirs(out_dir, exist_ok=True)
+    columns = {
+        key: np.lib.format.open_memmap(os.path.join(out_dir, f"{key}.npy"), mode="w+",
+                                       dtype=dtype, shape=(n_rows,) + shape)
+        for key, (shape, dtype) in layout.items()
+    }
+    row = 0
+    for chunk in iter_chunks(recording_dir, schema):
+        n = len(chunk["reward"])
+        for key, array in chunk.items():
+            columns[key][row:row + n] = array
+        row += n
+    episode = np.asarray(columns["episode"])
+    starts = np.flatnonzero(np.diff(episode, prepend=episode[0] - 1))
+    stops = np.append(starts[1:], n_rows)
+    np.save(os.path.join(out_dir, EPISODES_FILE), np.column_stack([starts, stops]).astype(np.int64))
+    for array in columns.values():
+        array.flush()
+    del columns
+
+    schema["rows"] = n_rows
+    with open(os.path.join(out_dir, SCHEMA_FILE), "w", encoding="utf-8") as stream:
+        json.dump(schema, stream, indent=2)
+    return out_dir
+
+
+class ReplayEplusEnv:
+
+    logger = Logger().getLogger("replay_eplus_env", LOG_LEVEL_GYM_ENV)
+
+    MODES = ("open_loop", "match")
+
+    def __init__(self,
+        path: str,
+        reward_func=None,
+        mode: str = "open_loop",
+        copy: bool = True,
+        full_info: bool = False,
+        ) -> None:
+        """
+        Serve recorded episodes with the reset/step signature of EplusEnv.
+
+        "open_loop" replays each episode as recorded, whatever the action. "match" picks,
+        at each step, the recorded episode whose action at that timestep is the closest to
+        the given one (squared distance), and continues from it.
+        Args:
+            path (str): compacted recording (see compact_recording) or recorder out_dir,
+                compacted into <path>/replay on first use.
+            reward_func (optional): reward with a `batch` method, used to relabel the
+                recorded rewards once at load time. Defaults to the recorded rewards.
+            mode (str): "open_loop" or "match". Defaults to "open_loop".
+            copy (bool): return a copy of the observation row instead of a read-only view
+                of the mapped file. Defaults to True.
+            full_info (bool): add the clock fields and the recorded info entries to info,
+                at some cost per step. Defaults to False.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"unknown replay mode {mode}, expected one of {self.MODES}.")
+        if not os.path.exists(os.path.join(path, "obs.npy")):
+            replay_dir = os.path.join(path, REPLAY_DIR)
+            if not os.path.exists(os.path.join(replay_dir, "obs.npy")):
+                self.logger.info(f"compacting recording {path}.")
+                compact_recording(path, replay_dir)
+            path = replay_dir
+        self.env_name = "eplus-replay-v1"
+        self.path = path
+        self.mode = mode
+        self.copy = copy
+        self.full_info = full_info
+
+        self.recording_schema = read_schema(path)
+        groups = {
+            group: self.recording_schema["obs"][start:stop]
+            for group, (start, stop) in self.recording_schema.get(
+                "obs_groups", {"variables": [0, len(self.recording_schema["obs"])]}).items()
+        }
+        self.schema = ObservationSchema(groups, self.recording_schema["action"])
+        try:
+            self.observation_space = self.schema.observation_space()
+            self.action_space = self.schema.action_space()
+        except ImportError:
+            self.observation_space = self.action_space = None
+
+        # plain ndarray views of the mapped files, cheaper to index than np.memmap
+        self.columns: Dict[str, np.ndarray] = {
+            key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r").view(np.ndarray)
+            for key in ("obs", "action", "reward", "terminated", "truncated", "timestep", "clock", "info")
+        }
+        self._obs = self.columns["obs"]
+        self._terminated = self.columns["terminated"]
+        self._truncated = self.columns["truncated"]
+        self.episodes: np.ndarray = np.load(os.path.join(path, EPISODES_FILE))
+        self.rewards = self.columns["reward"]
+        if reward_func is not None:
+            self.rewards = self._relabel(reward_func)
+
+        if mode == "match":
+            self._build_match_index()
+
+        # simulation info
+        self.timestep = 0
+        self.episode = -1
+        self.current = 0
+        self._row = 0
+        self._stop = 0
+        self._rng = np.random.default_rng()
+
+    def _relabel(self, reward_func) -> np.ndarray:
+        clock = self.columns["clock"]
+        rewards, _ = reward_func.batch(
+            self._obs, self.schema.names,
+            month=clock[:, CLOCK_COLUMNS.index("month")],
+            day=clock[:, CLOCK_COLUMNS.index("day")],
+            hour=clock[:, CLOCK_COLUMNS.index("hour")])
+        return rewards
+
+    def _build_match_index(self) -> None:
+        """
+        First row and length of each episode: the recorded actions at timestep t are the
+        rows start + t of the episodes longer than t, gathered from the mapped column.
+        """
+        self._match_starts = self.episodes[:, 0].astype(np.int64)
+        self._match_lengths = self.episodes[:, 1] - self.episodes[:, 0]
+        self._max_length = int(self._match_lengths.max())
+
+    def _match(self, action) -> int:
+        """
+        Episode whose recorded action at the current timestep is the closest to action.
+        """
+        action = np.asarray(action, dtype=np.float32)
+        if not np.all(np.isfinite(action)):
+            raise ValueError(f"cannot match a non-finite action: {action}.")
+        candidates = np.flatnonzero(self._match_lengths > self.timestep)
+        recorded = self.columns["action"][self._match_starts[candidates] + self.timestep]
+        distance = np.square(recorded - action).sum(axis=1)
+        # rows recorded without an action never match
+        distance[np.isnan(distance)] = np.inf
+        return int(candidates[distance.argmin()])
+
+    def reset(self, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+              ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Start the next recorded episode, a random one if seeded, or options["episode"].
+        """
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        self.episode += 1
+        if options and "episode" in options:
+            self.current = int(options["episode"])
+        elif seed is not None:
+            self.current = int(self._rng.integers(len(self.episodes)))
+        else:
+            self.current = self.episode % len(self.episodes)
+        self._row, self._stop = (int(x) for x in self.episodes[self.current])
+        self.timestep = 0
+        return self._emit(self._row), self._info(self._row)
+
+    def step(self, action):
+        self.timestep += 1
+        if self.mode == "match" and self.timestep < self._max_length:
+            self.current = self._match(action)
+            self._row = int(self.episodes[self.current, 0]) + self.timestep
+            self._stop = int(self.episodes[self.current, 1])
+        elif self._row + 1 < self._stop:
+            self._row += 1
+        row = self._row
+        terminated = bool(self._terminated[row]) or row + 1 >= self._stop
+        truncated = bool(self._truncated[row])
+        return self._emit(row), float(self.rewards[row]), terminated, truncated, self._info(row)
+
+    def _emit(self, row: int) -> np.ndarray:
+        obs = self._obs[row]
+        return obs.copy() if self.copy else obs
+
+    def _info(self, row: int) -> Dict[str, Any]:
+        info = {"timestep": self.timestep}
+        if self.full_info:
+            info.update(zip(CLOCK_COLUMNS, self.columns["clock"][row].tolist()))
+            info.update(zip(self.recording_schema["info"], self.columns["info"][row].tolist()))
+        return info
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def observation_names(self) -> Tuple[str, ...]:
+        return self.schema.names
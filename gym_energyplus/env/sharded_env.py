@@ -0,0 +1,160 @@
+"""
+Evaluation of a fixed controller over a run period split into segments simulated in
+parallel, stitched back into one trajectory.
+"""
+import multiprocessing as mp
+import uuid
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from ..generator.generator import Generator
+from ..util.logger import Logger
+from ..util.constant import LOG_LEVEL_GYM_ENV
+from .eplus_env import EplusEnv
+
+CLOCK_FIELDS = ("month", "day", "hour", "minute", "day_of_week", "day_of_year")
+
+
+def _run_shard(configure_path: str, reward_func, policy: Callable[[np.ndarray], Any],
+               env_kwargs: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Run one segment to its end: the first observation, then one row per step that
+    advanced the simulation. Rows hold the observation, the action and reward that led
+    to it (NaN for the first row), and the clock.
+    """
+    env = EplusEnv(configure_path, reward_func, **{"copy": False, **env_kwargs})
+    try:
+        obs, info = env.reset()
+        action_size = len(env.action_variables)
+        observations = [obs.copy()]
+        actions = [np.full(action_size, np.nan)]
+        rewards = [np.nan]
+        clocks = [info["clock"]]
+        terminated = truncated = False
+        while not (terminated or truncated):
+            action = policy(obs)
+            obs, reward, terminated, truncated, info = env.step(action)
+            # the step after the last timestep returns the last observation again
+            if info["clock"] is clocks[-1]:
+                break
+            observations.append(obs.copy())
+            actions.append(np.asarray(action, dtype=np.float64))
+            rewards.append(reward)
+            clocks.append(info["clock"])
+    finally:
+        env.close()
+    columns = {
+        "obs": np.stack(observations),
+        "action": np.stack(actions),
+        "reward": np.asarray(rewards, dtype=np.float64),
+        "sim_time": np.array([clock.sim_time for clock in clocks]),
+    }
+    for field in CLOCK_FIELDS:
+        columns[field] = np.array([getattr(clock, field) for clock in clocks], dtype=np.int16)
+    return columns
+
+
+class ShardError(RuntimeError):
+    """
+    Failure of run period segments, carrying their shard indices.
+    """
+
+    def __init__(self, shards: List[int], message: str) -> None:
+        super().__init__(message)
+        self.shards = shards
+
+
+class ShardedEvaluation:
+
+    logger = Logger().getLogger("sharded_evaluation", LOG_LEVEL_GYM_ENV)
+
+    def __init__(self,
+        configure_path: str,
+        reward_func,
+        n_shards: Union[int, str] = "months",
+        env_kwargs: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+        start_method: str = "spawn",
+        ) -> None:
+        """
+        Split the run period of the configured IDF into segments (see
+        Generator.shard_run_period), each simulated with its own warmup by an EplusEnv in
+        its own process, and stitch the segments back into one trajectory.
+
+        Meant for evaluating fixed controllers: a controller carrying state across the
+        year sees each segment start fresh, and the first observation of each segment
+        has no action or reward (NaN).
+        Args:
+            configure_path (str): handle and path configuration file.
+            reward_func: reward of EplusEnv, picklable.
+            n_shards: "months" or a number of segments. Defaults to "months".
+            env_kwargs (dict, optional): other EplusEnv arguments, picklable.
+            max_workers (int, optional): parallel segments. Defaults to the number of segments.
+            start_method (str): multiprocessing start method. Defaults to "spawn".
+        """
+        generator = Generator()
+        generator.load_by_data(configure_path)
+        self.configs: List[str] = generator.shard_run_period(n_shards)
+        self.reward_func = reward_func
+        self.env_kwargs = dict(env_kwargs or {})
+        self.max_workers = max_workers or len(self.configs)
+        self.start_method = start_method
+        self.runs = 0
+
+    def run(self, policy: Callable[[np.ndarray], Any]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a policy over the whole run period.
+        Args:
+            policy: picklable callable mapping an observation to an action.
+        Returns:
+            Dict[str, np.ndarray]: stitched columns "obs", "action", "reward", "sim_time",
+                the clock fields, "shard", "shard_timestep" (step within the segment) and
+                "timestep" (step within the whole period).
+        Raises:
+            ShardError: a segment raised, or its worker process died.
+        """
+        # segments write their outputs side by side in the configured out_path, under a
+        # name unique to the run, as several evaluations may share the configuration
+        name = self.env_kwargs.get("simulator_name", "eplus")
+        run_id = uuid.uuid4().hex[:12]
+        self.runs += 1
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp.get_context(self.start_method)) as pool:
+            futures = [
+                pool.submit(_run_shard, config, self.reward_func, policy,
+                            {**self.env_kwargs, "simulator_name": f"{name}-{run_id}-shard{k}-"})
+                for k, config in enumerate(self.configs)
+            ]
+            shards = []
+            for k, future in enumerate(futures):
+                try:
+                    shards.append(future.result())
+                except BrokenProcessPool as err:
+                    # every segment not completed when the worker died fails with it
+                    pool.shutdown(cancel_futures=True)
+                    failed = [i for i, f in enumerate(futures) if f.cancelled() or f.exception() is not None]
+                    raise ShardError(failed, f"a worker process died, segment(s) {failed} did not complete "
+                                             f"(first: {self.configs[failed[0]]}).") from err
+                except Exception as err:
+                    pool.shutdown(cancel_futures=True)
+                    raise ShardError([k], f"segment {k} ({self.configs[k]}) failed: {err!r}") from err
+        return self.stitch(shards)
+
+    def stitch(self, shards: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """
+        Concatenate segment columns in time order, with sim_time counted from the start of
+        the whole period.
+        """
+        columns = {key: np.concatenate([shard[key] for shard in shards]) for key in shards[0]}
+        lengths = [len(shard["reward"]) for shard in shards]
+        columns["shard"] = np.repeat(np.arange(len(shards)), lengths)
+        columns["shard_timestep"] = np.concatenate([np.arange(length) for length in lengths])
+        columns["timestep"] = np.arange(len(columns["reward"]))
+        # each segment counts its simulation time from its own start
+        start_hours = np.array([(shard["day_of_year"][0] - shards[0]["day_of_year"][0]) * 24.0 for shard in shards])
+        offsets = start_hours - np.array([shard["sim_time"][0] - shards[0]["sim_time"][0] for shard in shards])
+        columns["sim_time"] = columns["sim_time"] + np.repeat(offsets, lengths)
+        if np.any(np.diff(columns["sim_time"]) <= 0):
+            self.logger.warning("stitched segments overlap or are out of order.")
+        return columns
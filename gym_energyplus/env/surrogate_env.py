@@ -0,0 +1,124 @@
+"""
+Batched environment stepping a fitted surrogate instead of EnergyPlus.
+"""
+import numpy as np
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+from ..simulators.surrogate import ARXSurrogate
+from ..util.logger import Logger
+from ..util.constant import LOG_LEVEL_GYM_ENV
+from .observation_schema import ObservationSchema
+
+
+class SurrogateVecEnv:
+
+    logger = Logger().getLogger("surrogate_vec_env", LOG_LEVEL_GYM_ENV)
+
+    def __init__(self,
+        surrogate: ARXSurrogate,
+        n_envs: int = 1024,
+        reward_func=None,
+        episode_length: Optional[int] = None,
+        schema: Optional[ObservationSchema] = None,
+        seed: Optional[int] = None,
+        ) -> None:
+        """
+        Step n_envs surrogate simulations at once, with the reset/step interface of
+        VecEplusEnv and the observation/action layout of the env the surrogate was fitted on,
+        so that agents pretrained here can be fine-tuned on EplusEnv.
+
+        Episodes start from recorded initial observations and follow the recorded calendar.
+        Finished episodes are reset automatically, their last observation is returned in
+        infos["final_observation"]. Infos are one dict of (n_envs,) arrays.
+        Args:
+            surrogate (ARXSurrogate): fitted surrogate.
+            n_envs (int): number of simulations. Defaults to 1024.
+            reward_func (optional): reward with a `batch` method. Defaults to zero rewards.
+            episode_length (int, optional): steps per episode. Defaults to the recorded calendar.
+            schema (ObservationSchema, optional): schema of the target env, e.g.
+                `ObservationSchema.from_generator(generator)`, checked against the surrogate.
+            seed (int, optional): seed of the initial observation draws.
+        """
+        if surrogate.weights is None:
+            raise ValueError("the surrogate is not fitted.")
+        if schema is not None and (schema.names != surrogate.schema.names
+                                   or schema.action_names != surrogate.schema.action_names):
+            raise ValueError("surrogate observation/action layout does not match the env schema.")
+        self.surrogate = surrogate
+        self.schema = surrogate.schema
+        self.num_envs = n_envs
+        self.reward_func = reward_func
+        self.calendar = surrogate.calendar
+        self.episode_length = len(self.calendar) - 1 if episode_length is None else int(episode_length)
+        try:
+            self.observation_space = self.schema.observation_space()
+            self.action_space = self.schema.action_space()
+        except ImportError:
+            self.observation_space = self.action_space = None
+
+        n_state = surrogate.n_state
+        self._rng = np.random.default_rng(seed)
+        self._history = np.zeros((n_envs, surrogate.lags, n_state))
+        self._features = np.empty((n_envs, surrogate.n_features))
+        self._obs = np.zeros((n_envs, self.schema.size), dtype=np.float32)
+        self._timestep = np.zeros(n_envs, dtype=np.int64)
+        self._action_slice = self.schema.slices["actuators"]
+
+    def _reset_envs(self, index: Union[slice, np.ndarray]) -> None:
+        initial = self.surrogate.initial_states[
+            self._rng.integers(len(self.surrogate.initial_states), size=len(self._timestep[index]))]
+        self._history[index] = initial[:, :, :self.surrogate.n_state]
+        self._obs[index] = initial[:, 0]
+        self._timestep[index] = 0
+
+    def _infos(self) -> Dict[str, np.ndarray]:
+        calendar = self.calendar[np.minimum(self._timestep, len(self.calendar) - 1)]
+        return {"timestep": self._timestep.copy(), "month": calendar[:, 0],
+                "day": calendar[:, 1], "hour": calendar[:, 2]}
+
+    def reset(self) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Reset all simulations.
+        Returns:
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: (num_envs, observation_size) observations and infos.
+        """
+        self._reset_envs(slice(None))
+        return self._obs.copy(), self._infos()
+
+    def step(self, actions: Union[np.ndarray, Sequence[Sequence[float]]]
+             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Step every simulation.
+        Args:
+            actions: (num_envs, action_size) actions.
+        Returns:
+            observations, rewards, terminated, truncated and infos of all simulations.
+        """
+        actions = np.asarray(actions, dtype=np.float64)
+        self._timestep += 1
+        calendar = self.calendar[np.minimum(self._timestep, len(self.calendar) - 1)]
+        predicted = self.surrogate.predict(self._history, actions, calendar, self._features)
+        if self.surrogate.lags > 1:
+            self._history[:, 1:] = self._history[:, :-1]
+        self._history[:, 0] = predicted
+        self._obs[:, :self.surrogate.n_state] = predicted
+        self._obs[:, self._action_slice] = actions
+
+        if self.reward_func is not None:
+            rewards, _ = self.reward_func.batch(
+                self._obs, self.schema.names, calendar[:, 0], calendar[:, 1], calendar[:, 2])
+        else:
+            rewards = np.zeros(self.num_envs)
+        terminated = np.zeros(self.num_envs, dtype=np.bool_)
+        truncated = self._timestep >= self.episode_length
+        infos: Dict[str, Any] = self._infos()
+        obs = self._obs.copy()
+        if truncated.any():
+            infos["final_observation"] = obs[truncated].copy()
+            infos["final_index"] = np.flatnonzero(truncated)
+            self._reset_envs(truncated)
+            obs[truncated] = self._obs[truncated]
+        return obs, rewards, terminated, truncated, infos
+
+    def close(self) -> None:
+        pass
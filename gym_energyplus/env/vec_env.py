@@ -0,0 +1,329 @@
+"""
+Vectorized EnergyPlus environment running one EplusEnv per subprocess.
+"""
+import multiprocessing as mp
+import traceback
+import numpy as np
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from ..generator.generator import Generator
+from ..util.logger import Logger
+from ..util.constant import LOG_LEVEL_GYM_ENV
+from .eplus_env import EplusEnv
+from .observation_schema import ObservationSchema
+
+
+class SharedArray:
+
+    def __init__(self, shape: Tuple[int, ...], dtype: Any, name: Optional[str] = None) -> None:
+        """
+        A numpy array backed by a multiprocessing shared memory block.
+        Args:
+            shape: array shape.
+            dtype: array dtype.
+            name (str, optional): name of an existing block to attach to, a new block is
+                created when None.
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        else:
+            self.shm = _attach_shared_memory(name)
+        self.array: np.ndarray = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, ...], str]:
+        """
+        (name, shape, dtype) needed to attach to the block from another process.
+        """
+        return self.shm.name, self.shape, self.dtype.str
+
+    def close(self) -> None:
+        # drop the view before releasing the buffer it points to
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to a block owned by the parent. Workers started by multiprocessing share the
+    parent's resource tracker, where the block is registered once, so a worker neither
+    tracks nor unregisters it: the parent's unlink is the only release.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # python < 3.13: registering again in the shared tracker is a no-op
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker(
+    index: int,
+    remote: Connection,
+    parent_remote: Connection,
+    configure_path: str,
+    reward_func,
+    env_kwargs: Dict[str, Any],
+    specs: Dict[str, Tuple[str, Tuple[int, ...], str]],
+    ) -> None:
+    """
+    Subprocess loop: runs commands from the parent and exchanges observations, actions,
+    rewards and flags through the shared arrays, only infos go through the pipe.
+    Every reply is ("ok", data), or ("error", traceback) after which the worker exits.
+    """
+    parent_remote.close()
+    shared = {key: SharedArray(shape, dtype, name) for key, (name, shape, dtype) in specs.items()}
+    obs_buf = shared["obs"].array
+    act_buf = shared["actions"].array
+    reward_buf = shared["rewards"].array
+    terminated_buf = shared["terminated"].array
+    truncated_buf = shared["truncated"].array
+    env = None
+    try:
+        # observations are copied into the shared block, the env buffer can be returned as is
+        env = EplusEnv(configure_path, reward_func, simulator_name=f"eplus-w{index}-", **{"copy": False, **env_kwargs})
+        while True:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                obs, reward, terminated, truncated, info = env.step(act_buf[index].tolist())
+                if terminated or truncated:
+                    # auto-reset, the last observation of the episode travels in the info
+                    info["final_info"] = dict(info)
+                    info["final_observation"] = obs.copy()
+                    obs, reset_info = env.reset()
+                    info.update(reset_info)
+                obs_buf[index] = obs
+                reward_buf[index] = reward
+                terminated_buf[index] = terminated
+                truncated_buf[index] = truncated
+                remote.send(("ok", info))
+            elif cmd == "reset":
+                obs, info = env.reset()
+                obs_buf[index] = obs
+                remote.send(("ok", info))
+            elif cmd == "getattr":
+                remote.send(("ok", getattr(env, data)))
+            elif cmd == "close":
+                env.close()
+                env = None
+                remote.send(("ok", None))
+                break
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker.")
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        # report to the parent waiting for the reply, then stop
+        try:
+            remote.send(("error", traceback.format_exc()))
+        except (OSError, EOFError):
+            pass
+    finally:
+        if env is not None:
+            try:
+                env.close()
+            except Exception:
+                pass
+        # views must be released before the blocks are closed
+        obs_buf = act_buf = reward_buf = terminated_buf = truncated_buf = None
+        for array in shared.values():
+            array.close()
+        remote.close()
+
+
+class WorkerError(RuntimeError):
+    """
+    Exception raised in a VecEplusEnv worker, carrying its index and traceback.
+    """
+
+    def __init__(self, index: int, details: str) -> None:
+        super().__init__(f"worker {index} failed:\n{details}")
+        self.index = index
+        self.details = details
+
+
+class VecEplusEnv:
+
+    logger = Logger().getLogger("vec_eplus_env", LOG_LEVEL_GYM_ENV)
+
+    def __init__(self,
+        configure_path: Union[str, Sequence[str]],
+        reward_func,
+        n_envs: int = 2,
+        env_kwargs: Optional[Dict[str, Any]] = None,
+        start_method: str = "spawn",
+        ) -> None:
+        """
+        Run N EplusEnv workers in subprocesses, each with its own EnergyPlus thread.
+
+        Observations, actions, rewards and done flags are exchanged through shared memory
+        arrays, the pipes only carry commands and infos. Workers auto-reset: when an
+        episode ends, the returned observation is the first one of the next episode and
+        the last one is stored in info["final_observation"].
+        Args:
+            configure_path: configuration file for all workers, or one per worker.
+            reward_func: picklable reward function, see EplusEnv.
+            n_envs (int): number of workers, ignored when one configuration per worker is given.
+            env_kwargs (dict, optional): extra EplusEnv keyword arguments.
+            start_method (str): multiprocessing start method. Defaults to "spawn", which is
+                safe with the EnergyPlus library loaded in the parent.
+        """
+        if isinstance(configure_path, str):
+            configure_paths = [configure_path] * n_envs
+        else:
+            configure_paths = list(configure_path)
+        self.num_envs = len(configure_paths)
+
+        # shapes follow the observation order of GymEnergyPlus
+        self.observation_size, self.action_size = self._get_sizes(configure_paths)
+        self._shared = {
+            "obs": SharedArray((self.num_envs, self.observation_size), np.float32),
+            "actions": SharedArray((self.num_envs, self.action_size), np.float32),
+            "rewards": SharedArray((self.num_envs,), np.float64),
+            "terminated": SharedArray((self.num_envs,), np.bool_),
+            "truncated": SharedArray((self.num_envs,), np.bool_),
+        }
+        specs = {key: array.spec for key, array in self._shared.items()}
+
+        ctx = mp.get_context(start_method)
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(self.num_envs)])
+        self.processes = []
+        for index, (work_remote, remote, conf) in enumerate(zip(self.work_remotes, self.remotes, configure_paths)):
+            process = ctx.Process(
+                target=_worker,
+                name=f"vec_eplus_worker_{index}",
+                args=(index, work_remote, remote, conf, reward_func, env_kwargs or {}, specs),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.waiting = False
+        self.closed = False
+        # workers that failed and exited
+        self.failed: Set[int] = set()
+
+    @staticmethod
+    def _get_sizes(configure_paths: List[str]) -> Tuple[int, int]:
+        sizes = set()
+        for conf in set(configure_paths):
+            generator = Generator()
+            generator.load_by_data(conf)
+            schema = ObservationSchema.from_generator(generator)
+            sizes.add((schema.size, schema.action_size))
+        if len(sizes) != 1:
+            raise ValueError(f"all workers must share observation and action sizes, got {sizes}.")
+        return sizes.pop()
+
+    def reset(self) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Reset all workers.
+        Returns:
+            Tuple[np.ndarray, List[dict]]: (num_envs, observation_size) observations and infos.
+        """
+        self._send("reset")
+        infos = self._receive()
+        return self._shared["obs"].array.copy(), infos
+
+    def step_async(self, actions: Union[np.ndarray, Sequence[Sequence[float]]]) -> None:
+        """
+        Write the actions to shared memory and let every worker step.
+        """
+        self._shared["actions"].array[:] = actions
+        self._send("step")
+        self.waiting = True
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Wait for the workers stepped by `step_async`.
+        Returns:
+            observations, rewards, terminated, truncated and infos of all workers.
+        """
+        self.waiting = False
+        infos = self._receive()
+        return (
+            self._shared["obs"].array.copy(),
+            self._shared["rewards"].array.copy(),
+            self._shared["terminated"].array.copy(),
+            self._shared["truncated"].array.copy(),
+            infos
+        )
+
+    def step(self, actions: Union[np.ndarray, Sequence[Sequence[float]]]):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def get_attr(self, name: str) -> List[Any]:
+        """
+        Get an attribute of the EplusEnv of every worker.
+        """
+        self._send("getattr", name)
+        return self._receive()
+
+    def _send(self, cmd: str, data: Any = None) -> None:
+        if self.failed:
+            raise RuntimeError(f"workers {sorted(self.failed)} failed, close the environment.")
+        for remote in self.remotes:
+            remote.send((cmd, data))
+
+    def _receive(self, raise_errors: bool = True) -> List[Any]:
+        """
+        Replies of all workers, read from every pipe before raising so that the healthy
+        workers stay in step.
+        Raises:
+            WorkerError: a worker raised, or died, handling the command.
+        """
+        results: List[Any] = []
+        errors: List[WorkerError] = []
+        for index, remote in enumerate(self.remotes):
+            if index in self.failed:
+                results.append(None)
+                continue
+            try:
+                status, data = remote.recv()
+            except EOFError:
+                # died without reporting, e.g. killed or crashed in EnergyPlus
+                self.processes[index].join(timeout=1.0)
+                status, data = "error", f"worker exited with code {self.processes[index].exitcode}."
+            if status == "error":
+                self.failed.add(index)
+                errors.append(WorkerError(index, data))
+                data = None
+            results.append(data)
+        if errors and raise_errors:
+            for error in errors[1:]:
+                self.logger.error(str(error))
+            raise errors[0]
+        return results
+
+    def close(self) -> None:
+        """
+        Stop all workers and release the shared memory.
+        """
+        if self.closed:
+            return
+        if self.waiting:
+            self._receive(raise_errors=False)
+            self.waiting = False
+        for index, remote in enumerate(self.remotes):
+            if index not in self.failed:
+                remote.send(("close", None))
+        self._receive(raise_errors=False)
+        for process in self.processes:
+            process.join()
+        for array in self._shared.values():
+            array.close()
+        self.closed = True
+        self.logger.info("vectorized environment closed.")
+
+    def __del__(self) -> None:
+        if not getattr(self, "closed", True):
+            self.close()
@@ -1,10 +1,12 @@
 import json
 import os
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 from ..util.constant import DATA_BUILDINGS_PATH, DATA_CONFIGURATION_PATH, DATA_WEATHER_PATH
 from ..util.constant import LOG_LEVEL_MODEL_JSON, ENERGYPLUS_DIR
+from ..util.fingerprint import data_digest
 from ..util.logger import Logger
-from eppy.modeleditor import IDF
+if TYPE_CHECKING:
+    from eppy.modeleditor import IDF
 
 class Generator(object):
 
@@ -23,29 +25,104 @@ class Generator(object):
         # file
         self.weather_file: str = None
         self.idf_file: str = None
-        self.idd_file: str = os.path.join(ENERGYPLUS_DIR + "Energy+.idd")
+        self.idd_file: str = os.path.join(ENERGYPLUS_DIR or "", "Energy+.idd")
+        # eppy model, parsed on first use
+        self._idf: Optional["IDF"] = None
+        # run a training variant of idf_file without the unused outputs
+        self.prune_outputs: bool = False
+
+    @property
+    def idf(self) -> "IDF":
+        """
+        eppy model of idf_file, loaded by the first access (see load_idf).
+        """
+        if self._idf is None:
+            self.load_idf()
+        return self._idf
 
-        IDF.setiddname(self.idd_file)
-        self.idf = IDF(self.idf_file)
+    @idf.setter
+    def idf(self, idf: "IDF") -> None:
+        self._idf = idf
 
     def set_file_path(self, weather_file, idf_file, out_path):
         self.out_path = out_path
         self.weather_file = weather_file
         self.idf_file = idf_file
+        self._idf = None
+
+    def shard_run_period(self, n_shards: Union[int, str] = "months", max_workers: Optional[int] = None,
+                         cache_dir: Optional[str] = None) -> List[str]:
+        """
+        Split the first RunPeriod of idf_file into segments, each month or n_shards runs of
+        days, and generate one IDF variant and EplusEnv configuration per segment (see
+        generate_variants). Each segment runs its own warmup; without a begin year, its
+        start day of week is shifted so that the calendar matches the unsplit period.
+        Returns:
+            List[str]: configuration files, in time order.
+        """
+        from ..util.idf_parser import WEEKDAYS, load_index
+        from .variants import run_period_segments
+        run_periods = load_index(self.idf_file).run_periods()
+        if not run_periods:
+            raise ValueError(f"no RunPeriod in {self.idf_file}.")
+        period = run_periods[0]
+        year = period["begin_year"] or 2017
+        segments = run_period_segments(period["begin_month"], period["begin_day"], period["end_month"],
+                                       period["end_day"], n_shards, year)
+        overrides_list = []
+        for begin_month, begin_day, end_month, end_day, offset in segments:
+            fields = {1: begin_month, 2: begin_day, 4: end_month, 5: end_day}
+            if period["begin_year"] is None and period["start_day_of_week"] is not None:
+                weekday = (WEEKDAYS.index(period["start_day_of_week"]) + offset) % 7
+                fields[7] = WEEKDAYS[weekday].capitalize()
+            overrides_list.append({f"RunPeriod/{period['name']}": fields})
+        return self.generate_variants(overrides_list, max_workers, cache_dir)
+
+    def run_idf_file(self) -> str:
+        """
+        IDF file given to EnergyPlus: idf_file, or with prune_outputs its cached training
+        variant, keeping only the Output:Variable objects the variable handles need and
+        turning off the tabular, SQLite and report files that the EnergyPlus version of
+        idd_file defines (see training_idf).
+        """
+        if not self.prune_outputs:
+            return self.idf_file
+        from .training_idf import training_idf
+        return training_idf(self.idf_file, self.variables, idd_file=self.idd_file)
+
+    def load_idf(self, use_cache: bool = True) -> "IDF":
+        """
+        parse idf_file with eppy, through the on-disk IDFCache unless use_cache is False.
+        eppy and the IDD are only loaded here, environments that never edit or inspect
+        the model do not pay for them.
+        """
+        if self.idf_file is None:
+            raise ValueError("no idf file set, call set_file_path or load_by_data first.")
+        if use_cache:
+            from .idf_cache import IDFCache
+            self._idf = IDFCache().get(self.idf_file, self.idd_file)
+        else:
+            from eppy.modeleditor import IDF
+            from .idf_cache import set_idd
+            set_idd(self.idd_file)
+            self._idf = IDF(self.idf_file)
+        return self._idf
 
     def _load_file_path(self, file_dict:Dict[str, str]) -> None:
         self.out_path = file_dict["out_path"]
         self.weather_file = file_dict["weather_file"]
         self.idf_file = file_dict["idf_file"]
+        self._idf = None
         print(self.out_path)
 
-    def make_new_out_dir(self, name:str, episode:int):
+    def make_new_out_dir(self, name:str, episode:int) -> str:
         assert os.path.exists(self.out_path)
         new_out_dir_name = name + str(episode)
         new_dir = os.path.join(self.out_path, new_out_dir_name)
         assert not os.path.exists(new_dir)
         # assert not os.mkdir(new_dir)
         self.current_path = new_dir
+        return new_dir
 
     def load_by_data(self, conf_path):
         """
@@ -77,21 +154,46 @@ class Generator(object):
             return
         
         with open(save_file_path, "w+", encoding="utf-8") as save_file_stream:
-            save_dict = {}
-            # handles
-            save_dict["variables"] = self.variables
-            save_dict["actuators"] = self.actuators
-            save_dict["internal_variables"] = self.internal_variables
-            save_dict["meters"] = self.meters
-            path_dict = {}
-            # path
-            path_dict["weather_file"] = self.weather_file
-            path_dict["idf_file"] = self.idf_file
-            path_dict["out_path"] = self.out_path
-            save_dict["path"] = path_dict
-            conf_str = json.dumps(save_dict)
+            conf_str = json.dumps(self._conf_dict())
             save_file_stream.write(conf_str)
 
+    def _conf_dict(self, idf_file: Optional[str] = None) -> Dict[str, Any]:
+        save_dict = {}
+        # handles
+        save_dict["variables"] = self.variables
+        save_dict["actuators"] = self.actuators
+        save_dict["internal_variables"] = self.internal_variables
+        save_dict["meters"] = self.meters
+        path_dict = {}
+        # path
+        path_dict["weather_file"] = self.weather_file
+        path_dict["idf_file"] = idf_file or self.idf_file
+        path_dict["out_path"] = self.out_path
+        save_dict["path"] = path_dict
+        return save_dict
+
+    def generate_variants(self, overrides_list: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                          cache_dir: Optional[str] = None) -> List[str]:
+        """
+        Generate IDF variants of idf_file, one per override set (see variants.py), in a
+        process pool, and write an EplusEnv configuration for each, with the handles and
+        paths of this generator. Variants and configurations are stored under content
+        hashes, requesting the same overrides again only returns their paths.
+        Returns:
+            List[str]: configuration files, in the order of overrides_list.
+        """
+        from .variants import VARIANT_DIR, generate_variants
+        cache_dir = cache_dir or VARIANT_DIR
+        conf_paths = []
+        for variant in generate_variants(self.idf_file, overrides_list, cache_dir, max_workers):
+            conf_dict = self._conf_dict(variant)
+            conf_path = os.path.splitext(variant)[0] + "." + data_digest(conf_dict)[:16] + ".json"
+            if not os.path.exists(conf_path):
+                with open(conf_path, "w", encoding="utf-8") as conf_stream:
+                    json.dump(conf_dict, conf_stream)
+            conf_paths.append(conf_path)
+        return conf_paths
+
     def add_variable_handle(self, name:str, variable_name:str, variable_key:str) -> None:
         """
         set variable handle using in running energyplus.
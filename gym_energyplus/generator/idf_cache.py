@@ -0,0 +1,115 @@
+"""
+Persistent cache of IDF models parsed by eppy.
+"""
+import os
+import pickle
+from typing import Optional
+
+import eppy
+from eppy.modeleditor import IDF
+
+from ..util.constant import CACHE_DIR, LOG_LEVEL_MODEL_JSON
+from ..util.fingerprint import data_digest, file_digest
+from ..util.logger import Logger
+
+
+def set_idd(idd_file: str) -> None:
+    """
+    Set the IDD of eppy, which holds one per process on the IDF class. An IDD already
+    set is kept when it has the same content as idd_file.
+    Raises:
+        RuntimeError: eppy already uses another IDD, whose models do not match idd_file.
+    """
+    current = IDF.getiddname()
+    if current is None:
+        IDF.setiddname(idd_file)
+        return
+    if current == idd_file or (os.path.isfile(current) and file_digest(current) == file_digest(idd_file)):
+        return
+    raise RuntimeError(
+        f"eppy already uses the IDD {current}, models of {idd_file} cannot be loaded in the same process.")
+
+
+class IDFCache:
+
+    logger = Logger().getLogger(name="idf_cache", level=LOG_LEVEL_MODEL_JSON)
+
+    def __init__(self, cache_dir: str = os.path.join(CACHE_DIR, "idf")) -> None:
+        """
+        Parsing an IDD and a large IDF with eppy takes seconds, most of it building the
+        field bunches, so the parsed model is pickled under a key of its content and
+        unpickled by the next processes. An edited file gets a new key, stale entries
+        are never read.
+        Args:
+            cache_dir (str): directory of the cache entries.
+        """
+        self.cache_dir = cache_dir
+
+    def key(self, idf_file: str, idd_file: str) -> str:
+        """
+        Cache key of the (IDF hash, IDD hash, eppy version, pickle protocol) tuple.
+        """
+        return data_digest([
+            file_digest(idf_file),
+            file_digest(idd_file),
+            eppy.__version__,
+            pickle.HIGHEST_PROTOCOL
+        ])
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".pickle")
+
+    def load(self, key: str, idd_file: str) -> Optional[IDF]:
+        """
+        Load the model stored under key, setting the IDD of eppy if it is not set yet
+        (see set_idd).
+        Returns:
+            Optional[IDF]: the model, None on a miss.
+        """
+        path = self.entry_path(key)
+        if not os.path.exists(path):
+            return None
+        set_idd(idd_file)
+        try:
+            with open(path, "rb") as entry:
+                data = pickle.load(entry)
+            idf, idd = data["idf"], data["idd"]
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError,
+                ValueError, KeyError, TypeError, IndexError):
+            # a corrupt or truncated entry is a miss, parsed again and replaced
+            self.logger.warning(f"unreadable cache entry {path}, parsing again.")
+            return None
+        if IDF.idd_info is None:
+            IDF.setidd(*idd)
+        return idf
+
+    def save(self, key: str, idf: IDF) -> None:
+        """
+        Store a parsed model under key, with the IDD data eppy keeps on the IDF class.
+        The file is written aside and renamed, so concurrent workers never read a partial entry.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        data = {"idf": idf, "idd": (IDF.idd_info, IDF.idd_index, IDF.block, IDF.idd_version)}
+        with open(tmp_path, "wb") as stream:
+            pickle.dump(data, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def get(self, idf_file: str, idd_file: str) -> IDF:
+        """
+        The parsed model of idf_file, from the cache or parsed and stored. Warm the cache
+        once before starting workers so that they all load it.
+        """
+        key = self.key(idf_file, idd_file)
+        idf = self.load(key, idd_file)
+        if idf is not None:
+            return idf
+        self.logger.info(f"parsing {idf_file}, not in the cache.")
+        set_idd(idd_file)
+        idf = IDF(idf_file)
+        try:
+            self.save(key, idf)
+        except (OSError, pickle.PicklingError) as e:
+            self.logger.warning(f"could not cache {idf_file}: {e}")
+        return idf
@@ -0,0 +1,149 @@
+"""
+Training variant of an IDF: outputs that training never reads are pruned, so that an
+episode writes little more than the error file.
+"""
+import functools
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..util.constant import CACHE_DIR, LOG_LEVEL_MODEL_JSON
+from ..util.fingerprint import data_digest, file_digest
+from ..util.idf_parser import load_index
+from ..util.logger import Logger
+
+logger = Logger().getLogger("training_idf", LOG_LEVEL_MODEL_JSON)
+
+# output classes removed from the training variant
+PRUNED_CLASSES = (
+    "Output:Variable",
+    "Output:Meter",
+    "Output:Meter:*",
+    "Output:Table:*",
+    "Output:SQLite",
+    "Output:JSON",
+    "Output:VariableDictionary",
+    "Output:Surfaces:*",
+    "Output:Constructions",
+    "Output:Schedules",
+    "Output:EnergyManagementSystem",
+    "Output:DebuggingData",
+    "OutputControl:Table:Style",
+    "OutputControl:Files",
+)
+
+# object turning output files off, defined from EnergyPlus 9.4 with fields that vary
+# across releases (e.g. "Output Zone Sizing" became "Output Space Sizing" in 23.1)
+OUTPUT_FILES_CLASS = "OutputControl:Files"
+_IDD_FIELD = re.compile(r"^\s*[AN]\d+\s*([,;])\s*\\field\s+(.+?)\s*$")
+
+VARIANT_DIR = os.path.join(CACHE_DIR, "idf_variants")
+
+
+def pruned_ranges(idf_file: str) -> List[Tuple[int, int]]:
+    """
+    Sorted byte ranges of the output objects of an IDF file.
+    """
+    index = load_index(idf_file)
+    ranges = []
+    for pattern in PRUNED_CLASSES:
+        for class_name in index.classes(pattern):
+            ranges.extend(index.ranges(class_name))
+    return sorted(set(ranges))
+
+
+def output_files_fields(idd_file: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Fields of OutputControl:Files in an IDD, in order, e.g. ("Output CSV", "Output MTR", ...).
+    Returns:
+        Optional[Tuple[str, ...]]: the fields, None if the IDD is not found or does not
+            define the object (EnergyPlus before 9.4).
+    """
+    if not idd_file or not os.path.isfile(idd_file):
+        return None
+    stat = os.stat(idd_file)
+    return _read_output_files_fields(os.path.abspath(idd_file), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_output_files_fields(idd_file: str, mtime_ns: int, size: int) -> Optional[Tuple[str, ...]]:
+    fields: List[str] = []
+    with open(idd_file, "r", encoding="ISO-8859-1") as stream:
+        lines = iter(stream)
+        for line in lines:
+            if line.rstrip() == OUTPUT_FILES_CLASS + ",":
+                break
+        else:
+            return None
+        for line in lines:
+            match = _IDD_FIELD.match(line)
+            if match:
+                fields.append(match.group(2))
+                if match.group(1) == ";":
+                    break
+    return tuple(fields) or None
+
+
+def training_outputs(variables: Dict[str, Dict[str, str]], output_files: Optional[Tuple[str, ...]]) -> str:
+    """
+    Objects appended to the variant: OutputControl:Files turning every file off, with the
+    fields of the EnergyPlus version run, and an Output:Variable for each configured
+    variable, so that its API handle resolves.
+    """
+    lines = ["", "!- gym_energyplus training variant: outputs pruned"]
+    if output_files:
+        lines += ["", f"  {OUTPUT_FILES_CLASS},"]
+        lines += [f"    No{';' if i == len(output_files) - 1 else ','}{' ' * 23}!- {name}"
+                  for i, name in enumerate(output_files)]
+    requested = sorted({(conf["variable_key"], conf["variable_name"]) for conf in variables.values()})
+    for key, name in requested:
+        lines += ["", "  Output:Variable,", f"    {key},", f"    {name},", "    Timestep;"]
+    return "\n".join(lines) + "\n"
+
+
+def write_training_idf(idf_file: str, out_file: str, variables: Dict[str, Dict[str, str]],
+                       output_files: Optional[Tuple[str, ...]] = None) -> str:
+    """
+    Copy idf_file to out_file without its output objects, comments included, and
+    append the outputs the variables need. Written aside and renamed.
+    Args:
+        output_files (Tuple[str, ...], optional): OutputControl:Files fields, see
+            output_files_fields. None leaves the files on.
+    Returns:
+        str: out_file.
+    """
+    tmp_file = f"{out_file}.{os.getpid()}.tmp"
+    with open(idf_file, "rb") as source, open(tmp_file, "wb") as target:
+        position = 0
+        for start, end in pruned_ranges(idf_file):
+            target.write(source.read(start - position))
+            source.seek(end)
+            position = end
+        target.write(source.read())
+        target.write(training_outputs(variables, output_files).encode("ISO-8859-1"))
+    os.replace(tmp_file, out_file)
+    return out_file
+
+
+def training_idf(idf_file: str, variables: Dict[str, Dict[str, str]], cache_dir: str = VARIANT_DIR,
+                 idd_file: Optional[str] = None) -> str:
+    """
+    Path of the training variant of idf_file for the configured variables, written
+    on the first request and then reused. The file name is the hash of the IDF content,
+    of the requested outputs and of the OutputControl:Files fields of the IDD, so an
+    edited IDF or config, or another EnergyPlus version, gets a new variant.
+    Args:
+        idd_file (str, optional): IDD of the EnergyPlus run, e.g. Generator.idd_file.
+            Without it, or before EnergyPlus 9.4, output files are left on and only the
+            output objects are pruned.
+    """
+    output_files = output_files_fields(idd_file)
+    if output_files is None:
+        logger.warning(f"{OUTPUT_FILES_CLASS} not found in IDD {idd_file}, output files are left on.")
+    requested: Iterable = sorted((conf["variable_key"], conf["variable_name"]) for conf in variables.values())
+    key = data_digest([file_digest(idf_file), "training", list(requested), output_files, PRUNED_CLASSES])
+    out_file = os.path.join(cache_dir, key + ".idf")
+    if not os.path.exists(out_file):
+        os.makedirs(cache_dir, exist_ok=True)
+        write_training_idf(idf_file, out_file, variables, output_files)
+    return out_file
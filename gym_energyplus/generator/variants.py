@@ -0,0 +1,170 @@
+"""
+IDF variants from parameter overrides, generated in a process pool and stored under
+content hashes.
+
+An override set maps "Class" (every object of the class) or "Class/Name" (one object,
+case insensitive) to either a dict of field position -> value, position 0 being the
+name, or a list replacing every field:
+
+    {"Timestep": {0: 4},
+     "RunPeriod/RUNPERIOD 1": {1: 7, 2: 1, 4: 7, 5: 31},
+     "Schedule:Compact/CLGSETP_SCH": ["CLGSETP_SCH", "Temperature", "Through: 12/31", "For: AllDays", "Until: 24:00", "25.0"]}
+
+Overrides apply in order, so a "Class" and a "Class/Name" override setting the same
+field of an object leave the value of the later one. Objects that are not overridden
+are copied byte for byte, comments included.
+"""
+import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..util.fingerprint import data_digest, file_digest
+from ..util.idf_parser import IDF_ENCODING, IDFIndex, IDFObject
+from .training_idf import VARIANT_DIR
+
+Overrides = Dict[str, Union[Dict[int, Any], Sequence[Any]]]
+
+
+def timestep_override(timesteps_per_hour: int) -> Overrides:
+    return {"Timestep": {0: timesteps_per_hour}}
+
+
+def run_period_override(begin_month: int, begin_day: int, end_month: int, end_day: int,
+                        name: Optional[str] = None) -> Overrides:
+    """
+    Run period dates, of the named RunPeriod or of every one.
+    """
+    key = "RunPeriod" if name is None else f"RunPeriod/{name}"
+    return {key: {1: begin_month, 2: begin_day, 4: end_month, 5: end_day}}
+
+
+def run_period_segments(begin_month: int, begin_day: int, end_month: int, end_day: int,
+                        n_shards: Union[int, str] = "months", year: int = 2017) -> List[Tuple[int, int, int, int, int]]:
+    """
+    Split a run period into consecutive segments, at month starts ("months") or into
+    n_shards runs of whole days as equal as possible.
+    Returns:
+        List[Tuple[int, int, int, int, int]]: (begin month, begin day, end month, end day,
+            days from the run period start) of each segment.
+    """
+    begin = datetime.date(year, begin_month, begin_day)
+    end = datetime.date(year, end_month, end_day)
+    if end < begin:
+        raise ValueError("run periods spanning the end of the year are not supported.")
+    n_days = (end - begin).days + 1
+    if n_shards == "months":
+        starts = [0] + [day for day in range(1, n_days) if (begin + datetime.timedelta(days=day)).day == 1]
+    else:
+        n_shards = max(1, min(int(n_shards), n_days))
+        starts = [n_days * k // n_shards for k in range(n_shards)]
+    segments = []
+    for start, stop in zip(starts, starts[1:] + [n_days]):
+        first = begin + datetime.timedelta(days=start)
+        last = begin + datetime.timedelta(days=stop - 1)
+        segments.append((first.month, first.day, last.month, last.day, start))
+    return segments
+
+
+def schedule_override(name: str, value: float, schedule_type: str = "Temperature") -> Overrides:
+    """
+    Replace a schedule by a constant Schedule:Compact of the same name, e.g. a setpoint.
+    """
+    return {f"Schedule:Compact/{name}": [name, schedule_type, "Through: 12/31", "For: AllDays", "Until: 24:00", value]}
+
+
+def normalize_overrides(overrides: Overrides) -> Dict[str, Union[Dict[int, str], List[str]]]:
+    """
+    Overrides with int field positions and str values, the form that is hashed and applied.
+    """
+    normalized: Dict[str, Union[Dict[int, str], List[str]]] = {}
+    for target, fields in overrides.items():
+        if isinstance(fields, dict):
+            normalized[target] = {int(i): "" if value is None else str(value) for i, value in fields.items()}
+        else:
+            normalized[target] = ["" if value is None else str(value) for value in fields]
+    return normalized
+
+
+def variant_key(idf_file: str, overrides: Overrides) -> str:
+    """
+    Content hash of a variant: the base IDF content and the normalized overrides, in
+    the order they apply.
+    """
+    normalized = normalize_overrides(overrides)
+    return data_digest([file_digest(idf_file), [[target, fields if isinstance(fields, list) else sorted(fields.items())]
+                                                for target, fields in normalized.items()]])
+
+
+def format_object(class_name: str, fields: Sequence[str]) -> str:
+    lines = [f"  {class_name},"]
+    lines += [f"    {field}{';' if i == len(fields) - 1 else ','}" for i, field in enumerate(fields)]
+    if not fields:
+        lines[0] = f"  {class_name};"
+    return "\n".join(lines)
+
+
+def write_variant(idf_file: str, overrides: Overrides, out_file: str) -> str:
+    """
+    Write idf_file with overrides applied to out_file, aside and renamed.
+    Raises:
+        ValueError: an override targets no object.
+    """
+    index = IDFIndex(idf_file)
+    # (start, end) -> (object, new fields), so that a class override and an object
+    # override of the same object both apply
+    edited: Dict[Tuple[int, int], Tuple[IDFObject, List[str]]] = {}
+    for target, fields in normalize_overrides(overrides).items():
+        class_name, _, name = target.partition("/")
+        if name:
+            obj = index.get(class_name, name)
+            objects: List[IDFObject] = [obj] if obj is not None else []
+        else:
+            objects = index.objects(class_name)
+        if not objects:
+            raise ValueError(f"override {target} matches no object of {idf_file}.")
+        for obj in objects:
+            current = edited.get((obj.start, obj.end), (obj, list(obj.fields)))[1]
+            if isinstance(fields, list):
+                current = list(fields)
+            else:
+                for i, value in fields.items():
+                    current.extend([""] * (i + 1 - len(current)))
+                    current[i] = value
+            edited[(obj.start, obj.end)] = (obj, current)
+
+    tmp_file = f"{out_file}.{os.getpid()}.tmp"
+    with open(idf_file, "rb") as source, open(tmp_file, "wb") as target:
+        position = 0
+        for (start, end), (obj, fields) in sorted(edited.items(), key=lambda item: item[0]):
+            target.write(source.read(start - position))
+            target.write(format_object(obj.class_name, fields).encode(IDF_ENCODING))
+            source.seek(end)
+            position = end
+        target.write(source.read())
+    os.replace(tmp_file, out_file)
+    return out_file
+
+
+def generate_variants(idf_file: str, overrides_list: Sequence[Overrides], cache_dir: str = VARIANT_DIR,
+                      max_workers: Optional[int] = None) -> List[str]:
+    """
+    Variants of idf_file, one per override set, in order. Variants already in cache_dir
+    are reused, the missing ones are written by a process pool.
+    Returns:
+        List[str]: variant IDF files.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    out_files = [os.path.join(cache_dir, variant_key(idf_file, overrides) + ".idf") for overrides in overrides_list]
+    missing = {out_file: overrides for out_file, overrides in zip(out_files, overrides_list)
+               if not os.path.exists(out_file)}
+    if len(missing) == 1 or max_workers == 1:
+        for out_file, overrides in missing.items():
+            write_variant(idf_file, overrides, out_file)
+    elif missing:
+        with ProcessPoolExecutor(max_workers=min(len(missing), max_workers or os.cpu_count() or 1)) as pool:
+            futures = [pool.submit(write_variant, idf_file, overrides, out_file)
+                       for out_file, overrides in missing.items()]
+            for future in futures:
+                future.result()
+    return out_files
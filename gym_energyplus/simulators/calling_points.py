@@ -0,0 +1,104 @@
+"""
+Declarative registry of the EnergyPlus calling points used by a simulator.
+"""
+from typing import Callable, Dict, List, Optional
+
+# calling point -> pyenergyplus runtime registration method
+CALLING_POINTS = {
+    # once, after the input file is processed
+    "after_component_get_input": "callback_after_component_get_input",
+    # once at the start of each environment period: sizing periods, design days and run periods
+    "begin_new_environment": "callback_begin_new_environment",
+    # after the warmup days of each environment period
+    "after_new_environment_warmup_complete": "callback_after_new_environment_warmup_complete",
+    # zone timestep start, before/after heat balance init: envelope, shades, internal gains, weather data
+    "begin_zone_timestep_before_set_current_weather": "callback_begin_zone_timestep_before_set_current_weather",
+    "begin_zone_timestep_before_init_heat_balance": "callback_begin_zone_timestep_before_init_heat_balance",
+    "begin_zone_timestep_after_init_heat_balance": "callback_begin_zone_timestep_after_init_heat_balance",
+    # system timestep start, before the zone loads are predicted
+    "begin_system_timestep_before_predictor": "callback_begin_system_timestep_before_predictor",
+    # after the predictor, before/after SetpointManager and AvailabilityManager models
+    "after_predictor_before_hvac_managers": "callback_after_predictor_before_hvac_managers",
+    "after_predictor_after_hvac_managers": "callback_after_predictor_after_hvac_managers",
+    # inside the HVAC system iteration loop
+    "inside_system_iteration_loop": "callback_inside_system_iteration_loop",
+    # end of system/zone timestep, after reporting
+    "end_system_timestep_before_hvac_reporting": "callback_end_system_timestep_before_hvac_reporting",
+    "end_system_timestep_after_hvac_reporting": "callback_end_system_timestep_after_hvac_reporting",
+    "end_zone_timestep_before_zone_reporting": "callback_end_zone_timestep_before_zone_reporting",
+    "end_zone_timestep_after_zone_reporting": "callback_end_zone_timestep_after_zone_reporting",
+    # simulation progress, called with the percentage instead of the state
+    "progress": "callback_progress",
+}
+
+
+class CallingPointRegistry:
+
+    def __init__(self) -> None:
+        """
+        Sensor reads, actuator writes and user hooks declare the calling point they need;
+        `install` then registers one dispatcher per used calling point only, since each
+        registered point costs a C -> Python transition every time EnergyPlus reaches it.
+        """
+        self._handlers: Dict[str, List[Callable]] = {}
+        self.transitions: Dict[str, int] = {}
+
+    def register(self, calling_point: str, handler: Callable) -> None:
+        """
+        Declare a handler called with the calling point argument (the state, or the
+        percentage for "progress"). Handlers of a point run in registration order.
+        """
+        if calling_point not in CALLING_POINTS:
+            raise ValueError(f"unknown calling point {calling_point}, expected one of {list(CALLING_POINTS)}.")
+        self._handlers.setdefault(calling_point, []).append(handler)
+
+    def unregister(self, calling_point: str, handler: Callable) -> None:
+        handlers = self._handlers.get(calling_point, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self._handlers.pop(calling_point, None)
+
+    @property
+    def calling_points(self) -> List[str]:
+        """
+        Calling points with at least one handler.
+        """
+        return list(self._handlers)
+
+    @property
+    def total_transitions(self) -> int:
+        return sum(self.transitions.values())
+
+    def install(self, runtime, state, wrap: Optional[Callable[[str, Callable], Callable]] = None) -> None:
+        """
+        Register the used calling points to an EnergyPlus state, resetting the counts.
+        Args:
+            runtime: pyenergyplus api runtime.
+            state: EnergyPlus API state.
+            wrap (Callable, optional): applied as wrap(calling_point, dispatcher) before
+                registration, e.g. for profiling.
+        """
+        self.transitions = {}
+        for calling_point, handlers in self._handlers.items():
+            dispatcher = self._make_dispatcher(calling_point, tuple(handlers))
+            if wrap is not None:
+                dispatcher = wrap(calling_point, dispatcher)
+            getattr(runtime, CALLING_POINTS[calling_point])(state, dispatcher)
+
+    def _make_dispatcher(self, calling_point: str, handlers) -> Callable:
+        transitions = self.transitions
+        transitions[calling_point] = 0
+        if len(handlers) == 1:
+            handler = handlers[0]
+
+            def dispatch(argument):
+                transitions[calling_point] += 1
+                handler(argument)
+        else:
+            def dispatch(argument):
+                transitions[calling_point] += 1
+                for handler in handlers:
+                    handler(argument)
+        dispatch.__name__ = calling_point
+        return dispatch
@@ -0,0 +1,63 @@
+"""
+Simulation clock read once per published timestep.
+"""
+from typing import Any, Dict
+
+
+class ClockSnapshot:
+
+    FIELDS = ("year", "month", "day", "hour", "minute", "day_of_week", "day_of_year", "sim_time", "warmup")
+
+    __slots__ = FIELDS
+
+    def __init__(self, year: int = 0, month: int = 0, day: int = 0, hour: int = 0, minute: int = 0,
+                 day_of_week: int = 0, day_of_year: int = 0, sim_time: float = 0.0, warmup: bool = False) -> None:
+        """
+        Calendar and simulation time of one timestep, shared by the info dict, rewards and
+        wrappers so that none of them queries the EnergyPlus clock again.
+        Args:
+            year (int): simulation year.
+            month (int): month (1-12).
+            day (int): day of the month (1-31).
+            hour (int): hour of the day (0-23).
+            minute (int): minutes into the hour (1-60).
+            day_of_week (int): day of the week (1-7, sunday = 1).
+            day_of_year (int): day of the year (1-366).
+            sim_time (float): cumulative simulation time from the start of the environment, in hours.
+            warmup (bool): whether the timestep belongs to the warmup period.
+        """
+        self.year = year
+        self.month = month
+        self.day = day
+        self.hour = hour
+        self.minute = minute
+        self.day_of_week = day_of_week
+        self.day_of_year = day_of_year
+        self.sim_time = sim_time
+        self.warmup = warmup
+
+    @classmethod
+    def read(cls, exchange, state_argument) -> "ClockSnapshot":
+        """
+        Read all the clock fields of the current timestep.
+        Args:
+            exchange: EnergyPlus api exchange.
+            state_argument: EnergyPlus API state.
+        """
+        return cls(
+            exchange.year(state_argument),
+            exchange.month(state_argument),
+            exchange.day_of_month(state_argument),
+            exchange.hour(state_argument),
+            exchange.minutes(state_argument),
+            exchange.day_of_week(state_argument),
+            exchange.day_of_year(state_argument),
+            exchange.current_sim_time(state_argument),
+            bool(exchange.warmup_flag(state_argument))
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self) -> str:
+        return f"ClockSnapshot({', '.join(f'{field}={getattr(self, field)!r}' for field in self.FIELDS)})"
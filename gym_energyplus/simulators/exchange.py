@@ -0,0 +1,169 @@
+"""
+Single-slot hand-off between the EnergyPlus simulation thread and the agent.
+"""
+import threading
+from enum import Enum
+from typing import Any, Optional, Tuple
+
+
+class SimulationStatus(Enum):
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+    CLOSED = "closed"
+
+
+class StepMailbox:
+
+    def __init__(self) -> None:
+        """
+        One condition-guarded mailbox holding the next observation, its info and the
+        pending action, plus the state of the simulation feeding it.
+
+        The simulator thread publishes one (obs, info) pair per step and blocks until the
+        agent has taken the previous one; actions are picked up without blocking, so a
+        timestep without a new action keeps the previous actuator values.
+        """
+        self._cond = threading.Condition(threading.Lock())
+        self._obs: Any = None
+        self._info: Optional[dict] = None
+        self._has_obs: bool = False
+        self._action: Any = None
+        self._has_action: bool = False
+        self.status: SimulationStatus = SimulationStatus.RUNNING
+
+    # ------------------ simulator side ------------------ #
+
+    def publish(self, obs: Any, info: dict) -> bool:
+        """
+        Hand an observation and its info to the agent, waiting until the slot is free.
+        Returns:
+            bool: False if the mailbox stopped running, the pair was not delivered.
+        """
+        with self._cond:
+            while self._has_obs and self.status is SimulationStatus.RUNNING:
+                self._cond.wait()
+            if self.status is not SimulationStatus.RUNNING:
+                return False
+            self._obs = obs
+            self._info = info
+            self._has_obs = True
+            self._cond.notify_all()
+            return True
+
+    def take_action(self) -> Any:
+        """
+        Pop the pending action without blocking.
+        Returns:
+            Any: the action, or None if the agent has not sent a new one.
+        """
+        # unlocked fast path: most timesteps of a waiting simulator find no action
+        if not self._has_action:
+            return None
+        with self._cond:
+            action = self._action
+            self._action = None
+            self._has_action = False
+            return action
+
+    def wait_action(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the agent's next action.
+        Returns:
+            Any: the action, or None if the mailbox stopped running or the timeout expired.
+        """
+        with self._cond:
+            if not self._has_action and self.status is SimulationStatus.RUNNING:
+                self._cond.wait_for(
+                    lambda: self._has_action or self.status is not SimulationStatus.RUNNING, timeout)
+            if not self._has_action:
+                return None
+            action = self._action
+            self._action = None
+            self._has_action = False
+            return action
+
+    def finish(self) -> None:
+        """
+        Mark the simulation as completed and wake up any waiting agent.
+        """
+        self._set_status(SimulationStatus.FINISHED)
+
+    def fail(self) -> None:
+        """
+        Mark the simulation as failed and wake up any waiting agent.
+        """
+        self._set_status(SimulationStatus.FAILED)
+
+    # ------------------ agent side ------------------ #
+
+    def put_action(self, action: Any) -> None:
+        """
+        Send an action to the simulator, replacing any action not yet taken.
+        """
+        with self._cond:
+            self._action = action
+            self._has_action = True
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[Any, dict]]:
+        """
+        Wait for the next (obs, info) pair.
+        Args:
+            timeout (float, optional): max seconds to wait, None waits forever.
+        Returns:
+            Optional[Tuple[Any, dict]]: the pair, or None if the simulation ended, failed or
+                the timeout expired; `status` tells which.
+        """
+        with self._cond:
+            return self._receive(timeout)
+
+    def step(self, action: Any, timeout: Optional[float] = None) -> Optional[Tuple[Any, dict]]:
+        """
+        Send an action and wait for the next (obs, info) pair in one lock round.
+        """
+        with self._cond:
+            self._action = action
+            self._has_action = True
+            self._cond.notify_all()
+            return self._receive(timeout)
+
+    def _receive(self, timeout: Optional[float]) -> Optional[Tuple[Any, dict]]:
+        # caller holds the lock
+        if not self._has_obs and self.status is SimulationStatus.RUNNING:
+            self._cond.wait_for(
+                lambda: self._has_obs or self.status is not SimulationStatus.RUNNING, timeout)
+        if not self._has_obs:
+            return None
+        received = (self._obs, self._info)
+        self._obs = None
+        self._info = None
+        self._has_obs = False
+        self._cond.notify_all()
+        return received
+
+    # ------------------ lifecycle ------------------ #
+
+    def close(self) -> None:
+        """
+        Stop the hand-off: a simulator blocked in `publish` returns and stops delivering.
+        """
+        self._set_status(SimulationStatus.CLOSED)
+
+    def clear(self) -> None:
+        """
+        Drop any pending observation and action and set the mailbox running again.
+        """
+        with self._cond:
+            self._obs = None
+            self._info = None
+            self._has_obs = False
+            self._action = None
+            self._has_action = False
+            self.status = SimulationStatus.RUNNING
+            self._cond.notify_all()
+
+    def _set_status(self, status: SimulationStatus) -> None:
+        with self._cond:
+            self.status = status
+            self._cond.notify_all()
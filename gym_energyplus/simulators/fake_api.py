@@ -0,0 +1,317 @@
+"""
+Pure-Python stand-in for pyenergyplus.api, driving the registered callbacks with a
+synthetic simulation so that the Python side of the env loop runs without EnergyPlus.
+"""
+import datetime
+import math
+import os
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..util.idf_parser import load_index
+from .calling_points import CALLING_POINTS
+
+# calling points of one zone timestep, in EnergyPlus order
+ZONE_TIMESTEP_POINTS = (
+    "begin_zone_timestep_before_set_current_weather",
+    "begin_zone_timestep_before_init_heat_balance",
+    "begin_zone_timestep_after_init_heat_balance",
+    "begin_system_timestep_before_predictor",
+    "after_predictor_before_hvac_managers",
+    "after_predictor_after_hvac_managers",
+    "inside_system_iteration_loop",
+    "end_system_timestep_before_hvac_reporting",
+    "end_system_timestep_after_hvac_reporting",
+    "end_zone_timestep_before_zone_reporting",
+    "end_zone_timestep_after_zone_reporting",
+)
+
+
+class FakeState:
+
+    def __init__(self) -> None:
+        """
+        One simulation: registered callbacks, clock, actuator values and flags.
+        """
+        self.callbacks: Dict[str, List[Callable]] = {}
+        self.actuators: Dict[int, float] = {}
+        self.data_ready = False
+        self.warmup = False
+        self.stop = False
+        self.year = 2017
+        self.month = 1
+        self.day = 1
+        self.hour = 0
+        self.minutes = 0
+        self.day_of_week = 1
+        self.day_of_year = 1
+        self.sim_time = 0.0
+        self.time_step_number = 1
+
+
+class FakeStateManager:
+
+    def __init__(self, api: "FakeEnergyPlusAPI") -> None:
+        self._api = api
+
+    def new_state(self) -> FakeState:
+        state = FakeState()
+        self._api.states.append(state)
+        return state
+
+    def reset_state(self, state: FakeState) -> None:
+        state.__init__()
+
+    def delete_state(self, state: FakeState) -> None:
+        # EnergyPlus frees the state: a second delete is a double free
+        if state not in self._api.states:
+            raise RuntimeError("delete_state called on a state that was already deleted or never created.")
+        self._api.states.remove(state)
+
+
+class FakeRuntime:
+
+    def __init__(self, api: "FakeEnergyPlusAPI") -> None:
+        self._api = api
+
+    def set_console_output_status(self, state: FakeState, print_output: bool) -> None:
+        pass
+
+    def clear_callbacks(self) -> None:
+        # as in EnergyPlus, callbacks of every state are cleared
+        for state in self._api.states:
+            state.callbacks.clear()
+
+    def stop_simulation(self, state: FakeState) -> None:
+        state.stop = True
+
+    def run_energyplus(self, state: FakeState, command_line_args: List[str]) -> int:
+        """
+        Run the synthetic simulation: input processing, warmup days and the run period,
+        calling the registered callbacks at each zone timestep.
+        Returns:
+            int: exit code, 0.
+        """
+        if "-d" in command_line_args:
+            os.makedirs(command_line_args[command_line_args.index("-d") + 1], exist_ok=True)
+        start, run_days = None, None
+        if self._api.read_run_period and command_line_args and os.path.exists(command_line_args[-1]):
+            run_periods = load_index(command_line_args[-1]).run_periods()
+            if run_periods:
+                period = run_periods[0]
+                year = period["begin_year"] or self._api.start.year
+                start = datetime.date(year, period["begin_month"], period["begin_day"])
+                run_days = (datetime.date(year, period["end_month"], period["end_day"]) - start).days + 1
+        self._api.simulate(state, start, run_days)
+        return 0
+
+
+def _registrar(calling_point: str) -> Callable[[FakeRuntime, FakeState, Callable], None]:
+    def register(self, state: FakeState, f: Callable) -> None:
+        state.callbacks.setdefault(calling_point, []).append(f)
+    register.__name__ = CALLING_POINTS[calling_point]
+    return register
+
+
+for _calling_point, _method in CALLING_POINTS.items():
+    setattr(FakeRuntime, _method, _registrar(_calling_point))
+
+
+class FakeExchange:
+
+    def __init__(self, api: "FakeEnergyPlusAPI") -> None:
+        self._api = api
+        self._handles: Dict[Tuple[str, ...], int] = {}
+
+    def _handle(self, *key: str) -> int:
+        # stable across states, processes and query orders, as handles of the same model are
+        key = tuple(str(part).upper() for part in key)
+        return self._handles.setdefault(key, zlib.crc32("/".join(key).encode("utf-8")) & 0x7FFFFFFF)
+
+    # handles
+    def api_data_fully_ready(self, state: FakeState) -> bool:
+        return state.data_ready
+
+    def list_available_api_data_csv(self, state: FakeState) -> bytes:
+        lines = ["**KIND**,**NAME**,**KEY**"] + [",".join(key) for key in self._handles]
+        return "\n".join(lines).encode("utf-8")
+
+    def get_variable_handle(self, state: FakeState, variable_name: str, variable_key: str) -> int:
+        return self._handle("variable", variable_name, variable_key)
+
+    def get_meter_handle(self, state: FakeState, meter_name: str) -> int:
+        return self._handle("meter", meter_name)
+
+    def get_actuator_handle(self, state: FakeState, component_type: str, control_type: str, actuator_key: str) -> int:
+        return self._handle("actuator", component_type, control_type, actuator_key)
+
+    def get_internal_variable_handle(self, state: FakeState, variable_name: str, variable_key: str) -> int:
+        return self._handle("internal", variable_name, variable_key)
+
+    # values: a daily sine per handle, phase shifted by the handle
+    def get_variable_value(self, state: FakeState, variable_handle: int) -> float:
+        return 20.0 + 5.0 * math.sin(state.sim_time * (2 * math.pi / 24) + variable_handle)
+
+    def get_meter_value(self, state: FakeState, meter_handle: int) -> float:
+        return 1e6 * (1.0 + math.sin(state.sim_time * (2 * math.pi / 24) + meter_handle))
+
+    def get_internal_variable_value(self, state: FakeState, variable_handle: int) -> float:
+        return float(variable_handle)
+
+    def get_actuator_value(self, state: FakeState, actuator_handle: int) -> float:
+        return state.actuators.get(actuator_handle, 0.0)
+
+    def set_actuator_value(self, state: FakeState, actuator_handle: int, actuator_value: float) -> None:
+        state.actuators[actuator_handle] = actuator_value
+
+    # clock
+    def warmup_flag(self, state: FakeState) -> bool:
+        return state.warmup
+
+    def year(self, state: FakeState) -> int:
+        return state.year
+
+    def month(self, state: FakeState) -> int:
+        return state.month
+
+    def day_of_month(self, state: FakeState) -> int:
+        return state.day
+
+    def hour(self, state: FakeState) -> int:
+        return state.hour
+
+    def minutes(self, state: FakeState) -> int:
+        return state.minutes
+
+    def day_of_week(self, state: FakeState) -> int:
+        return state.day_of_week
+
+    def day_of_year(self, state: FakeState) -> int:
+        return state.day_of_year
+
+    def current_sim_time(self, state: FakeState) -> float:
+        return state.sim_time
+
+    def current_time(self, state: FakeState) -> float:
+        return state.hour + state.minutes / 60.0
+
+    def num_time_steps_in_hour(self, state: FakeState) -> int:
+        return self._api.timesteps_per_hour
+
+    def zone_time_step(self, state: FakeState) -> float:
+        return 1.0 / self._api.timesteps_per_hour
+
+    def zone_time_step_number(self, state: FakeState) -> int:
+        return state.time_step_number
+
+
+class FakeEnergyPlusAPI:
+
+    def __init__(self,
+        run_days: int = 365,
+        timesteps_per_hour: int = 1,
+        warmup_days: int = 6,
+        system_iterations: int = 1,
+        timestep_delay: float = 0.0,
+        start: Tuple[int, int, int] = (2017, 1, 1),
+        read_run_period: bool = False,
+        ) -> None:
+        """
+        Drop-in replacement of pyenergyplus.api.EnergyPlusAPI with `runtime`, `exchange`
+        and `state_manager`, for measuring the Python-side cost of the env loop.
+
+        A run processes the input, then runs `warmup_days` days with the warmup flag set
+        and `run_days` days of `timesteps_per_hour` zone timesteps, calling the registered
+        callbacks of every zone timestep calling point in EnergyPlus order. Sensors return
+        synthetic values and actuators keep the last value set.
+        Args:
+            run_days (int): days of the run period. Defaults to 365.
+            timesteps_per_hour (int): zone timesteps per hour. Defaults to 1.
+            warmup_days (int): warmup days before the run period. Defaults to 6.
+            system_iterations (int): calls of the inside_system_iteration_loop point per timestep.
+            timestep_delay (float): seconds slept per zone timestep, standing for the physics.
+            start (Tuple[int, int, int]): first day of the run period (year, month, day).
+            read_run_period (bool): take the run period from the first RunPeriod of the IDF
+                file run, when it exists, instead of start and run_days.
+        """
+        self.run_days = run_days
+        self.timesteps_per_hour = timesteps_per_hour
+        self.warmup_days = warmup_days
+        self.system_iterations = system_iterations
+        self.timestep_delay = timestep_delay
+        self.start = datetime.date(*start)
+        self.read_run_period = read_run_period
+        self.states: List[FakeState] = []
+        self.state_manager = FakeStateManager(self)
+        self.runtime = FakeRuntime(self)
+        self.exchange = FakeExchange(self)
+
+    @staticmethod
+    def api_version() -> str:
+        return "fake"
+
+    def simulate(self, state: FakeState, start: Optional[datetime.date] = None, run_days: Optional[int] = None) -> None:
+        start = start or self.start
+        run_days = run_days or self.run_days
+        callbacks = state.callbacks
+        self._call(callbacks, "after_component_get_input", state)
+        state.data_ready = True
+        self._call(callbacks, "begin_new_environment", state)
+
+        state.warmup = True
+        for _ in range(self.warmup_days):
+            # warmup repeats the first day of the run period
+            if not self._run_day(state, start, 0):
+                return
+        state.warmup = False
+        self._call(callbacks, "after_new_environment_warmup_complete", state)
+
+        percent = -1
+        for day in range(run_days):
+            date = start + datetime.timedelta(days=day)
+            if not self._run_day(state, date, day * 24.0):
+                return
+            progress = int(100 * (day + 1) / run_days)
+            if progress != percent:
+                percent = progress
+                for f in callbacks.get("progress", ()):
+                    f(percent)
+
+    def _run_day(self, state: FakeState, date: datetime.date, day_start: float) -> bool:
+        """
+        Zone timesteps of one day.
+        Returns:
+            bool: False if the simulation was stopped.
+        """
+        state.year, state.month, state.day = date.year, date.month, date.day
+        # EnergyPlus weeks start on sunday = 1
+        state.day_of_week = date.isoweekday() % 7 + 1
+        state.day_of_year = date.timetuple().tm_yday
+        n = self.timesteps_per_hour
+        # registered callbacks of the timestep points, looked up once a day
+        points = []
+        for point in ZONE_TIMESTEP_POINTS:
+            functions = state.callbacks.get(point)
+            if functions:
+                repeat = self.system_iterations if point == "inside_system_iteration_loop" else 1
+                points.extend([functions] * repeat)
+        for hour in range(24):
+            for step in range(1, n + 1):
+                if state.stop:
+                    return False
+                state.hour = hour
+                state.time_step_number = step
+                state.minutes = step * 60 // n
+                state.sim_time = day_start + hour + step / n
+                if self.timestep_delay:
+                    time.sleep(self.timestep_delay)
+                for functions in points:
+                    for f in functions:
+                        f(state)
+        return True
+
+    @staticmethod
+    def _call(callbacks: Dict[str, List[Callable]], calling_point: str, argument: Any) -> None:
+        for f in callbacks.get(calling_point, ()):
+            f(argument)
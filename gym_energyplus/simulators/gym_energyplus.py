@@ -1,41 +1,86 @@
 import numpy as np
 from typing import Any, Dict, List, Optional, Tuple
-from queue import Queue
+import inspect
 import threading
+import time
 import logging
 # import gymnasium as gym
 import json
 import sys
 import os
 # from gymnasium import spaces
-from queue import Queue
-from typing import Dict, Any
 from ..util.constant import ENERGYPLUS_DIR
 from ..util.logger import Logger
+from ..util.profiler import CallbackProfiler
 from ..generator.generator import Generator
-sys.path.append(ENERGYPLUS_DIR)
-import pyenergyplus.api
+from .calling_points import CallingPointRegistry
+from .clock import ClockSnapshot
+from .exchange import StepMailbox
+from .handle_cache import HandleCache, energyplus_build
+from .read_plan import ObservationReducer, ReadPlan
+if ENERGYPLUS_DIR:
+    sys.path.append(ENERGYPLUS_DIR)
+try:
+    import pyenergyplus.api
+except ImportError:
+    # an api object (e.g. FakeEnergyPlusAPI) must then be passed to GymEnergyPlus
+    pyenergyplus = None
+
+
+def clears_all_states(runtime) -> bool:
+    """
+    Whether runtime.clear_callbacks() clears the callbacks of every state of the process.
+    The pyenergyplus one takes no state and empties the callbacks of all states, as the
+    fake api does. An api whose clear_callbacks takes a state clears that state only, and
+    deleting a state already drops its callbacks, so there is nothing to clear.
+    """
+    try:
+        return not inspect.signature(runtime.clear_callbacks).parameters
+    except (TypeError, ValueError):
+        return True
 
 
 class GymEnergyPlus:
 
-    def __init__(self, logger, generator:Generator, obs_queue: Queue, info_queue:Queue, act_queue:Queue):
+    def __init__(self, logger, generator:Generator, mailbox: StepMailbox, name: str = "eplus",
+                 handle_cache: Optional[HandleCache] = None, decision_interval: int = 1,
+                 reductions: Optional[Dict[str, str]] = None, profiler: Optional[CallbackProfiler] = None,
+                 api=None):
         """
         Init the EnergyPlus Simutation environment.
-        """
-        self.name = "eplus"
+        Args:
+            name (str): simulator name, used as thread name and episode output dir prefix.
+            handle_cache (HandleCache, optional): persistent cache of resolved handles, reused
+                across episodes and processes running the same model and configuration.
+            decision_interval (int): number of zone timesteps per agent step. With k > 1 the
+                observations of k timesteps are reduced into the one published, and each
+                action is held for the next k timesteps.
+            reductions (Dict[str, str], optional): reduction rule ("mean", "sum" or "last") by
+                observation name, used when decision_interval > 1. Meters default to "sum",
+                everything else to "last".
+            profiler (CallbackProfiler, optional): records callback and mailbox wait times.
+                Disabled by default.
+            api (optional): EnergyPlus api object with `runtime`, `exchange` and
+                `state_manager`, e.g. a FakeEnergyPlusAPI. Defaults to pyenergyplus.
+        """
+        self.name = name
         self.logger:logging = logger
 
-        # gym communication queue
-        self.obs_queue = obs_queue
-        self.info_queue = info_queue
-        self.act_queue = act_queue
-        self.warmup_queue =Queue(maxsize=1)
+        # gym communication mailbox
+        self.mailbox = mailbox
+        # set once the warmup of the run period is complete
+        self.warmup_event = threading.Event()
 
         # api
-        self.api_version = pyenergyplus.api.EnergyPlusAPI.api_version()
-        self.api_path = pyenergyplus.api.api_path()
-        self.api = pyenergyplus.api.EnergyPlusAPI()
+        if api is None:
+            if pyenergyplus is None:
+                raise ImportError("pyenergyplus not found, set ENERGYPLUS_DIR or pass an api object.")
+            api = pyenergyplus.api.EnergyPlusAPI()
+            self.api_path = pyenergyplus.api.api_path()
+        else:
+            self.api_path = None
+        self.api = api
+        self.api_version = api.api_version()
 
         # generator
         self.generator:Generator = generator
@@ -46,6 +91,10 @@ class GymEnergyPlus:
         # set count value
         self.episode: int = 0
         self.timestep: int = 0
+        self.progress: int = 0
+
+        # output dir of the current episode
+        self.current_path: Optional[str] = None
 
         # Simulation thread
         self.energyplus_thread: Optional[threading.Thread] = None
@@ -62,6 +111,36 @@ class GymEnergyPlus:
         self.actuator_handlers: Optional[Dict[str, int]] = None
         self.internal_var_handlers: Optional[Dict[str, int]] = None
 
+        # compiled observation read plan, built once handlers are resolved
+        self.read_plan: Optional[ReadPlan] = None
+
+        # api data catalog, dumped once per process when handles are resolved
+        self.available_data: Optional[str] = None
+
+        # handle cache, keyed by the EnergyPlus build
+        self.handle_cache = handle_cache
+        self.handle_cache_key: Optional[str] = None
+        if handle_cache is not None:
+            self.energyplus_build = energyplus_build(api, self.api_path, generator.idd_file)
+            if self.energyplus_build is None:
+                self.logger.warning("Energy+.idd of the EnergyPlus install not found, handle cache disabled.")
+                self.handle_cache = None
+
+        # decision interval
+        if decision_interval < 1:
+            raise ValueError(f"decision_interval must be >= 1, got {decision_interval}.")
+        self.decision_interval = decision_interval
+        self.reductions: Dict[str, str] = dict(reductions or {})
+        self.reducer: Optional[ObservationReducer] = None
+        self._await_action = False
+
+        # instrumentation
+        self.profiler = profiler if profiler is not None else CallbackProfiler()
+
+        # calling points registered at each episode
+        self.calling_points = CallingPointRegistry()
+        self._declare_calling_points()
+
     def _init_handlers(self, state_argument) -> None:
         """
         initialize sensors/actuators handlers to interact with during simulation.
@@ -69,6 +148,12 @@ class GymEnergyPlus:
         state_argument (int): Energyplus API state.
         """
         if self.api.exchange.api_data_fully_ready(state_argument) and not self.initialized_handlers:
+            if self._load_cached_handlers(state_argument):
+                self._compile_read_plan()
+                self.logger.info("handlers are ready (cached).")
+                self.initialized_handlers = True
+                return
+
             if self.var_handlers is None or self.actuator_handlers is None \
                 or self.meter_handlers is None or self.internal_var_handlers is None: 
             # Save available_data information
@@ -77,7 +162,7 @@ class GymEnergyPlus:
 
                 # write available_data.csv in parent output_path
                 data = self.available_data.splitlines()
-                with open(self.generator.current_path + '/data_available.txt', "w") as txt_file:
+                with open(self.current_path + '/data_available.txt', "w") as txt_file:
                     txt_file.writelines([line + '\n' for line in data])
 
             # Get variable handlers. using variables info
@@ -122,51 +207,85 @@ class GymEnergyPlus:
                     raise Exception(f"internal variable handler: {internal_var_name} is not an available internal variable.")
                 
             self.logger.info("got all handle successfully.")
+            self._save_cached_handlers()
+            self._compile_read_plan()
             self.logger.info("handlers are ready.")
             self.initialized_handlers = True
+
+    def _load_cached_handlers(self, state_argument) -> bool:
+        """
+        Take the handle maps from the handle cache, skipping the api data catalog dump and
+        the handle resolution. The first handle of each kind is resolved again as a cheap
+        check that the cached entry matches the running model.
+        Returns:
+            bool: True if the cached handlers are in use.
+        """
+        if self.handle_cache is None or self.handle_cache_key is None:
+            return False
+        cached = self.handle_cache.load(self.handle_cache_key)
+        if cached is None:
+            return False
+        exchange = self.api.exchange
+        resolvers = [
+            ("var_handlers", self.generator.variables, lambda conf: exchange.get_variable_handle(
+                state_argument, conf["variable_name"], conf["variable_key"])),
+            ("meter_handlers", self.generator.meters, lambda conf: exchange.get_meter_handle(
+                state_argument, conf["meter_name"])),
+            ("actuator_handlers", self.generator.actuators, lambda conf: exchange.get_actuator_handle(
+                state_argument, conf["component_type"], conf["control_type"], conf["actuator_type"])),
+            ("internal_var_handlers", self.generator.internal_variables, lambda conf: exchange.get_internal_variable_handle(
+                state_argument, conf["variable_name"], conf["variable_key"]))
+        ]
+        for kind, configured, resolve in resolvers:
+            handlers = cached[kind]
+            if list(handlers.keys()) != list(configured.keys()):
+                return False
+            if configured:
+                key, conf = next(iter(configured.items()))
+                if resolve(conf) != handlers[key]:
+                    self.logger.warning(f"handle cache entry {self.handle_cache_key} is stale, resolving handlers.")
+                    return False
+        self.var_handlers = cached["var_handlers"]
+        self.meter_handlers = cached["meter_handlers"]
+        self.actuator_handlers = cached["actuator_handlers"]
+        self.internal_var_handlers = cached["internal_var_handlers"]
+        return True
+
+    def _save_cached_handlers(self) -> None:
+        """
+        Store the resolved handle maps, and the api data catalog when dumped in this episode.
+        """
+        if self.handle_cache is None or self.handle_cache_key is None:
+            return
+        self.handle_cache.save(
+            self.handle_cache_key,
+            {
+                "var_handlers": self.var_handlers,
+                "meter_handlers": self.meter_handlers,
+                "actuator_handlers": self.actuator_handlers,
+                "internal_var_handlers": self.internal_var_handlers
+            },
+            self.available_data
+        )
+
+    def _compile_read_plan(self) -> None:
+        """
+        Freeze the resolved handlers into a read plan, keeping the observation order:
+        variables, meters, internal variables and actuators.
+        """
+        exchange = self.api.exchange
+        self.read_plan = ReadPlan([
+            (self.var_handlers, exchange.get_variable_value),
+            (self.meter_handlers, exchange.get_meter_value),
+            (self.internal_var_handlers, exchange.get_internal_variable_value),
+            (self.actuator_handlers, exchange.get_actuator_value)
+        ])
+        if self.decision_interval > 1:
+            rules = {name: "sum" for name in self.meter_handlers}
+            rules.update(self.reductions)
+            self.reducer = ObservationReducer(self.read_plan.names, self.decision_interval, rules)
         
 
-    def _get_variable_value(self, key:str, state_argument):
-        try:
-            assert self.initialized_handlers
-            assert self.system_ready
-            assert key in self.var_handlers.keys()
-        except AssertionError as err:
-            self.logger.warning(f"get variable {key} error.")
-            sys.exit(1)
-        return self.api.exchange.get_variable_value(state_argument, self.var_handlers[key])
-    
-    def _get_actuator_value(self, key:str, state_argument):
-        try:
-            assert self.initialized_handlers
-            assert self.system_ready
-            assert key in self.actuator_handlers.keys()
-        except AssertionError as err:
-            self.logger.warning(f"get actuator {key} error.")
-            sys.exit(1)
-        return self.api.exchange.get_actuator_value(state_argument, self.actuator_handlers[key])
-    
-    def _get_meter_value(self, key:str, state_argument):
-        try:
-            assert self.initialized_handlers
-            assert self.system_ready
-            assert key in self.meter_handlers.keys()
-        except AssertionError as err:
-            self.logger.warning(f"get meter {key} error.")
-            sys.exit(1)
-
-        return self.api.exchange.get_meter_value(state_argument, self.meter_handlers[key])
-    
-    def _get_internal_var_value(self, key:str, state_argument):
-        try:
-            assert self.initialized_handlers
-            assert self.system_ready
-            assert key in self.internal_var_handlers.keys()
-        except AssertionError as err:
-            self.logger.warning(f"get internal value {key} error.")
-            sys.exit(1)
-        return self.api.exchange.get_internal_variable_value(state_argument, self.internal_var_handlers[key])
-    
     def _init_system(self, state_argument):
         """
         Indicate wheather the system are ready to work.
@@ -181,9 +300,12 @@ class GymEnergyPlus:
             if self.system_ready:
                 self.logger.info("System is ready.")
 
-    def reset(self, seed=None, options=None):
+    def reset(self, seed=None, options=None, episode: Optional[int] = None):
         """
         resets an existing state instance, thus resetting the simulation, including any registered callback functions.
+        Args:
+            episode (int, optional): episode number naming the output dir, overriding the
+                simulator's own count when several simulators share a generator.
         """
         if self.is_running:
             self.stop()
@@ -197,10 +319,17 @@ class GymEnergyPlus:
         self.initialized_handlers = False
         self.simulation_complete = False
         self.timestep = 0
+        self.progress = 0
+        self.reducer = None
+        self._await_action = False
         self._flush_queue()
         self.set_callback()
         # make a new output dir
-        self.generator.make_new_out_dir(self.name, self.episode)
+        if episode is not None:
+            self.episode = episode
+        self.current_path = self.generator.make_new_out_dir(self.name, self.episode)
+        if self.handle_cache is not None:
+            self.handle_cache_key = self.handle_cache.key(self.generator, self.energyplus_build)
         self.logger.info("Finish reset.")
     
     
@@ -218,41 +347,41 @@ class GymEnergyPlus:
         if not self.system_ready:
             return
         
-        # obtain observation 
-        self.next_obs = {
-            # variables
-            **{
-                key: self._get_variable_value(key, state_argument)
-                for key, handle in self.var_handlers.items()
-            },
-            # meter
-            **{
-                key: self._get_meter_value(key, state_argument)
-                for key, handle in self.meter_handlers.items()
-            },
-            # internal variables
-            **{
-                key: self._get_internal_var_value(key, state_argument)
-                for key, handle in self.internal_var_handlers.items()
-            },
-            # actuator value
-            **{
-                key: self._get_actuator_value(key, state_argument)
-                for key, handle in self.actuator_handlers.items()
-            }
-        }
-
-        # mount the info dict in queue
+        # obtain observation: variables, meters, internal variables and actuator values
+        values = self.read_plan.read(state_argument)
+        if self.reducer is not None:
+            # publish once per decision step
+            if not self.reducer.add(values):
+                return
+            values = self.reducer.reduce(values)
+        self.next_obs = values
+
+        # read the simulation clock once, shared downstream through the info
+        clock = ClockSnapshot.read(self.api.exchange, state_argument)
         self.next_info = {
-            "time_elapsed(hour)": self.current_sim_time,
-            "month": self.month,
-            "day": self.day_of_month,
-            "hour": self.hour
+            "time_elapsed(hour)": clock.sim_time,
+            "month": clock.month,
+            "day": clock.day,
+            "hour": clock.hour,
+            "clock": clock
         }
 
-        # put in the queues the observation and info
-        self.obs_queue.put(self.next_obs)
-        self.info_queue.put(self.next_info)
+        # hand the observation and info to the agent
+        if self.profiler.enabled:
+            wait_start = time.perf_counter_ns()
+            self.mailbox.publish(self.next_obs, self.next_info)
+            self.profiler.record("sim.publish.wait", time.perf_counter_ns() - wait_start)
+        else:
+            self.mailbox.publish(self.next_obs, self.next_info)
+        # the next decision step starts with the agent's answer
+        self._await_action = self.reducer is not None
+
+    @property
+    def observation_names(self) -> Optional[Tuple[str, ...]]:
+        """
+        Names of the observation values, in buffer order. None until handlers are initialized.
+        """
+        return None if self.read_plan is None else self.read_plan.names
 
     def _process_action(self, state_argument: int) -> None:
         """
@@ -268,13 +397,21 @@ class GymEnergyPlus:
         if not self.system_ready:
             return
         
-        # if not value in action queue -> do nothing
-        if self.act_queue.empty():
-            # self.logger.warning("enpty action queue.")
+        # if no new action in mailbox -> do nothing
+        if self._await_action:
+            # first timestep of a decision step: wait for the action, then hold it
+            self._await_action = False
+            if self.profiler.enabled:
+                wait_start = time.perf_counter_ns()
+                next_action = self.mailbox.wait_action()
+                self.profiler.record("sim.action.wait", time.perf_counter_ns() - wait_start)
+            else:
+                next_action = self.mailbox.wait_action()
+        else:
+            next_action = self.mailbox.take_action()
+        if next_action is None:
             return
         self.timestep = self.timestep + 1
-        # get next action from queue and check type
-        next_action = self.act_queue.get()
 
         # set the action values obtained in actuator handlers
         for i, (act_name, actuator_handle) in  enumerate(self.actuator_handlers.items()):
@@ -285,6 +422,7 @@ class GymEnergyPlus:
             )
 
     def _callback_prograss(self, percent:int) -> None:
+        self.progress = percent
         bar_length = 100
         filled_length = int(bar_length*(percent/100.0))
         bar = "*" * filled_length + "-"*(bar_length-filled_length-1)
@@ -293,69 +431,7 @@ class GymEnergyPlus:
 
     def _callback_after_environment_warmup_is_complete(self, state_argument) -> None:
         self.finish_warmup = True
-        if self.warmup_queue.empty():
-            self.warmup_queue.put(True)
-        return None
-
-    def _callable_begin_new_environment(self, state_argument):
-        """
-        1. Occurs once near the beginning of each environment period. 
-        2. Environment periods include sizing periods, design days, and run periods.
-        3. This calling point will not be useful for control actions, but is useful for initializing
-        variables and calculations that do not need to be repeated during each timestep.
-        """
-        return None
-    
-    def _callback_begin_zone_timestep_before_init_heat_balance(self, state_argument)->None:
-        """
-        1. This calling point is useful for controlling components that affect the building envelope 
-        including surface constructions, window shades, and shading surfaces.
-        2. Programs called from this point might actuate the building envelope or internal gains based
-        on current weather or on the results from the previous timestep.
-        3. Demand management routines might use this calling point to operate window shades, 
-        change active window constructions, activate exterior shades, etc.
-        """
-        return None
-
-    def _callback_begin_zone_timestep_after_init_heat_balance(self, state_argument)->None:
-        """
-        2. This calling point is useful for controlling components that affect the building envelope
-        including surface constructions and window shades. 
-        3. Programs called from this point might actuate the building envelope or internal gains based 
-        on current weather or on the results from the previous timestep. 
-        4. Demand management routines might use this calling point to operate window shades, change active window constructions, etc. 
-        5. This calling point would be an appropriate place to modify weather data values.
-        """
-        self._init_system(state_argument)
-        # hour = self.hour
-        # num_timestep = self.num_time_steps_in_hour
-        # timestep = self.zone_time_step_number
-       
-        # if self.system_ready and  hour == 23 and timestep == num_timestep:
-            # day = self.day_of_year
-            # OAT_v = self._get_variable_value( "OAT", state_argument)
-            # ZMT_BOT_v = self._get_variable_value("ZMT_BOT", state_argument)
-            # ZMT_MID_v = self._get_variable_value("ZMT_MID", state_argument)
-            # ZMT_TOP_v = self._get_variable_value("ZMT_TOP", state_argument)
-            # ZMT_BASE_v = self._get_variable_value("ZMT_BASE", state_argument)
-            # chiller_1_e =self._get_variable_value("CHILLER1_E", state_argument)
-            # self.logger.info(f"current day :{day}, temp:{OAT_v, ZMT_BOT_v, ZMT_MID_v, ZMT_TOP_v, ZMT_BASE_v}")
-        """
-        if hour == 23:
-            if not self.got_handle:
-                return 
-            temp1 = self.api.exchange.get_variable_value(state_arguement, self.handle_map['T1'])
-            current_sim_time = self.current_sim_time()
-            self.logger.info(f"call back state: {self.callback_state}, sim_time:{current_sim_time}, temp:{temp1}")
-            self.callback_state = self.callback_state + 1
-        """
-
-    def _callback_after_predictor_before_hvac_managers(self, state_argument)->None:
-        """
-        1. It occurs at each timestep just after the predictor executes but before SetpointManager and AvailabilityManager models are called.
-        2. It is useful for a variety of control actions.
-        3. However, if there are conflicts, the EMS control actions could be overwritten by other SetpointManager or AvailabilityManager actions.
-        """
+        self.warmup_event.set()
         return None
 
     def _callback_after_predictor_after_hvac_managers(self, state_argument)->None:
@@ -382,52 +458,48 @@ class GymEnergyPlus:
         self._collect_obs_and_info(state_argument)
         return None
     
-    def _callback_begin_system_timestep_before_predictor(self, state_argument)->None:
+    def _declare_calling_points(self) -> None:
         """
-        1. The calling point called “BeginTimestepBeforePredictor” occurs near the beginning of each timestep 
-        but before the predictor executes. 
-        2. “Predictor” refers to the step in EnergyPlus modeling when the zone loads are calculated. 
-        3. This calling point is useful for controlling components that affect the thermal loads the
-        HVAC systems will then attempt to meet. 
-        4. Programs called from this point might actuate internal gains based on current weather or on the results from the previous timestep.
-        5. Demand management routines might use this calling point to reduce lighting or process loads, change thermostat settings, etc.
+        Declare the calling points the simulator itself needs: actuator writes, sensor
+        reads, warmup tracking and progress.
         """
-        return None
-
-    def callback_after_component_get_input(self, state_argument)->None:
-        return None
+        self.calling_points.register("after_new_environment_warmup_complete",
+                                     self._callback_after_environment_warmup_is_complete)
+        self.calling_points.register("after_predictor_after_hvac_managers",
+                                     self._callback_after_predictor_after_hvac_managers)
+        self.calling_points.register("end_zone_timestep_after_zone_reporting",
+                                     self._callback_end_zone_timestep_after_zone_reporting)
+        self.calling_points.register("progress", self._callback_prograss)
 
+    def add_hook(self, calling_point: str, hook) -> None:
+        """
+        Run a user hook at an EnergyPlus calling point, from the next episode on.
+        Args:
+            calling_point (str): calling point name, see calling_points.CALLING_POINTS.
+            hook: callable taking the EnergyPlus state (the percentage for "progress").
+        """
+        self.calling_points.register(calling_point, hook)
 
     def set_callback(self)->None:
         """
-        Register callback function to an active EnergyPlus “state”.
+        Register callback function to an active EnergyPlus “state”: one dispatcher per
+        calling point actually used.
         """
-        self.api.runtime.callback_after_new_environment_warmup_complete \
-            (self.eps_state, self._callback_after_environment_warmup_is_complete)
+        self.calling_points.install(self.api.runtime, self.eps_state, self._profiled)
 
-        self.api.runtime.callback_begin_new_environment \
-            (self.eps_state, self._callable_begin_new_environment)
-        
-        self.api.runtime.callback_begin_zone_timestep_before_init_heat_balance \
-            (self.eps_state, self._callback_begin_zone_timestep_before_init_heat_balance)
-        
-        self.api.runtime.callback_begin_zone_timestep_after_init_heat_balance \
-            (self.eps_state, self._callback_begin_zone_timestep_after_init_heat_balance)
-        
-        self.api.runtime.callback_begin_system_timestep_before_predictor \
-            (self.eps_state, self._callback_begin_system_timestep_before_predictor)
+    def _profiled(self, calling_point: str, callback):
+        """
+        Callback as registered: timed under "callback.<calling point>" when profiling is enabled.
+        """
+        return self.profiler.wrap("callback." + calling_point, callback)
+
+    @property
+    def transitions(self) -> Dict[str, int]:
+        """
+        Python transitions (callback calls) made by EnergyPlus in the current episode, by calling point.
+        """
+        return self.calling_points.transitions
 
-        self.api.runtime.callback_after_predictor_before_hvac_managers \
-            (self.eps_state, self._callback_after_predictor_before_hvac_managers)
-        
-        self.api.runtime.callback_after_predictor_after_hvac_managers \
-            (self.eps_state, self._callback_after_predictor_after_hvac_managers)
-        
-        self.api.runtime.callback_end_zone_timestep_after_zone_reporting \
-            (self.eps_state, self._callback_end_zone_timestep_after_zone_reporting)
-        
-        self.api.runtime.callback_progress(self.eps_state, self._callback_prograss)
-        
     def _make_eplus_agrs(self) -> List[str]:
         """
         Transform attributes defined in class instance into energyplus bash command.
@@ -438,17 +510,29 @@ class GymEnergyPlus:
         eplus_argus += ["-w",
                         self.generator.weather_file,
                         "-d",
-                        self.generator.current_path,
-                        self.generator.idf_file]
+                        self.current_path,
+                        self.generator.run_idf_file()]
         return eplus_argus
     
     def _run_simulation(self, cmd_argus, state, results)->None:
         # run energyplus in a no blocking way
         self.logger.info(f"Runinf EnergyPlus with args: {cmd_argus}")
         self.is_running = True
-        results["exit_code"] = self.api.runtime.run_energyplus(state, cmd_argus)
+        try:
+            results["exit_code"] = self.api.runtime.run_energyplus(state, cmd_argus)
+        except Exception as err:
+            # an api raising out of a callback (e.g. FakeEnergyPlusAPI) fails the episode
+            # instead of leaving the agent waiting for an observation
+            self.logger.error(f"EnergyPlus run raised: {err!r}")
+            results["exit_code"] = 1
         self.is_running = False
         self.simulation_complete = True
+        results["python_transitions"] = self.calling_points.total_transitions
+        self.logger.info(f"episode {self.episode}: {results['python_transitions']} python transitions.")
+        if results["exit_code"] > 0:
+            self.mailbox.fail()
+        else:
+            self.mailbox.finish()
         self.api.state_manager.delete_state(state)
         self.episode = self.episode + 1
         print("") 
@@ -483,16 +567,26 @@ class GymEnergyPlus:
         self.energyplus_thread.start()
         return None
     
-    def stop(self):
+    def stop(self, clear_callbacks: bool = True):
         """
         it forces the simulation thread ends.
+        Args:
+            clear_callbacks (bool): clear the registered api callbacks. Pass False while
+                another simulator of the process is running: clear_callbacks() clears
+                every state (see clears_all_states) and would strip the other run of its
+                callbacks.
         """
         if self.is_running:
             self.simulation_complete = False
+            # release a callback blocked on the mailbox and end the run early
+            self.mailbox.close()
+            if hasattr(self.api.runtime, "stop_simulation"):
+                self.api.runtime.stop_simulation(self.eps_state)
             self.energyplus_thread.join()
             self.energyplus_thread = None
-            self.api.runtime.clear_callbacks()
-            self.api.state_manager.delete_state(self.eps_state)
+            if clear_callbacks and clears_all_states(self.api.runtime):
+                self.api.runtime.clear_callbacks()
+            # the state was deleted by _run_simulation as the thread exited
             self.sim_results:Dict[str, Any] = {}
             self.finish_warmup = False
             self.system_ready = False
@@ -502,15 +596,10 @@ class GymEnergyPlus:
 
     def _flush_queue(self) -> None:
         """
-        It empty all values allocated in observation, action and warmup queue.
+        It empty the mailbox and the warmup event.
         """
-        for q in [
-            self.obs_queue,
-            self.act_queue,
-            self.info_queue,
-            self.warmup_queue]:
-            while not q.empty():
-                q.get()
+        self.mailbox.clear()
+        self.warmup_event.clear()
         self.logger.debug("simulator queues emptied.")
 
     @property
@@ -0,0 +1,114 @@
+"""
+Persistent cache of resolved EnergyPlus API handles.
+"""
+import json
+import os
+from typing import Dict, Optional
+
+from ..generator.generator import Generator
+from ..util.constant import CACHE_DIR
+from ..util.fingerprint import data_digest, file_digest
+
+HANDLER_KINDS = ("var_handlers", "meter_handlers", "actuator_handlers", "internal_var_handlers")
+
+
+def energyplus_build(api, api_path: Optional[str] = None, idd_file: Optional[str] = None) -> Optional[str]:
+    """
+    Fingerprint of the EnergyPlus build behind an api: the digest of its Energy+.idd.
+    api_version() is the version of the Python API, shared by EnergyPlus releases, so it
+    only stands for the build of apis without an install, e.g. FakeEnergyPlusAPI.
+    Args:
+        api: EnergyPlus api object.
+        api_path (str, optional): pyenergyplus.api.api_path(), the EnergyPlus library or
+            its directory, None for an api without an install.
+        idd_file (str, optional): IDD tried when the install has none.
+    Returns:
+        Optional[str]: the fingerprint, None if the IDD of an install is not found.
+    """
+    if api_path is None:
+        return f"api:{api.api_version()}"
+    install_dir = api_path if os.path.isdir(api_path) else os.path.dirname(api_path)
+    candidates = (os.path.join(install_dir, "Energy+.idd"),
+                  os.path.join(os.path.dirname(install_dir), "Energy+.idd"), idd_file)
+    for idd in candidates:
+        if idd and os.path.isfile(idd):
+            return f"idd:{file_digest(idd)}"
+    return None
+
+
+class HandleCache:
+
+    def __init__(self, cache_dir: str = os.path.join(CACHE_DIR, "handles")) -> None:
+        """
+        Handle ids are deterministic for a given IDF, weather file, EnergyPlus build and
+        handle configuration, so the maps resolved in one episode are stored on disk and
+        reused by the next ones. The api data catalog of the resolving episode is kept
+        next to them, for inspection.
+        Args:
+            cache_dir (str): directory of the cache entries.
+        """
+        self.cache_dir = cache_dir
+
+    def key(self, generator: Generator, build: str) -> str:
+        """
+        Cache key of the (IDF hash, EPW hash, EnergyPlus build, config hash) tuple, for the
+        IDF EnergyPlus runs. A missing weather file (design day runs) is part of the key as
+        such, while a missing IDF raises FileNotFoundError, as EnergyPlus cannot run it.
+        Args:
+            generator (Generator): model and handle configuration.
+            build (str): EnergyPlus build fingerprint, see energyplus_build.
+        """
+        config = {
+            "variables": generator.variables,
+            "meters": generator.meters,
+            "actuators": generator.actuators,
+            "internal_variables": generator.internal_variables
+        }
+        weather_file = generator.weather_file
+        return data_digest([
+            file_digest(generator.run_idf_file()),
+            file_digest(weather_file) if weather_file and os.path.isfile(weather_file) else None,
+            build,
+            data_digest(config)
+        ])
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def catalog_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".csv")
+
+    def load(self, key: str) -> Optional[Dict[str, Dict[str, int]]]:
+        """
+        Load the handle maps stored under key.
+        Returns:
+            Optional[Dict[str, Dict[str, int]]]: handle maps by kind, None on a miss.
+        """
+        path = self.entry_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as entry:
+                handlers = json.load(entry)
+        except (OSError, ValueError):
+            return None
+        if not all(kind in handlers for kind in HANDLER_KINDS):
+            return None
+        return handlers
+
+    def save(self, key: str, handlers: Dict[str, Dict[str, int]], catalog: Optional[str] = None) -> None:
+        """
+        Store handle maps, and optionally the api data catalog, under key.
+        Files are written aside and renamed, so concurrent workers never read a partial entry.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if catalog is not None:
+            self._write(self.catalog_path(key), catalog)
+        self._write(self.entry_path(key), json.dumps({kind: handlers[kind] for kind in HANDLER_KINDS}))
+
+    @staticmethod
+    def _write(path: str, content: str) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as stream:
+            stream.write(content)
+        os.replace(tmp_path, path)
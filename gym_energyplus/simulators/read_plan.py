@@ -0,0 +1,171 @@
+"""
+Compiled read plan for collecting observations from an EnergyPlus state.
+"""
+import numpy as np
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+
+class ReadPlan:
+
+    def __init__(self,
+        groups: Sequence[Tuple[Dict[str, int], Callable[[Any, int], float]]],
+        dtype: Any = np.float64,
+        n_slots: int = 3,
+        ) -> None:
+        """
+        Freeze resolved handles into ordered arrays, so that one timestep of sensor
+        reads is a flat loop of api calls writing into a preallocated buffer.
+        Args:
+            groups: (handlers, getter) pairs in observation order, e.g.
+                (var_handlers, api.exchange.get_variable_value).
+            dtype: dtype of the observation buffer.
+            n_slots (int): number of buffers used in rotation. The simulator thread writes
+                one slot while the agent holds the previous one and one more can wait in
+                the hand-off, so 3 slots are enough for a single-slot exchange.
+        """
+        names: List[str] = []
+        handles: List[int] = []
+        self._groups: List[Tuple[Callable[[Any, int], float], Tuple[int, ...], int, int]] = []
+        for handlers, getter in groups:
+            start = len(names)
+            names.extend(handlers.keys())
+            handles.extend(int(handle) for handle in handlers.values())
+            self._groups.append((getter, tuple(handles[start:]), start, len(names)))
+
+        self.names: Tuple[str, ...] = tuple(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.handles: np.ndarray = np.array(handles, dtype=np.int32)
+        self.dtype = np.dtype(dtype)
+        self._slots = [np.zeros(len(self.names), dtype=self.dtype) for _ in range(max(1, n_slots))]
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def read(self, state_argument) -> np.ndarray:
+        """
+        Read every sensor of the plan into the next buffer slot.
+        Args:
+            state_argument: EnergyPlus API state.
+        Returns:
+            np.ndarray: the filled buffer, valid until the slot is reused n_slots reads later.
+        """
+        buffer = self._slots[self._cursor]
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        for getter, handles, start, stop in self._groups:
+            buffer[start:stop] = [getter(state_argument, handle) for handle in handles]
+        return buffer
+
+    def view(self, values: np.ndarray, clock: Any = None) -> "ObservationView":
+        """
+        Wrap an observation buffer filled by this plan into a read-only mapping.
+        Args:
+            values (np.ndarray): observation buffer.
+            clock (ClockSnapshot, optional): simulation clock of the observation.
+        """
+        return ObservationView(self.index, values, clock)
+
+
+class ObservationView(Mapping):
+    """
+    Read-only name -> value mapping over an observation array, used where the
+    dict interface is still expected (e.g. reward functions) without building a dict.
+    The simulation clock of the observation, if known, is available as `clock`.
+    """
+
+    __slots__ = ("_index", "_values", "clock")
+
+    def __init__(self, index: Dict[str, int], values: np.ndarray, clock: Any = None) -> None:
+        self._index = index
+        self._values = values
+        self.clock = clock
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """
+        Name -> position in `array`.
+        """
+        return self._index
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._values
+
+    def __getitem__(self, key: str) -> float:
+        return float(self._values[self._index[key]])
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return repr({key: self[key] for key in self._index})
+
+
+class ObservationReducer:
+
+    REDUCTIONS = ("mean", "sum", "last")
+
+    def __init__(self,
+        names: Sequence[str],
+        interval: int,
+        rules: Dict[str, str],
+        default_rule: str = "last",
+        dtype: Any = np.float64,
+        n_slots: int = 3,
+        ) -> None:
+        """
+        Reduce the observations of `interval` consecutive zone timesteps into one, with a
+        per-sensor rule: "mean" (e.g. temperatures), "sum" (e.g. energy meters) or "last".
+        Args:
+            names: observation names, in buffer order.
+            interval (int): number of zone timesteps per reduced observation.
+            rules (Dict[str, str]): reduction rule by observation name.
+            default_rule (str): rule of the names missing from rules.
+            dtype: dtype of the reduced buffers.
+            n_slots (int): number of output buffers used in rotation, see ReadPlan.
+        """
+        unknown = set(rules.values()).union([default_rule]).difference(self.REDUCTIONS)
+        if unknown:
+            raise ValueError(f"unknown reduction rule(s) {unknown}, expected one of {self.REDUCTIONS}.")
+        self.interval = int(interval)
+        self.count = 0
+        reductions = [rules.get(name, default_rule) for name in names]
+        # acc * scale gives the sum or the mean, "last" entries are overwritten by the last values
+        self._scale = np.array([1.0 / self.interval if rule == "mean" else 1.0 for rule in reductions])
+        self._last_mask = np.array([rule == "last" for rule in reductions], dtype=bool)
+        self._acc = np.zeros(len(reductions), dtype=np.float64)
+        self._slots = [np.zeros(len(reductions), dtype=dtype) for _ in range(max(1, n_slots))]
+        self._cursor = 0
+
+    def add(self, values: np.ndarray) -> bool:
+        """
+        Accumulate the observation of one zone timestep.
+        Returns:
+            bool: True when the window is complete and `reduce` should be called.
+        """
+        self._acc += values
+        self.count += 1
+        return self.count >= self.interval
+
+    def reduce(self, values: np.ndarray) -> np.ndarray:
+        """
+        Write the reduced observation of the window ending with `values` into the next
+        output slot and start a new window.
+        """
+        out = self._slots[self._cursor]
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        np.multiply(self._acc, self._scale, out=out, casting="unsafe")
+        np.copyto(out, values, where=self._last_mask, casting="unsafe")
+        self.reset()
+        return out
+
+    def reset(self) -> None:
+        self._acc.fill(0.0)
+        self.count = 0
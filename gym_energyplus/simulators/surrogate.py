@@ -0,0 +1,192 @@
+"""
+Linear ARX surrogate of the EnergyPlus dynamics, fitted on recorded EplusEnv rollouts.
+"""
+import json
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from ..env.observation_schema import ObservationSchema
+from ..util.rewards import day_of_year
+
+# recorded clock columns used as calendar inputs, see TrajectoryRecorder
+_MONTH, _DAY, _HOUR = 0, 1, 2
+_CALENDAR_FEATURES = 4
+
+
+class ARXSurrogate:
+
+    def __init__(self, schema: ObservationSchema, lags: int = 1, ridge: float = 1e-3, residual: bool = True) -> None:
+        """
+        Predict the next simulated observations (variables, meters and internal variables)
+        from the last `lags` ones, the action applied and the calendar:
+
+            s_{t+1} = [s_t, ..., s_{t-lags+1}, a_{t+1}, sin/cos(hour), sin/cos(day of year), 1] @ W
+
+        fitted by ridge regression on standardized inputs. With residual, W predicts
+        s_{t+1} - s_t. The actuator group of the observation holds the action itself.
+        Args:
+            schema (ObservationSchema): observation/action layout of the env.
+            lags (int): number of past observations used as inputs. Defaults to 1.
+            ridge (float): L2 regularization. Defaults to 1e-3.
+            residual (bool): predict the change of the observations. Defaults to True.
+        """
+        self.schema = schema
+        self.lags = int(lags)
+        self.ridge = float(ridge)
+        self.residual = residual
+        # simulated observations: every group before the actuator values
+        self.state_slice = slice(0, schema.slices["actuators"].start)
+        self.n_state = self.state_slice.stop
+        self.n_features = self.lags * self.n_state + schema.action_size + _CALENDAR_FEATURES + 1
+        self.weights: Optional[np.ndarray] = None
+        self.mean = np.zeros(self.n_features)
+        self.scale = np.ones(self.n_features)
+        # first `lags` observations of each recorded episode (most recent first) and the
+        # calendar of the longest one, replayed by the surrogate env
+        self.initial_states: Optional[np.ndarray] = None
+        self.calendar: Optional[np.ndarray] = None
+
+    # ----------------features------------------------------- #
+
+    def features(self, history: np.ndarray, action: np.ndarray, calendar: np.ndarray,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Standardized model inputs of a batch.
+        Args:
+            history (np.ndarray): (B, lags, n_state) last observations, the most recent first.
+            action (np.ndarray): (B, n_actions) actions.
+            calendar (np.ndarray): (B, 3) month, day and hour of the predicted observations.
+            out (np.ndarray, optional): (B, n_features) buffer to fill.
+        """
+        batch = len(action)
+        if out is None:
+            out = np.empty((batch, self.n_features))
+        n_lagged = self.lags * self.n_state
+        out[:, :n_lagged] = history.reshape(batch, n_lagged)
+        out[:, n_lagged:n_lagged + self.schema.action_size] = action
+        hour_angle = calendar[:, _HOUR] * (2 * np.pi / 24)
+        day_angle = day_of_year(calendar[:, _MONTH].astype(np.intp), calendar[:, _DAY]) * (2 * np.pi / 366)
+        calendar_start = n_lagged + self.schema.action_size
+        out[:, calendar_start] = np.sin(hour_angle)
+        out[:, calendar_start + 1] = np.cos(hour_angle)
+        out[:, calendar_start + 2] = np.sin(day_angle)
+        out[:, calendar_start + 3] = np.cos(day_angle)
+        out[:, -1] = 1.0
+        out -= self.mean
+        out /= self.scale
+        return out
+
+    # ----------------fit------------------------------------ #
+
+    def fit(self, columns: Dict[str, np.ndarray]) -> "ARXSurrogate":
+        """
+        Fit on recorded rollouts, e.g. `load_recording(path)[1]`: "obs", "action",
+        "episode" and "clock" columns. Transitions never cross episode boundaries.
+        """
+        obs = np.asarray(columns["obs"], dtype=np.float64)
+        state = obs[:, self.state_slice]
+        action = np.asarray(columns["action"], dtype=np.float64)
+        clock = np.asarray(columns["clock"])
+        starts, stops = self._episodes(columns["episode"])
+        targets, history = self._transitions(state, action, starts, stops)
+        self.mean = np.zeros(self.n_features)
+        self.scale = np.ones(self.n_features)
+        x = self.features(history, action[targets], clock[targets])
+        self.mean = x.mean(axis=0)
+        self.scale = x.std(axis=0)
+        # constant inputs (e.g. the bias) are left as they are
+        self.mean[self.scale < 1e-12] = 0.0
+        self.scale[self.scale < 1e-12] = 1.0
+        x = (x - self.mean) / self.scale
+        y = state[targets] - (history[:, 0] if self.residual else 0.0)
+
+        gram = x.T @ x + self.ridge * len(x) * np.eye(self.n_features)
+        self.weights = np.linalg.solve(gram, x.T @ y)
+
+        self.initial_states = np.stack(
+            [obs[start:start + self.lags][::-1] for start, stop in zip(starts, stops) if stop - start >= self.lags])
+        first = int(np.argmax(stops - starts))
+        self.calendar = clock[starts[first]:stops[first], :3].astype(np.int16)
+        return self
+
+    @staticmethod
+    def _episodes(episode: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        First row and end of each recorded episode.
+        """
+        episode = np.asarray(episode)
+        starts = np.flatnonzero(np.diff(episode, prepend=episode[0] - 1))
+        return starts, np.append(starts[1:], len(episode))
+
+    def _transitions(self, state: np.ndarray, action: np.ndarray, starts: np.ndarray,
+                     stops: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Target rows and their (T, lags, n_state) history. Transitions with a non-finite
+        action, history or target, e.g. around a reset row, are left out.
+        """
+        # row r -> r + 1, with r - lags + 1 still in the episode
+        targets = np.concatenate([np.arange(start + self.lags, stop) for start, stop in zip(starts, stops)]
+                                 + [np.zeros(0, dtype=np.intp)])
+        history = np.stack([state[targets - 1 - k] for k in range(self.lags)], axis=1)
+        finite = (np.isfinite(action[targets]).all(axis=1) & np.isfinite(state[targets]).all(axis=1)
+                  & np.isfinite(history).all(axis=(1, 2)))
+        if not finite.any():
+            raise ValueError(f"no finite transition with {self.lags} lag(s) in the recording.")
+        return targets[finite], history[finite]
+
+    def score(self, columns: Dict[str, np.ndarray]) -> Dict[str, float]:
+        """
+        One-step root mean square error of each simulated observation on recorded rollouts.
+        """
+        obs = np.asarray(columns["obs"], dtype=np.float64)
+        state = obs[:, self.state_slice]
+        action = np.asarray(columns["action"], dtype=np.float64)
+        targets, history = self._transitions(state, action, *self._episodes(columns["episode"]))
+        predicted = self.predict(history, action[targets], np.asarray(columns["clock"])[targets])
+        rmse = np.sqrt(np.mean(np.square(predicted - state[targets]), axis=0))
+        return dict(zip(self.schema.names[self.state_slice], rmse.tolist()))
+
+    # ----------------predict-------------------------------- #
+
+    def predict(self, history: np.ndarray, action: np.ndarray, calendar: np.ndarray,
+                features: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Next observations of a batch.
+        Args:
+            history (np.ndarray): (B, lags, n_state) last observations, the most recent first.
+            action (np.ndarray): (B, n_actions) actions.
+            calendar (np.ndarray): (B, 3) month, day and hour of the predicted observations.
+            features (np.ndarray, optional): (B, n_features) work buffer.
+        Returns:
+            np.ndarray: (B, n_state) predicted observations.
+        """
+        if self.weights is None:
+            raise RuntimeError("the surrogate is not fitted.")
+        predicted = self.features(history, action, calendar, features) @ self.weights
+        if self.residual:
+            predicted += history[:, 0]
+        return predicted
+
+    # ----------------io------------------------------------- #
+
+    def save(self, path: str) -> None:
+        """
+        Save the fitted surrogate to a .npz file.
+        """
+        groups = {group: list(self.schema.names[group_slice]) for group, group_slice in self.schema.slices.items()}
+        meta = {"groups": groups, "actions": list(self.schema.action_names), "lags": self.lags,
+                "ridge": self.ridge, "residual": self.residual}
+        with open(path, "wb") as stream:
+            np.savez(stream, meta=np.array(json.dumps(meta)), weights=self.weights, mean=self.mean,
+                     scale=self.scale, initial_states=self.initial_states, calendar=self.calendar)
+
+    @classmethod
+    def load(cls, path: str) -> "ARXSurrogate":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            surrogate = cls(ObservationSchema(meta["groups"], meta["actions"]),
+                            meta["lags"], meta["ridge"], meta["residual"])
+            for key in ("weights", "mean", "scale", "initial_states", "calendar"):
+                setattr(surrogate, key, data[key])
+        return surrogate
+
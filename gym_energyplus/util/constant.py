@@ -4,11 +4,11 @@ current_dir = os.path.dirname(__file__)
 pkg_dir = os.path.dirname(current_dir)
 
 # data
-DATA_BUILDINGS_PATH = os.path.join(pkg_dir, "data\\buildings")
+DATA_BUILDINGS_PATH = os.path.join(pkg_dir, "data", "buildings")
 assert(os.path.exists(DATA_BUILDINGS_PATH))
-DATA_WEATHER_PATH = os.path.join(pkg_dir, "data\\weather")
+DATA_WEATHER_PATH = os.path.join(pkg_dir, "data", "weather")
 assert(os.path.exists(DATA_WEATHER_PATH))
-DATA_CONFIGURATION_PATH = os.path.join(pkg_dir,"data\\configuration")
+DATA_CONFIGURATION_PATH = os.path.join(pkg_dir, "data", "configuration")
 
 # logger
 LOG_FORMAT = "%(asctime)s-%(filename)s-%(lineno)d-%(levelname)s: %(message)s"
@@ -24,6 +24,9 @@ YEAR = '2017'
 # ENERGYPLUS_DIR 
 ENERGYPLUS_DIR = os.getenv("ENERGYPLUS_DIR")
 
+# cache
+CACHE_DIR = os.getenv("GYM_EPLUS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "gym_energyplus"))
+
 if __name__ == "__main__":
     print(current_dir)
     print(ENERGYPLUS_DIR)
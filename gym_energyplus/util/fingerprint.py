@@ -0,0 +1,35 @@
+"""
+Content fingerprints used as cache keys.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Tuple
+
+# (path, mtime, size) -> digest, so unchanged files are hashed once per process
+_file_digests: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    sha256 hex digest of a file content.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    memo_key = (path, stat.st_mtime_ns, stat.st_size)
+    digest = _file_digests.get(memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as stream:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                sha.update(chunk)
+        digest = _file_digests[memo_key] = sha.hexdigest()
+    return digest
+
+
+def data_digest(data: Any) -> str:
+    """
+    sha256 hex digest of json serializable data, independent of dict ordering.
+    """
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
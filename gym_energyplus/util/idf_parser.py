@@ -0,0 +1,250 @@
+"""
+Streaming IDF tokenizer and object index, for reading a few classes of a large model
+without parsing it as a whole.
+"""
+import fnmatch
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+IDF_ENCODING = "ISO-8859-1"
+WEEKDAYS = ("sunday", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday")
+_DELIMITERS = re.compile(rb"([,;])")
+
+
+class IDFObject:
+
+    __slots__ = ("class_name", "fields", "start", "end")
+
+    def __init__(self, class_name: str, fields: List[str], start: int, end: int) -> None:
+        """
+        One parsed object: class name and fields (the class name excluded), as written.
+        start and end are its byte offsets in the file.
+        """
+        self.class_name = class_name
+        self.fields = fields
+        self.start = start
+        self.end = end
+
+    @property
+    def name(self) -> str:
+        return self.fields[0] if self.fields else ""
+
+    def __getitem__(self, i: int) -> str:
+        return self.fields[i] if i < len(self.fields) else ""
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __repr__(self) -> str:
+        return f"IDFObject({self.class_name}, {self.fields})"
+
+    def get_int(self, i: int) -> Optional[int]:
+        """
+        Field i as an int, None if blank.
+        """
+        value = self[i]
+        return int(float(value)) if value else None
+
+    def get_float(self, i: int) -> Optional[float]:
+        value = self[i]
+        return float(value) if value else None
+
+
+class IDFIndex:
+
+    def __init__(self, idf_path: str) -> None:
+        """
+        Index the objects of an IDF file in one streaming pass: for each class, the byte
+        ranges and names of its objects. Fields are only parsed when a class is requested,
+        by reading its byte ranges back.
+        Args:
+            idf_path (str): IDF file.
+        """
+        self.idf_path = idf_path
+        stat = os.stat(idf_path)
+        self.mtime_ns, self.size = stat.st_mtime_ns, stat.st_size
+        # lower case class name -> (class name as written, [(start, end, object name), ...])
+        self._classes: Dict[str, Tuple[str, List[Tuple[int, int, str]]]] = {}
+        self._parsed: Dict[str, List[IDFObject]] = {}
+        self._build()
+
+    def _build(self) -> None:
+        classes = self._classes
+        offset = 0
+        # current object: class name, start offset, number of fields ended, name
+        class_name: Optional[bytes] = None
+        start = 0
+        n_fields = 0
+        name = b""
+        pending = b""
+        with open(self.idf_path, "rb") as stream:
+            for line in stream:
+                content = line.split(b"!", 1)[0]
+                if b"," not in content and b";" not in content:
+                    if content.strip():
+                        pending += content
+                    offset += len(line)
+                    continue
+                tokens = _DELIMITERS.split(content)
+                column = 0
+                for i in range(0, len(tokens) - 1, 2):
+                    token = tokens[i]
+                    field = (pending + token).strip()
+                    pending = b""
+                    if class_name is None:
+                        start = offset + column
+                        class_name = field
+                        n_fields = 0
+                        name = b""
+                    else:
+                        if n_fields == 0:
+                            name = field
+                        n_fields += 1
+                    column += len(token) + 1
+                    if tokens[i + 1] == b";":
+                        decoded = class_name.decode(IDF_ENCODING)
+                        entry = classes.get(decoded.lower())
+                        if entry is None:
+                            entry = classes[decoded.lower()] = (decoded, [])
+                        entry[1].append((start, offset + column, name.decode(IDF_ENCODING)))
+                        class_name = None
+                if tokens[-1].strip():
+                    pending = tokens[-1]
+                offset += len(line)
+
+    # ----------------index---------------------------------- #
+
+    def is_stale(self) -> bool:
+        """
+        Whether the file changed since it was indexed.
+        """
+        stat = os.stat(self.idf_path)
+        return (stat.st_mtime_ns, stat.st_size) != (self.mtime_ns, self.size)
+
+    def classes(self, pattern: str = "*") -> List[str]:
+        """
+        Class names in the file, in order of first appearance, matching a case
+        insensitive glob pattern, e.g. "EnergyManagementSystem:*".
+        """
+        pattern = pattern.lower()
+        return [written for key, (written, _) in self._classes.items() if fnmatch.fnmatchcase(key, pattern)]
+
+    def count(self, class_name: str) -> int:
+        entry = self._classes.get(class_name.lower())
+        return len(entry[1]) if entry else 0
+
+    def names(self, class_name: str) -> List[str]:
+        """
+        Object names (first fields) of a class, without parsing the objects.
+        """
+        entry = self._classes.get(class_name.lower())
+        return [name for _, _, name in entry[1]] if entry else []
+
+    def ranges(self, class_name: str) -> List[Tuple[int, int]]:
+        """
+        Byte ranges of the objects of a class.
+        """
+        entry = self._classes.get(class_name.lower())
+        return [(start, end) for start, end, _ in entry[1]] if entry else []
+
+    def __contains__(self, class_name: str) -> bool:
+        return class_name.lower() in self._classes
+
+    def __len__(self) -> int:
+        return sum(len(entries) for _, entries in self._classes.values())
+
+    # ----------------objects-------------------------------- #
+
+    def objects(self, class_name: str) -> List[IDFObject]:
+        """
+        Parsed objects of a class, parsed once and kept.
+        """
+        key = class_name.lower()
+        parsed = self._parsed.get(key)
+        if parsed is None:
+            entry = self._classes.get(key)
+            parsed = self._parsed[key] = list(self._read(entry[0], entry[1])) if entry else []
+        return parsed
+
+    def get(self, class_name: str, name: Optional[str] = None) -> Optional[IDFObject]:
+        """
+        Object of a class by name (case insensitive), the first one if name is None.
+        """
+        entry = self._classes.get(class_name.lower())
+        if entry is None:
+            return None
+        if name is None:
+            position = 0 if entry[1] else None
+        else:
+            name = name.lower()
+            position = next((i for i, (_, _, obj_name) in enumerate(entry[1]) if obj_name.lower() == name), None)
+        if position is None:
+            return None
+        return self.objects(class_name)[position]
+
+    def _read(self, class_name: str, entries: List[Tuple[int, int, str]]) -> Iterator[IDFObject]:
+        with open(self.idf_path, "rb") as stream:
+            for start, end, _ in entries:
+                stream.seek(start)
+                yield IDFObject(class_name, parse_object(stream.read(end - start))[1], start, end)
+
+    # ----------------common classes------------------------- #
+
+    def timestep(self) -> Optional[int]:
+        """
+        Number of timesteps per hour of the Timestep object.
+        """
+        timestep = self.get("Timestep")
+        return timestep.get_int(0) if timestep is not None else None
+
+    def run_periods(self) -> List[Dict[str, object]]:
+        """
+        RunPeriod objects: name, begin/end month, day and year, and start day of week
+        (lower case, None if blank or "UseWeatherFile").
+        """
+        periods = []
+        for run_period in self.objects("RunPeriod"):
+            weekday = run_period[7].lower()
+            periods.append({
+                "name": run_period.name,
+                "begin_month": run_period.get_int(1),
+                "begin_day": run_period.get_int(2),
+                "begin_year": run_period.get_int(3),
+                "end_month": run_period.get_int(4),
+                "end_day": run_period.get_int(5),
+                "end_year": run_period.get_int(6),
+                "start_day_of_week": weekday if weekday in WEEKDAYS else None
+            })
+        return periods
+
+    def output_variables(self) -> List[Tuple[str, str, str]]:
+        """
+        (key value, variable name, reporting frequency) of the Output:Variable objects.
+        """
+        return [(obj[0], obj[1], obj[2]) for obj in self.objects("Output:Variable")]
+
+
+def parse_object(text: bytes) -> Tuple[str, List[str]]:
+    """
+    Class name and fields of the text of one object, comments included.
+    """
+    content = b"".join(line.split(b"!", 1)[0] for line in text.splitlines())
+    content = content.split(b";", 1)[0]
+    tokens = [token.strip().decode(IDF_ENCODING) for token in content.split(b",")]
+    return tokens[0], tokens[1:]
+
+
+# indexes by path, rebuilt when the file changes
+_indexes: Dict[str, IDFIndex] = {}
+
+
+def load_index(idf_path: str) -> IDFIndex:
+    """
+    Index of an IDF file, shared by the callers of the process.
+    """
+    path = os.path.abspath(idf_path)
+    index = _indexes.get(path)
+    if index is None or index.is_stale():
+        index = _indexes[path] = IDFIndex(path)
+    return index
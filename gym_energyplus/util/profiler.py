@@ -0,0 +1,168 @@
+"""
+Low-overhead wall-time instrumentation of simulator callbacks and agent waits.
+"""
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# histogram bucket i counts durations d with d.bit_length() == i, i.e. 2**(i-1) <= d < 2**i ns
+N_BUCKETS = 64
+
+
+class CallbackProfiler:
+
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Per-episode monotonic-clock histograms of named sections.
+
+        When disabled, `wrap` returns the function itself and callers guard `record` with
+        `enabled`, so the instrumentation costs nothing.
+        Args:
+            enabled (bool): record timings. Defaults to False.
+        """
+        self.enabled = enabled
+        self.episode = 0
+        self.episodes: List[Dict[str, Any]] = []
+        self._start_ns = time.perf_counter_ns()
+        self._sections: Dict[str, List[int]] = {}
+        # records come from the agent thread and up to two simulation threads (prefetch)
+        self._lock = threading.Lock()
+        # profiler this one forwards its records to, once merged into it
+        self._target: Optional["CallbackProfiler"] = None
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """
+        Wrap a callback so that each call is recorded under name.
+        """
+        if not self.enabled:
+            return func
+        clock = time.perf_counter_ns
+        record = self.record
+
+        def timed(*args):
+            start = clock()
+            try:
+                return func(*args)
+            finally:
+                record(name, clock() - start)
+        timed.__name__ = getattr(func, "__name__", name)
+        return timed
+
+    def record(self, name: str, elapsed_ns: int) -> None:
+        """
+        Add one duration (ns) to the section histogram.
+        Each section is [count, total_ns, max_ns, bucket_0, ..., bucket_63].
+        """
+        with self._lock:
+            target = self._target
+            if target is None:
+                section = self._sections.get(name)
+                if section is None:
+                    section = self._sections[name] = [0] * (3 + N_BUCKETS)
+                section[0] += 1
+                section[1] += elapsed_ns
+                if elapsed_ns > section[2]:
+                    section[2] = elapsed_ns
+                section[3 + min(elapsed_ns.bit_length(), N_BUCKETS - 1)] += 1
+                return
+        target.record(name, elapsed_ns)
+
+    def merge(self, other: "CallbackProfiler") -> None:
+        """
+        Add the sections recorded by other to the current episode, and forward its next
+        records here, e.g. for a simulator prefetched with its own profiler that becomes
+        the current one.
+        """
+        with other._lock:
+            sections, other._sections = other._sections, {}
+            other._target = self
+        with self._lock:
+            for name, recorded in sections.items():
+                section = self._sections.get(name)
+                if section is None:
+                    self._sections[name] = recorded
+                    continue
+                section[0] += recorded[0]
+                section[1] += recorded[1]
+                section[2] = max(section[2], recorded[2])
+                for i in range(3, len(section)):
+                    section[i] += recorded[i]
+
+    def start_episode(self) -> None:
+        """
+        Archive the sections of the current episode and start a new one.
+        """
+        if self.enabled and self._sections:
+            self.episodes.append(self.summary())
+        with self._lock:
+            self.episode += 1
+            self._sections = {}
+            self._start_ns = time.perf_counter_ns()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Statistics of the current episode.
+        Returns:
+            Dict[str, Any]: episode number, wall time, time breakdown and per-section
+                count, total, mean, max, approximate percentiles and histogram.
+        """
+        with self._lock:
+            sections = {name: self._section_summary(section) for name, section in self._sections.items()}
+        wall_s = (time.perf_counter_ns() - self._start_ns) / 1e9
+        callback_s = sum(s["total_s"] for name, s in sections.items() if name.startswith("callback."))
+        sim_wait_s = sum(s["total_s"] for name, s in sections.items() if name.startswith("sim.") and name.endswith(".wait"))
+        return {
+            "episode": self.episode,
+            "wall_s": wall_s,
+            "breakdown": {
+                # simulation thread: physics outside callbacks, callback work, waits on the agent
+                "energyplus_s": max(0.0, wall_s - callback_s),
+                "callback_s": max(0.0, callback_s - sim_wait_s),
+                "sim_wait_s": sim_wait_s,
+                # agent thread: waits on the simulation
+                "agent_wait_s": sum(s["total_s"] for name, s in sections.items() if name.startswith("env.")),
+            },
+            "sections": sections
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"episodes": self.episodes, "current": self.summary()}
+
+    def dump_json(self, path: str) -> None:
+        """
+        Write the archived episodes and the current one to a json file.
+        """
+        with open(path, "w", encoding="utf-8") as stream:
+            json.dump(self.to_dict(), stream, indent=2)
+
+    @staticmethod
+    def _section_summary(section: List[int]) -> Dict[str, Any]:
+        count, total_ns, max_ns = section[0], section[1], section[2]
+        buckets = section[3:]
+        return {
+            "count": count,
+            "total_s": total_ns / 1e9,
+            "mean_us": total_ns / count / 1e3 if count else 0.0,
+            "max_us": max_ns / 1e3,
+            "p50_us": _percentile_us(buckets, count, 0.50),
+            "p90_us": _percentile_us(buckets, count, 0.90),
+            "p99_us": _percentile_us(buckets, count, 0.99),
+            # upper bound (us) of each non-empty bucket -> count
+            "histogram_us": {f"{(1 << i) / 1e3:g}": n for i, n in enumerate(buckets) if n}
+        }
+
+
+def _percentile_us(buckets: List[int], count: int, q: float) -> Optional[float]:
+    """
+    Upper bound (us) of the bucket holding the q-quantile.
+    """
+    if not count:
+        return None
+    rank = q * count
+    seen = 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if seen >= rank:
+            return (1 << i) / 1e3
+    return (1 << (len(buckets) - 1)) / 1e3
@@ -1,13 +1,31 @@
 """Implementation of reward functions."""
 
 
-from datetime import datetime
 from math import exp
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
-from .constant import LOG_REWARD_LEVEL, YEAR
+import numpy as np
+
+from .constant import LOG_REWARD_LEVEL
 from .logger import Logger
 
+# first day of year of each month (index 1-12) in a leap year, so that every
+# (month, day) has its own entry in a 366-day season table
+_MONTH_START = np.concatenate(
+    ([0], np.cumsum([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30])))
+
+
+def day_of_year(month, day):
+    """Zero-based leap-year day of year of (month, day), for scalars or arrays."""
+    return _MONTH_START[month] + day - 1
+
+
+def _season_table(start: Tuple[int, int], final: Tuple[int, int]) -> np.ndarray:
+    """366-entry day of year -> whether (month, day) is within [start, final]."""
+    table = np.zeros(366, dtype=bool)
+    table[day_of_year(start[0], start[1]):day_of_year(final[0], final[1]) + 1] = True
+    return table
+
 
 class BaseReward(object):
 
@@ -30,6 +48,66 @@ class BaseReward(object):
         raise NotImplementedError(
             "Reward class must have a `__call__` method.")
 
+    def batch(self,
+              obs: np.ndarray,
+              names: Sequence[str],
+              month: Optional[np.ndarray] = None,
+              day: Optional[np.ndarray] = None,
+              hour: Optional[np.ndarray] = None
+              ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Method for calculating the reward function of a whole trajectory at once."""
+        raise NotImplementedError(
+            "Reward class does not implement a `batch` method.")
+
+    @staticmethod
+    def _get_batch_calendar(obs: np.ndarray,
+                            names: Sequence[str],
+                            month: Optional[np.ndarray],
+                            day: Optional[np.ndarray],
+                            hour: Optional[np.ndarray]
+                            ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """Calendar columns of a batch, like `_get_calendar` for one observation.
+
+        Arrays given explicitly are used as is, missing ones are taken from the
+        'month', 'day_of_month' and 'hour' columns of the batch.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]: month, day of month and hour (None if unknown).
+        """
+        names = list(names)
+
+        def column(given, name):
+            if given is not None:
+                return np.asarray(given)
+            if name in names:
+                return obs[:, names.index(name)].astype(np.int64)
+            return None
+
+        month, day, hour = column(month, 'month'), column(day, 'day_of_month'), column(hour, 'hour')
+        if month is None or day is None:
+            raise ValueError(
+                'month and day of month are required, as arrays or as observation columns.')
+        return month, day, hour
+
+    @staticmethod
+    def _get_calendar(obs_dict: Dict[str, Any]) -> Tuple[int, int, int]:
+        """Month, day of month and hour of the observation.
+
+        Taken from the clock snapshot the environment attaches to the observation when
+        available, otherwise from the 'month', 'day_of_month' and 'hour' entries.
+
+        Args:
+            obs_dict (Dict[str, Any]): Environment observation.
+
+        Returns:
+            Tuple[int, int, int]: month, day of month and hour (None if unknown).
+        """
+        clock = getattr(obs_dict, 'clock', None)
+        if clock is not None:
+            return clock.month, clock.day, clock.hour
+        hour = int(obs_dict['hour']) if 'hour' in obs_dict else None
+        return int(obs_dict['month']), int(obs_dict['day_of_month']), hour
+
 
 class LinearReward(BaseReward):
 
@@ -81,9 +159,45 @@ class LinearReward(BaseReward):
         # Summer period
         self.summer_start = summer_start  # (month,day)
         self.summer_final = summer_final  # (month,day)
+        self._summer_days = _season_table(summer_start, summer_final)
+
+        # Compiled columns, see `compile`
+        self._compiled_index: Optional[Mapping[str, int]] = None
+        self._compiled_names: Tuple[str, ...] = ()
+        self._energy_columns: Tuple[int, ...] = ()
+        self._temp_columns: Tuple[int, ...] = ()
 
         self.logger.info('Reward function initialized.')
 
+    def compile(self, index: Union[Mapping[str, int], Sequence[str]]) -> None:
+        """Resolve the reward variables to observation columns once.
+
+        The env compiles its reward against its observation schema, so that each step
+        only reads a few array entries. Observation dicts with another layout are
+        compiled when first seen.
+
+        Args:
+            index (Union[Mapping[str, int], Sequence[str]]): observation name -> column, or names in column order.
+        """
+        if not isinstance(index, Mapping):
+            index = {name: i for i, name in enumerate(index)}
+        missing = [name for name in self.temp_names if name not in index]
+        if missing:
+            self.logger.error(
+                'Some of the temperature variables specified are not present in observation.')
+            raise ValueError(f'temperature variables {missing} not in observation.')
+        missing = [name for name in self.energy_names if name not in index]
+        if missing:
+            self.logger.error(
+                'Some of the energy variables specified are not present in observation.')
+            raise ValueError(f'energy variables {missing} not in observation.')
+        # Columns in observation order, as the dict path iterates them
+        names = sorted(index, key=index.__getitem__)
+        self._energy_columns = tuple(index[name] for name in names if name in self.energy_names)
+        self._temp_columns = tuple(index[name] for name in names if name in self.temp_names)
+        self._compiled_names = tuple(names)
+        self._compiled_index = index
+
     def __call__(self, obs_dict: Dict[str, Any]
                  ) -> Tuple[float, Dict[str, Any]]:
         """Calculate the reward function.
@@ -94,29 +208,39 @@ class LinearReward(BaseReward):
         Returns:
             Tuple[float, Dict[str, Any]]: Reward value and dictionary with their individual components.
         """
-        # Check variables to calculate reward are available
-        try:
-            assert all(temp_name in list(obs_dict.keys())
-                       for temp_name in self.temp_names)
-        except AssertionError as err:
-            self.logger.error(
-                'Some of the temperature variables specified are not present in observation.')
-            raise err
-        try:
-            assert all(energy_name in list(obs_dict.keys())
-                       for energy_name in self.energy_names)
-        except AssertionError as err:
-            self.logger.error(
-                'Some of the energy variables specified are not present in observation.')
-            raise err
+        index = getattr(obs_dict, 'index', None)
+        if isinstance(index, Mapping):
+            # ObservationView: read its array directly
+            values = obs_dict.array
+            if index is not self._compiled_index:
+                self.compile(index)
+        else:
+            values = list(obs_dict.values())
+            if tuple(obs_dict) != self._compiled_names:
+                self.compile(list(obs_dict))
+        month, day, hour = self._get_calendar(obs_dict)
+        return self.score(values, month, day, hour)
+
+    def score(self, values: Sequence[float], month: int, day: int,
+              hour: Optional[int] = None) -> Tuple[float, Dict[str, Any]]:
+        """Calculate the reward function of one observation laid out as compiled.
 
+        Args:
+            values (Sequence[float]): Observation values, in the compiled column order.
+            month (int): Month of the observation.
+            day (int): Day of month of the observation.
+            hour (int, optional): Hour of the observation.
+
+        Returns:
+            Tuple[float, Dict[str, Any]]: Reward value and dictionary with their individual components.
+        """
         # Energy calculation
-        energy_consumed, energy_values = self._get_energy_consumed(obs_dict)
+        energy_consumed, energy_values = self._get_energy_consumed(values)
         energy_penalty = self._get_energy_penalty(energy_values)
 
         # Comfort violation calculation
         total_temp_violation, temp_violations = self._get_temperature_violation(
-            obs_dict)
+            values, month, day)
         comfort_penalty = self._get_comfort_penalty(temp_violations)
 
         # Weighted sum of both terms
@@ -135,20 +259,77 @@ class LinearReward(BaseReward):
 
         return reward, reward_terms
 
-    def _get_energy_consumed(self, obs_dict: Dict[str,
-                                                  Any]) -> Tuple[float,
-                                                                 List[float]]:
+    def batch(self,
+              obs: np.ndarray,
+              names: Sequence[str],
+              month: Optional[np.ndarray] = None,
+              day: Optional[np.ndarray] = None,
+              hour: Optional[np.ndarray] = None
+              ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Calculate the reward function of T observations at once, e.g. to relabel logged transitions.
+
+        Gives the same values as calling the reward on each observation in turn. Rewards
+        with state (NormalizedLinearReward) start from the current state and do not update it.
+
+        Args:
+            obs (np.ndarray): (T, n_features) observations.
+            names (Sequence[str]): observation name of each feature column.
+            month (np.ndarray, optional): (T,) month of each observation. Defaults to the 'month' column.
+            day (np.ndarray, optional): (T,) day of month of each observation. Defaults to the 'day_of_month' column.
+            hour (np.ndarray, optional): (T,) hour of each observation. Defaults to the 'hour' column.
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: (T,) rewards and dictionary with their (T,) components.
+        """
+        obs = np.asarray(obs, dtype=np.float64)
+        if obs.ndim != 2 or obs.shape[1] != len(names):
+            raise ValueError(
+                f'obs must be (T, {len(names)}) to match names, got {obs.shape}.')
+        if tuple(names) != self._compiled_names:
+            self.compile(names)
+        month, day, hour = self._get_batch_calendar(obs, names, month, day, hour)
+        energy_columns = list(self._energy_columns)
+        temp_columns = list(self._temp_columns)
+
+        # Energy calculation
+        energy_consumed = self._sum_columns(obs, energy_columns)
+        energy_penalty = -energy_consumed
+
+        # Comfort violation calculation
+        temp_violations = self._get_batch_temperature_violations(
+            obs[:, temp_columns], month, day)
+        total_temp_violation = self._sum_columns(
+            temp_violations, range(temp_violations.shape[1]))
+        comfort_penalty = self._get_batch_comfort_penalty(temp_violations)
+
+        # Weighted sum of both terms
+        weight = self._get_batch_weight(len(obs), hour)
+        reward, energy_term, comfort_term = self._get_batch_reward(
+            energy_penalty, comfort_penalty, weight)
+
+        reward_terms = {
+            'energy_term': energy_term,
+            'comfort_term': comfort_term,
+            'reward_weight': weight,
+            'abs_energy_penalty': energy_penalty,
+            'abs_comfort_penalty': comfort_penalty,
+            'total_power_demand': energy_consumed,
+            'total_temperature_violation': total_temp_violation
+        }
+
+        return reward, reward_terms
+
+    def _get_energy_consumed(self, values: Sequence[float]) -> Tuple[float, List[float]]:
         """Calculate the total energy consumed in the current observation.
 
         Args:
-            obs_dict (Dict[str, Any]): Environment observation.
+            values (Sequence[float]): Observation values, in the compiled column order.
 
         Returns:
             Tuple[float, List[float]]: Total energy consumed (sum of variables) and List with energy consumed in each energy variable.
         """
 
-        energy_values = [
-            v for k, v in obs_dict.items() if k in self.energy_names]
+        energy_values = [float(values[i]) for i in self._energy_columns]
 
         # The total energy is the sum of energies
         total_energy = sum(energy_values)
@@ -156,38 +337,23 @@ class LinearReward(BaseReward):
         return total_energy, energy_values
 
     def _get_temperature_violation(
-            self, obs_dict: Dict[str, Any]) -> Tuple[float, List[float]]:
+            self, values: Sequence[float], month: int, day: int) -> Tuple[float, List[float]]:
         """Calculate the total temperature violation (ºC) in the current observation.
 
         Returns:
             Tuple[float, List[float]]: Total temperature violation (ºC) and list with temperature violation in each zone.
         """
 
-        month = obs_dict['month']
-        day = obs_dict['day_of_month']
-        year = YEAR
-        current_dt = datetime(int(year), int(month), int(day))
-
-        # Periods
-        summer_start_date = datetime(
-            int(year),
-            self.summer_start[0],
-            self.summer_start[1])
-        summer_final_date = datetime(
-            int(year),
-            self.summer_final[0],
-            self.summer_final[1])
-
-        if current_dt >= summer_start_date and current_dt <= summer_final_date:
+        # Periods, looked up by day of year
+        if self._summer_days[day_of_year(month, day)]:
             temp_range = self.range_comfort_summer
         else:
             temp_range = self.range_comfort_winter
 
-        temp_values = [
-            v for k, v in obs_dict.items() if k in self.temp_names]
         total_temp_violation = 0.0
         temp_violations = []
-        for T in temp_values:
+        for i in self._temp_columns:
+            T = float(values[i])
             if T < temp_range[0] or T > temp_range[1]:
                 temp_violation = min(
                     abs(temp_range[0] - T), abs(T - temp_range[1]))
@@ -196,6 +362,52 @@ class LinearReward(BaseReward):
 
         return total_temp_violation, temp_violations
 
+    def _get_batch_temperature_violations(self,
+                                          temp_values: np.ndarray,
+                                          month: np.ndarray,
+                                          day: np.ndarray) -> np.ndarray:
+        """Temperature violation (ºC) of each observation and zone, 0 inside the comfort range.
+
+        Args:
+            temp_values (np.ndarray): (T, n_zones) temperatures.
+            month (np.ndarray): (T,) months.
+            day (np.ndarray): (T,) days of month.
+
+        Returns:
+            np.ndarray: (T, n_zones) temperature violations.
+        """
+        summer = self._summer_days[day_of_year(np.asarray(month), np.asarray(day))]
+        low = np.where(summer, self.range_comfort_summer[0], self.range_comfort_winter[0])[:, None]
+        up = np.where(summer, self.range_comfort_summer[1], self.range_comfort_winter[1])[:, None]
+        outside = (temp_values < low) | (temp_values > up)
+        return np.where(outside, np.minimum(np.abs(low - temp_values), np.abs(temp_values - up)), 0.0)
+
+    @staticmethod
+    def _sum_columns(values: np.ndarray, columns) -> np.ndarray:
+        """Row sums adding the columns left to right, as `sum` does for one observation."""
+        total = np.zeros(len(values), dtype=np.float64)
+        for column in columns:
+            total += values[:, column]
+        return total
+
+    def _get_batch_comfort_penalty(self, temp_violations: np.ndarray) -> np.ndarray:
+        """Negative absolute comfort penalty of each observation, see `_get_comfort_penalty`."""
+        return -self._sum_columns(temp_violations, range(temp_violations.shape[1]))
+
+    def _get_batch_weight(self, size: int, hour: Optional[np.ndarray]) -> np.ndarray:
+        """Energy weight of each observation."""
+        return np.full(size, self.W_energy, dtype=np.float64)
+
+    def _get_batch_reward(self,
+                          energy_penalty: np.ndarray,
+                          comfort_penalty: np.ndarray,
+                          weight: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Reward of each observation, see `_get_reward`."""
+        energy_term = self.lambda_energy * weight * energy_penalty
+        comfort_term = self.lambda_temp * (1 - weight) * comfort_penalty
+        reward = energy_term + comfort_term
+        return reward, energy_term, comfort_term
+
     def _get_energy_penalty(self, energy_values: List[float]) -> float:
         """Calculate the negative absolute energy penalty based on energy values
 
@@ -295,6 +507,14 @@ class ExpReward(LinearReward):
             temp_violation) if temp_violation > 0 else 0, temp_violations)))
         return comfort_penalty
 
+    def _get_batch_comfort_penalty(self, temp_violations: np.ndarray) -> np.ndarray:
+        """Negative exponential comfort penalty of each observation, see `_get_comfort_penalty`."""
+        # math.exp on the violated entries only: np.exp may differ from it in the last bit
+        exp_violations = np.zeros_like(temp_violations)
+        violated = temp_violations > 0
+        exp_violations[violated] = np.frompyfunc(exp, 1, 1)(temp_violations[violated])
+        return -self._sum_columns(exp_violations, range(exp_violations.shape[1]))
+
 
 class HourlyLinearReward(LinearReward):
 
@@ -343,63 +563,33 @@ class HourlyLinearReward(LinearReward):
         self.range_comfort_hours = range_comfort_hours
         self.default_energy_weight = default_energy_weight
 
-    def __call__(self, obs_dict: Dict[str, Any]
-                 ) -> Tuple[float, Dict[str, Any]]:
-        """Calculate the reward function.
+    def score(self, values: Sequence[float], month: int, day: int,
+              hour: Optional[int] = None) -> Tuple[float, Dict[str, Any]]:
+        """Calculate the reward function of one observation, with the energy weight of its hour.
 
         Args:
-            obs_dict (Dict[str, Any]): Dict with observation variable name (key) and observation variable value (value)
+            values (Sequence[float]): Observation values, in the compiled column order.
+            month (int): Month of the observation.
+            day (int): Day of month of the observation.
+            hour (int): Hour of the observation.
 
         Returns:
             Tuple[float, Dict[str, Any]]: Reward value and dictionary with their individual components.
         """
-        # Check variables to calculate reward are available
-        try:
-            assert all(temp_name in list(obs_dict.keys())
-                       for temp_name in self.temp_names)
-        except AssertionError as err:
-            self.logger.error(
-                'Some of the temperature variables specified are not present in observation.')
-            raise err
-        try:
-            assert all(energy_name in list(obs_dict.keys())
-                       for energy_name in self.energy_names)
-        except AssertionError as err:
-            self.logger.error(
-                'Some of the energy variables specified are not present in observation.')
-            raise err
-
-        # Energy calculation
-        energy_consumed, energy_values = self._get_energy_consumed(obs_dict)
-        energy_penalty = self._get_energy_penalty(energy_values)
-
-        # Comfort violation calculation
-        total_temp_violation, temp_violations = self._get_temperature_violation(
-            obs_dict)
-        comfort_penalty = self._get_comfort_penalty(temp_violations)
-
         # Determine reward weight depending on the hour
-        hour = obs_dict['hour']
         if hour >= self.range_comfort_hours[0] and hour <= self.range_comfort_hours[1]:
             self.W_energy = self.default_energy_weight
         else:
             self.W_energy = 1.0
 
-        # Weighted sum of both terms
-        reward, energy_term, comfort_term = self._get_reward(
-            energy_penalty, comfort_penalty)
-
-        reward_terms = {
-            'energy_term': energy_term,
-            'comfort_term': comfort_term,
-            'reward_weight': self.W_energy,
-            'abs_energy_penalty': energy_penalty,
-            'abs_comfort_penalty': comfort_penalty,
-            'total_power_demand': energy_consumed,
-            'total_temperature_violation': total_temp_violation
-        }
+        return super(HourlyLinearReward, self).score(values, month, day, hour)
 
-        return reward, reward_terms
+    def _get_batch_weight(self, size: int, hour: Optional[np.ndarray]) -> np.ndarray:
+        """Energy weight of each observation, depending on the hour."""
+        if hour is None:
+            raise ValueError('hour is required by HourlyLinearReward.')
+        comfort_hours = (hour >= self.range_comfort_hours[0]) & (hour <= self.range_comfort_hours[1])
+        return np.where(comfort_hours, self.default_energy_weight, 1.0)
 
 
 class NormalizedLinearReward(LinearReward):
@@ -469,3 +659,22 @@ class NormalizedLinearReward(LinearReward):
         comfort_term = (1 - self.W_energy) * comfort_norm
         reward = energy_term + comfort_term
         return reward, energy_term, comfort_term
+
+    def _get_batch_reward(self,
+                          energy_penalty: np.ndarray,
+                          comfort_penalty: np.ndarray,
+                          weight: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Normalized reward of each observation, with the running maxima of `_get_reward`
+        starting from the current ones. The instance maxima are not updated.
+        """
+        max_energy = np.maximum.accumulate(
+            np.maximum(energy_penalty, self.max_energy_penalty))
+        max_comfort = np.maximum.accumulate(
+            np.maximum(comfort_penalty, self.max_comfort_penalty))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            energy_norm = np.where(energy_penalty == 0, 0.0, energy_penalty / max_energy)
+            comfort_norm = np.where(comfort_penalty == 0, 0.0, comfort_penalty / max_comfort)
+        energy_term = weight * energy_norm
+        comfort_term = (1 - weight) * comfort_norm
+        reward = energy_term + comfort_term
+        return reward, energy_term, comfort_term
@@ -0,0 +1,152 @@
+"""
+EPW weather files as typed numpy columns, cached on disk and indexed by hour of year.
+"""
+import json
+import os
+import numpy as np
+from typing import Any, Dict, Optional, Sequence, Union
+
+from .constant import CACHE_DIR
+from .fingerprint import file_digest
+
+# data columns of an EPW record, in file order
+EPW_FIELDS = (
+    "year", "month", "day", "hour", "minute", "data_source",
+    "dry_bulb_temperature", "dew_point_temperature", "relative_humidity", "atmospheric_pressure",
+    "extraterrestrial_horizontal_radiation", "extraterrestrial_direct_normal_radiation",
+    "horizontal_infrared_radiation", "global_horizontal_radiation", "direct_normal_radiation",
+    "diffuse_horizontal_radiation", "global_horizontal_illuminance", "direct_normal_illuminance",
+    "diffuse_horizontal_illuminance", "zenith_luminance", "wind_direction", "wind_speed",
+    "total_sky_cover", "opaque_sky_cover", "visibility", "ceiling_height", "present_weather_observation",
+    "present_weather_codes", "precipitable_water", "aerosol_optical_depth", "snow_depth",
+    "days_since_last_snowfall", "albedo", "liquid_precipitation_depth", "liquid_precipitation_quantity",
+)
+# the uncertainty flags are the only non numeric column
+_FLAGS_COLUMN = EPW_FIELDS.index("data_source")
+NUMERIC_FIELDS = EPW_FIELDS[:_FLAGS_COLUMN] + EPW_FIELDS[_FLAGS_COLUMN + 1:]
+HEADER_LINES = 8
+LOCATION_FIELDS = ("city", "state", "country", "source", "wmo", "latitude", "longitude", "timezone", "elevation")
+
+WEATHER_CACHE_DIR = os.path.join(CACHE_DIR, "weather")
+_MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def parse_epw(epw_file: str) -> Dict[str, Any]:
+    """
+    Parse an EPW file: header fields and every record, in one vectorized pass over the
+    comma separated values.
+    Returns:
+        Dict[str, Any]: "location", "header" (raw header lines by keyword),
+            "records_per_hour" and "data", the (n_records, len(NUMERIC_FIELDS)) float64 records.
+    """
+    with open(epw_file, "r", encoding="ISO-8859-1") as stream:
+        header = [next(stream).rstrip("\r\n") for _ in range(HEADER_LINES)]
+        body = stream.read()
+    rows = [row for row in body.splitlines() if row.strip()]
+    n_fields = len(EPW_FIELDS)
+    values = np.array(",".join(rows).split(","))
+    if len(values) != len(rows) * n_fields:
+        raise ValueError(f"{epw_file}: expected {n_fields} fields per record.")
+    table = values.reshape(len(rows), n_fields)
+    numeric = np.delete(table, _FLAGS_COLUMN, axis=1)
+    # blank fields (missing values) as NaN
+    numeric[numeric == ""] = "nan"
+    data = numeric.astype(np.float64)
+
+    location = dict(zip(LOCATION_FIELDS, header[0].split(",")[1:]))
+    for key in ("latitude", "longitude", "timezone", "elevation"):
+        location[key] = float(location[key])
+    data_periods = header[7].split(",")
+    return {
+        "location": location,
+        "header": {line.split(",", 1)[0]: line for line in header},
+        "records_per_hour": int(data_periods[2]) if len(data_periods) > 2 else 1,
+        "data": data,
+    }
+
+
+class EPWWeather:
+
+    def __init__(self, epw_file: str, cache_dir: Optional[str] = WEATHER_CACHE_DIR) -> None:
+        """
+        Hourly weather of an EPW file as numpy columns. The parsed records are cached as
+        a .npy file under the hash of the file content and memory-mapped by later loads,
+        so an edited file is parsed again and processes share the pages.
+        Args:
+            epw_file (str): EPW file, e.g. Generator.weather_file.
+            cache_dir (str, optional): cache directory, None to always parse.
+        """
+        self.epw_file = epw_file
+        entry = os.path.join(cache_dir, file_digest(epw_file)) if cache_dir else None
+        if entry and os.path.exists(os.path.join(entry, "data.npy")):
+            with open(os.path.join(entry, "meta.json"), "r", encoding="utf-8") as stream:
+                meta = json.load(stream)
+            self.data: np.ndarray = np.load(os.path.join(entry, "data.npy"), mmap_mode="r").view(np.ndarray)
+        else:
+            parsed = parse_epw(epw_file)
+            meta = {key: parsed[key] for key in ("location", "header", "records_per_hour")}
+            self.data = parsed["data"]
+            if entry:
+                self._save(entry, meta, self.data)
+        self.location: Dict[str, Any] = meta["location"]
+        self.header: Dict[str, str] = meta["header"]
+        self.records_per_hour: int = meta["records_per_hour"]
+        self.fields = NUMERIC_FIELDS
+        self.field_index: Dict[str, int] = {name: i for i, name in enumerate(NUMERIC_FIELDS)}
+        self.n_hours = len(self.data) // self.records_per_hour
+        leap = self.n_hours == 8784
+        self._month_start = np.concatenate([[0], np.cumsum(_MONTH_DAYS + (np.arange(12) == 1) * leap)[:-1]])
+
+    @staticmethod
+    def _save(entry: str, meta: Dict[str, Any], data: np.ndarray) -> None:
+        # written aside and renamed, so concurrent workers never read a partial entry
+        os.makedirs(entry, exist_ok=True)
+        tmp_suffix = f".{os.getpid()}.tmp"
+        with open(os.path.join(entry, "meta.json" + tmp_suffix), "w", encoding="utf-8") as stream:
+            json.dump(meta, stream)
+        with open(os.path.join(entry, "data.npy" + tmp_suffix), "wb") as stream:
+            np.save(stream, data)
+        os.replace(os.path.join(entry, "meta.json" + tmp_suffix), os.path.join(entry, "meta.json"))
+        os.replace(os.path.join(entry, "data.npy" + tmp_suffix), os.path.join(entry, "data.npy"))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Column of a field, e.g. weather["dry_bulb_temperature"].
+        """
+        return self.data[:, self.field_index[name]]
+
+    def columns(self, names: Sequence[str]) -> np.ndarray:
+        """
+        (n_records, len(names)) array of the given fields.
+        """
+        return self.data[:, [self.field_index[name] for name in names]]
+
+    def hour_of_year(self, month: Union[int, np.ndarray], day: Union[int, np.ndarray],
+                     hour: Union[int, np.ndarray]) -> Union[int, np.ndarray]:
+        """
+        Zero-based hour of year of a simulation clock (hour 0-23, as in EnergyPlus), on
+        scalars or arrays. The EPW record of hour h + 1 covers the clock hour h.
+        """
+        month = np.asarray(month)
+        index = (self._month_start[month - 1] + np.asarray(day) - 1) * 24 + np.asarray(hour)
+        return int(index) if index.ndim == 0 else index
+
+    def hourly(self, hour_of_year: Union[int, np.ndarray], names: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Records of hours of year (first record of each hour), all fields or the given ones.
+        Hours past the end of the file wrap around.
+        """
+        rows = (np.asarray(hour_of_year) % self.n_hours) * self.records_per_hour
+        if names is None:
+            return self.data[rows]
+        return self.data[rows][..., [self.field_index[name] for name in names]]
+
+    def at(self, month: Union[int, np.ndarray], day: Union[int, np.ndarray], hour: Union[int, np.ndarray],
+           names: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Records of simulation clocks, see hour_of_year.
+        """
+        return self.hourly(self.hour_of_year(month, day, hour), names)
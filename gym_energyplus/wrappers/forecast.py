@@ -0,0 +1,121 @@
+"""
+Weather forecast observations for EplusEnv, read from the EPW file of the simulation.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Any, Dict, Optional, Sequence, Union
+
+from ..env.observation_schema import ObservationSchema
+from ..util.weather import EPWWeather
+
+DEFAULT_FIELDS = ("dry_bulb_temperature", "relative_humidity", "global_horizontal_radiation")
+NOISE_MODELS = (None, "gaussian", "random_walk")
+
+
+class WeatherForecast:
+
+    def __init__(self,
+        env,
+        horizon: int = 24,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        weather_file: Optional[str] = None,
+        noise: Optional[str] = None,
+        noise_scale: Union[float, Sequence[float]] = 0.0,
+        seed: Optional[int] = None,
+        ) -> None:
+        """
+        Append the weather of the next `horizon` hours to every observation, as a
+        "forecast" observation group of horizon x len(fields) values, hour by hour.
+
+        The EPW records are laid out once as a (hours, horizon, fields) strided view, so a
+        step reads one row of it, indexed by the hour of year of the simulation clock.
+        Optional noise stands for forecast errors: "gaussian" adds independent errors of
+        std noise_scale, "random_walk" accumulates them over the lead hours (std growing
+        as the square root of the lead).
+        Args:
+            env (EplusEnv): environment whose info carries the clock.
+            horizon (int): forecast hours. Defaults to 24.
+            fields (Sequence[str]): EPW fields, see weather.NUMERIC_FIELDS.
+            weather_file (str, optional): EPW file. Defaults to the env generator's weather_file.
+            noise (str, optional): None, "gaussian" or "random_walk". Defaults to None.
+            noise_scale: std of the errors, for all fields or per field.
+            seed (int, optional): seed of the noise.
+        """
+        if noise not in NOISE_MODELS:
+            raise ValueError(f"unknown noise model {noise}, expected one of {NOISE_MODELS}.")
+        self.env = env
+        self.horizon = int(horizon)
+        self.fields = tuple(fields)
+        self.noise = noise
+        self.weather = EPWWeather(weather_file or env.generator.weather_file)
+
+        hourly = self.weather.columns(self.fields)[::self.weather.records_per_hour].astype(np.float32)
+        # wrap around the end of the year, then one window of the next hours per hour
+        padded = np.concatenate([hourly, hourly[:self.horizon + 1]])
+        self._windows = sliding_window_view(padded, self.horizon, axis=0).transpose(0, 2, 1)
+        self._n_hours = len(hourly)
+        self._std = np.broadcast_to(np.asarray(noise_scale, dtype=np.float32), (len(self.fields),)).copy()
+        self._rng = np.random.default_rng(seed)
+        self._noise = np.empty((self.horizon, len(self.fields)), dtype=np.float32)
+
+        forecast_names = [f"{field}_forecast_{lead}h" for lead in range(1, self.horizon + 1) for field in self.fields]
+        groups = {group: list(env.schema.names[group_slice]) for group, group_slice in env.schema.slices.items()}
+        groups["forecast"] = forecast_names
+        self.schema = ObservationSchema(groups, env.schema.action_names)
+        self.forecast_slice = self.schema.slices["forecast"]
+        try:
+            self.observation_space = self.schema.observation_space()
+        except ImportError:
+            self.observation_space = None
+        self._obs = np.zeros(self.schema.size, dtype=np.float32)
+
+    # ----------------env------------------------------------- #
+
+    def reset(self, *args, **kwargs):
+        obs, info = self.env.reset(*args, **kwargs)
+        return self._augment(obs, info), info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        return self._augment(obs, info), reward, terminated, truncated, info
+
+    def close(self) -> None:
+        self.env.close()
+
+    def __getattr__(self, name: str) -> Any:
+        # delegate everything else (action space, stats, ...) to the env
+        return getattr(self.env, name)
+
+    @property
+    def observation_names(self):
+        return self.schema.names
+
+    # ----------------forecast-------------------------------- #
+
+    def hour_of_year(self, info: Dict[str, Any]) -> int:
+        clock = info.get("clock")
+        if clock is not None:
+            return self.weather.hour_of_year(clock.month, clock.day, clock.hour)
+        return self.weather.hour_of_year(info["month"], info["day"], info["hour"])
+
+    def forecast(self, hour_of_year: int) -> np.ndarray:
+        """
+        (horizon, fields) weather of the hours after hour_of_year, with noise if any.
+        Noise-free forecasts are read-only views of the EPW records.
+        """
+        forecast = self._windows[(hour_of_year + 1) % self._n_hours]
+        if self.noise is None:
+            return forecast
+        self._rng.standard_normal(out=self._noise, dtype=np.float32)
+        if self.noise == "random_walk":
+            # cumulated errors: std of lead k is sqrt(k) * scale
+            np.cumsum(self._noise, axis=0, out=self._noise)
+        self._noise *= self._std
+        self._noise += forecast
+        return self._noise
+
+    def _augment(self, obs: np.ndarray, info: Dict[str, Any]) -> np.ndarray:
+        n = self.forecast_slice.start
+        self._obs[:n] = obs
+        self._obs[n:].reshape(self.horizon, len(self.fields))[...] = self.forecast(self.hour_of_year(info))
+        return self._obs.copy() if getattr(self.env, "copy", True) else self._obs
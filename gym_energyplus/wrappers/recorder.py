@@ -0,0 +1,320 @@
+"""
+Columnar trajectory recorder for EplusEnv, flushed to disk by a background thread.
+"""
+import glob
+import json
+import os
+import queue
+import threading
+import numpy as np
+from numbers import Number
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..util.logger import Logger
+from ..util.constant import LOG_LEVEL_GYM_ENV
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# clock fields recorded from info["clock"], see ClockSnapshot
+CLOCK_COLUMNS = ("month", "day", "hour", "minute", "day_of_week", "day_of_year")
+SCHEMA_FILE = "schema.json"
+
+
+class TrajectoryRecorder:
+
+    logger = Logger().getLogger("trajectory_recorder", LOG_LEVEL_GYM_ENV)
+
+    def __init__(self,
+        env,
+        out_dir: str,
+        chunk_size: int = 8760,
+        file_format: str = "auto",
+        info_keys: Optional[Sequence[str]] = None,
+        max_pending: int = 2,
+        ) -> None:
+        """
+        Record every reset and step of an EplusEnv into fixed-size column chunks, written
+        to out_dir by a background thread as chunk_<n>.npz or chunk_<n>.parquet files.
+
+        Rows hold the observation, the action that led to it (NaN after a reset), reward,
+        terminated, truncated, episode, timestep, the clock fields and numeric info entries.
+        Memory is bounded to max_pending + 2 chunks: step only writes into the current
+        chunk, and waits for the writer only if max_pending full chunks are still unwritten.
+        Args:
+            env (EplusEnv): environment to record.
+            out_dir (str): directory of the chunk files and of schema.json.
+            chunk_size (int): rows per chunk. Defaults to 8760, one year of hourly steps.
+            file_format (str): "npz", "parquet" or "auto" (parquet if pyarrow is installed).
+            info_keys (Sequence[str], optional): numeric info entries to record, e.g. reward
+                terms. Defaults to the numeric entries of the first step's info, the rows of
+                the first reset being held until then.
+            max_pending (int): full chunks waiting for the writer before step blocks.
+        """
+        if file_format == "auto":
+            file_format = "npz" if pa is None else "parquet"
+        if file_format not in ("npz", "parquet"):
+            raise ValueError(f"unknown file format {file_format}, expected 'npz', 'parquet' or 'auto'.")
+        if file_format == "parquet" and pa is None:
+            raise ImportError("pyarrow is required for the parquet format.")
+        self.env = env
+        self.out_dir = out_dir
+        self.chunk_size = int(chunk_size)
+        self.file_format = file_format
+        self.obs_names: Tuple[str, ...] = tuple(env.schema.names)
+        self.action_names: Tuple[str, ...] = tuple(env.schema.action_names)
+        self.info_keys: Optional[Tuple[str, ...]] = None if info_keys is None else tuple(info_keys)
+        os.makedirs(out_dir, exist_ok=True)
+
+        self.episode = -1
+        self.n_chunks = 0
+        self.stats: Dict[str, int] = {"rows": 0, "chunks_written": 0, "writer_stalls": 0}
+
+        # chunk pool: the current chunk, the one being written and max_pending in the queue
+        self._free: "queue.Queue[Dict[str, np.ndarray]]" = queue.Queue()
+        self._pending: "queue.Queue[Optional[Tuple[int, Dict[str, np.ndarray], int]]]" = queue.Queue(maxsize=max(1, max_pending))
+        self._n_allocated = 0
+        self._max_chunks = max(1, max_pending) + 2
+        self._chunk: Optional[Dict[str, np.ndarray]] = None
+        self._deferred: List[Tuple[Any, ...]] = []
+        self._cursor = 0
+        self._error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._write_loop, name="trajectory_writer", daemon=True)
+        self._writer.start()
+
+    # ----------------env------------------------------------- #
+
+    def reset(self, *args, **kwargs):
+        obs, info = self.env.reset(*args, **kwargs)
+        self.episode += 1
+        self._append(obs, None, np.nan, False, False, info)
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self._append(obs, action, reward, terminated, truncated, info)
+        return obs, reward, terminated, truncated, info
+
+    def close(self) -> None:
+        """
+        Write the partial chunk, stop the writer and close the env.
+        """
+        try:
+            self.flush()
+            self._pending.put(None)
+            self._writer.join()
+            self._raise_writer_error()
+        finally:
+            self.env.close()
+
+    def flush(self) -> None:
+        """
+        Hand the current partial chunk to the writer.
+        """
+        if self._deferred:
+            # info of the last held row
+            self._start(self._deferred[-1][5])
+        if self._chunk is not None and self._cursor:
+            self._submit()
+
+    def __getattr__(self, name: str) -> Any:
+        # delegate everything else (spaces, schema, stats, ...) to the env
+        return getattr(self.env, name)
+
+    # ----------------chunks---------------------------------- #
+
+    def _new_chunk(self) -> Dict[str, np.ndarray]:
+        n = self.chunk_size
+        chunk = {
+            "obs": np.zeros((n, len(self.obs_names)), dtype=np.float32),
+            "action": np.zeros((n, len(self.action_names)), dtype=np.float32),
+            "reward": np.zeros(n, dtype=np.float64),
+            "terminated": np.zeros(n, dtype=np.bool_),
+            "truncated": np.zeros(n, dtype=np.bool_),
+            "episode": np.zeros(n, dtype=np.int32),
+            "timestep": np.zeros(n, dtype=np.int32),
+            "clock": np.zeros((n, len(CLOCK_COLUMNS)), dtype=np.int16),
+            "sim_time": np.zeros(n, dtype=np.float64),
+            "info": np.zeros((n, len(self.info_keys)), dtype=np.float64),
+        }
+        return chunk
+
+    def _acquire_chunk(self) -> Dict[str, np.ndarray]:
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+        if self._n_allocated < self._max_chunks:
+            self._n_allocated += 1
+            return self._new_chunk()
+        # the writer is behind: wait for a written chunk
+        self.stats["writer_stalls"] += 1
+        return self._free.get()
+
+    def _start(self, info: Dict[str, Any]) -> None:
+        """
+        Freeze the info columns and write the rows held since the first reset.
+        """
+        if self.info_keys is None:
+            self.info_keys = tuple(
+                key for key, value in info.items()
+                if isinstance(value, Number) and key not in CLOCK_COLUMNS and key != "timestep")
+        self._write_schema()
+        self._chunk = self._acquire_chunk()
+        deferred, self._deferred = self._deferred, []
+        for row in deferred:
+            self._append(*row)
+
+    def _append(self, obs, action, reward, terminated, truncated, info: Dict[str, Any],
+                episode: Optional[int] = None) -> None:
+        self._raise_writer_error()
+        if episode is None:
+            episode = self.episode
+        if self._chunk is None:
+            if self.info_keys is None and action is None:
+                # reset info carries no reward terms yet, the row keeps the episode of its reset
+                self._deferred.append((np.array(obs), action, reward, terminated, truncated, dict(info), episode))
+                return
+            self._start(info)
+        chunk, row = self._chunk, self._cursor
+        chunk["obs"][row] = obs
+        if action is None:
+            chunk["action"][row] = np.nan
+        else:
+            chunk["action"][row] = action
+        chunk["reward"][row] = reward
+        chunk["terminated"][row] = terminated
+        chunk["truncated"][row] = truncated
+        chunk["episode"][row] = episode
+        chunk["timestep"][row] = info.get("timestep", 0)
+        clock = info.get("clock")
+        if clock is not None:
+            chunk["clock"][row] = [getattr(clock, field) for field in CLOCK_COLUMNS]
+            chunk["sim_time"][row] = clock.sim_time
+        info_row = chunk["info"][row]
+        for i, key in enumerate(self.info_keys):
+            info_row[i] = info.get(key, np.nan)
+        self._cursor += 1
+        self.stats["rows"] += 1
+        if self._cursor == self.chunk_size:
+            self._submit()
+
+    def _submit(self) -> None:
+        if self._pending.full():
+            self.stats["writer_stalls"] += 1
+        self._pending.put((self.n_chunks, self._chunk, self._cursor))
+        self.n_chunks += 1
+        self._chunk = self._acquire_chunk()
+        self._cursor = 0
+
+    def _raise_writer_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("trajectory writer failed.") from self._error
+
+    # ----------------writer---------------------------------- #
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            index, chunk, n_rows = item
+            try:
+                if self._error is None:
+                    self._write_chunk(index, chunk, n_rows)
+                    self.stats["chunks_written"] += 1
+            except BaseException as err:
+                self.logger.error(f"failed to write chunk {index}: {err}")
+                self._error = err
+            finally:
+                self._free.put(chunk)
+
+    def _write_chunk(self, index: int, chunk: Dict[str, np.ndarray], n_rows: int) -> None:
+        path = os.path.join(self.out_dir, f"chunk_{index:06d}.{self.file_format}")
+        tmp_path = path + ".tmp"
+        if self.file_format == "npz":
+            with open(tmp_path, "wb") as stream:
+                np.savez(stream, **{key: array[:n_rows] for key, array in chunk.items()})
+        else:
+            pq.write_table(pa.table(self._flat_columns(chunk, n_rows)), tmp_path)
+        os.replace(tmp_path, path)
+
+    def _flat_columns(self, chunk: Dict[str, np.ndarray], n_rows: int) -> Dict[str, np.ndarray]:
+        """
+        One column per observation, actuator, clock field and info entry.
+        """
+        columns: Dict[str, np.ndarray] = {}
+        for key, names in (("obs", self.obs_names), ("action", self.action_names),
+                           ("clock", CLOCK_COLUMNS), ("info", self.info_keys)):
+            for i, name in enumerate(names):
+                columns[f"{key}/{name}"] = chunk[key][:n_rows, i]
+        for key in ("reward", "terminated", "truncated", "episode", "timestep", "sim_time"):
+            columns[key] = chunk[key][:n_rows]
+        return columns
+
+    def _write_schema(self) -> None:
+        schema = {
+            "format": self.file_format,
+            "chunk_size": self.chunk_size,
+            "obs": list(self.obs_names),
+            "obs_groups": {group: [group_slice.start, group_slice.stop]
+                           for group, group_slice in self.env.schema.slices.items()},
+            "action": list(self.action_names),
+            "clock": list(CLOCK_COLUMNS),
+            "info": list(self.info_keys)
+        }
+        with open(os.path.join(self.out_dir, SCHEMA_FILE), "w", encoding="utf-8") as stream:
+            json.dump(schema, stream, indent=2)
+
+
+def read_schema(path: str) -> Dict[str, Any]:
+    """
+    Schema of a recording written by TrajectoryRecorder.
+    """
+    with open(os.path.join(path, SCHEMA_FILE), encoding="utf-8") as stream:
+        return json.load(stream)
+
+
+def iter_chunks(path: str, schema: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Columns of each chunk of a recording, in recording order.
+    Args:
+        path (str): recorder out_dir.
+        schema (Dict[str, Any], optional): recording schema, read from path by default.
+    """
+    schema = schema or read_schema(path)
+    for file in sorted(glob.glob(os.path.join(path, f"chunk_*.{schema['format']}"))):
+        if schema["format"] == "npz":
+            with np.load(file) as data:
+                yield {key: data[key] for key in data.files}
+        else:
+            if pq is None:
+                raise ImportError("pyarrow is required to read parquet recordings.")
+            table = pq.read_table(file)
+            chunk = {key: table.column(key).to_numpy() for key in
+                     ("reward", "terminated", "truncated", "episode", "timestep", "sim_time")}
+            for key in ("obs", "action", "clock", "info"):
+                chunk[key] = np.column_stack(
+                    [table.column(f"{key}/{name}").to_numpy() for name in schema[key]]) \
+                    if schema[key] else np.zeros((table.num_rows, 0))
+            yield chunk
+
+
+def load_recording(path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Read a recording written by TrajectoryRecorder.
+    Args:
+        path (str): recorder out_dir.
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, np.ndarray]]: schema and the columns of all the
+            chunks concatenated ("obs", "action", "reward", ...).
+    """
+    schema = read_schema(path)
+    parts: Dict[str, List[np.ndarray]] = {}
+    for chunk in iter_chunks(path, schema):
+        for key, array in chunk.items():
+            parts.setdefault(key, []).append(array)
+    return schema, {key: np.concatenate(arrays) for key, arrays in parts.items()}
@@ -1,6 +1,11 @@
 import os
+import sys
 import warnings
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(root_dir)
 from timer import WEEKDAY_ENCODING,  get_delta_seconds
+from gym_energyplus.util.idf_parser import load_index
 YEAR = 1991
 
 class EnergyPlusEnv():
@@ -24,28 +29,7 @@ class EnergyPlusEnv():
         Return:
             timesep: int
         """
-         
-        with open(idf_path, encoding = 'ISO-8859-1') as idf:
-            contents = idf.readlines()
-        step_size = None
-        # Step size
-        line_count = 0
-        for line in contents:
-            effectiveContent = line.strip().split('!')[0] # Ignore contents after '!'
-            effectiveContent = effectiveContent.strip().split(',')
-            if effectiveContent[0].strip().lower() == 'timestep':
-                if len(effectiveContent) > 1 and len(effectiveContent[1]) > 0:
-                    step_size = int(effectiveContent[1]
-                                   .split(';')[0]
-                                   .strip())
-                else:
-                    step_size = int(contents[line_count + 1].strip()
-                                                  .split('!')[0]
-                                                  .strip()
-                                                  .split(',')[0])
-                break
-            line_count += 1
-        return step_size
+        return load_index(idf_path).timestep()
 
     def get_eplus_run_period(self, idf_path, run_period_name):
         """
@@ -57,57 +41,19 @@ class EnergyPlusEnv():
                 The .idf file path.
             run_period_name: String
         
-        Return: (int, int, int, int, int, int)
-            (start month, start date, end month, end date, start weekday, 
-            step size)
+        Return: (int, int, int, int, int, int, int)
+            (start month, start date, start year, end month, end date, end year,
+            start weekday)
         """
-        ret = []
-        
-        with open(idf_path, encoding = 'ISO-8859-1') as idf:
-            contents = idf.readlines()
-        
-        # Run period
-        tgtIndex = None
-        find_run_period = False
-        
-        for i in range(len(contents)):
-            line = contents[i]
-            effectiveContent = line.strip().split('!')[0] # Ignore contents after '!'
-            effectiveContent = effectiveContent.strip().split(',')[0]
-                                                          # Remove tailing ','
-            if effectiveContent.lower() == 'runperiod':
-                print(contents[i+1])
-                tgtIndex = i
-                name = contents[tgtIndex+1].strip().split('!')[0].strip().split(',')
-                if len(name) > 0:
-                    if name[0] == run_period_name:
-                        find_run_period = True
-                        break
-                else:
-                   if run_period_name == '':
-                       find_run_period = True
-                       break
-
-        if not find_run_period:
+        # the file is indexed once, by the first call
+        run_period = load_index(idf_path).get('RunPeriod', run_period_name)
+        if run_period is None:
             warnings.warn(f"no run period name {run_period_name}")
             return None
-        
         # begin month, day, year and end month, date and year
-        for i in range(2, 8):
-            content = contents[tgtIndex + i].strip().split('!')[0].strip().split(',')[0]
-            if content != '':
-                content = int(content)
-            else:
-                content = None
-            ret.append(content)
-       
+        ret = [run_period.get_int(i) for i in range(1, 7)]
         # Start weekday
-        ret.append(WEEKDAY_ENCODING[contents[tgtIndex + i + 1].strip()
-                                                          .split('!')[0]
-                                                          .strip()
-                                                          .split(',')[0]
-                                                          .strip()
-                                                          .lower()])            
+        ret.append(WEEKDAY_ENCODING.get(run_period[7].lower()))
         return tuple(ret)
     
     def _get_one_epi_len(self, st_mon, st_day, ed_mon, ed_day):
@@ -3,12 +3,12 @@ import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.dirname(current_dir)
 sys.path.append(root_dir)
+from gym_energyplus.simulators.exchange import StepMailbox
 from gym_energyplus.simulators.gym_energyplus import GymEnergyPlus
 from gym_energyplus.util.constant import DATA_CONFIGURATION_PATH, DATA_BUILDINGS_PATH, DATA_WEATHER_PATH
 from gym_energyplus.generator.generator import Generator
 from gym_energyplus.util.logger import Logger, LOG_LEVEL_MODEL_JSON
 import time
-from queue import Queue
 # setup logger
 
 logger = Logger().getLogger("main_api", LOG_LEVEL_MODEL_JSON)
@@ -26,10 +26,8 @@ gen.load_by_data(conf)
 gen.weather_file = weather 
 gen.idf_file = idf_file 
 gen.out = out_dir
-obs_queue = Queue(maxsize=1)
-info_queue = Queue(maxsize=1)
-act_queue = Queue(maxsize=1)
-sim = GymEnergyPlus(logger, gen, obs_queue, info_queue, act_queue)
+mailbox = StepMailbox()
+sim = GymEnergyPlus(logger, gen, mailbox)
 for i in range(2):
     sim.reset()
     sim.run()
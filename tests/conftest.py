@@ -0,0 +1,108 @@
+"""
+Fixtures running EplusEnv against the fake EnergyPlus API.
+"""
+import json
+import os
+import sys
+import tempfile
+
+# caches of the package go to a scratch directory, read when the package is imported
+os.environ.setdefault("GYM_EPLUS_CACHE_DIR", tempfile.mkdtemp(prefix="gym_eplus_cache_"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from gym_energyplus.env.eplus_env import EplusEnv
+from gym_energyplus.simulators.fake_api import FakeEnergyPlusAPI
+from gym_energyplus.wrappers.recorder import TrajectoryRecorder
+
+FAKE_IDF = """Version,
+    23.1;                    !- Version Identifier
+
+Timestep,
+    1;                       !- Number of Timesteps per Hour
+"""
+
+
+def write_config(directory: str, n_variables: int = 2, n_meters: int = 1, n_actuators: int = 2) -> str:
+    """
+    Handle configuration for the fake backend, with a small IDF and episodes under directory.
+    """
+    out_path = os.path.join(directory, "out")
+    os.makedirs(out_path, exist_ok=True)
+    idf_file = os.path.join(directory, "fake.idf")
+    with open(idf_file, "w", encoding="utf-8") as stream:
+        stream.write(FAKE_IDF)
+    conf = {
+        "variables": {f"VAR_{i}": {"variable_name": "Zone Mean Air Temperature", "variable_key": f"ZONE {i}"}
+                      for i in range(n_variables)},
+        "meters": {f"METER_{i}": {"meter_name": f"Meter{i}:Electricity"} for i in range(n_meters)},
+        "internal_variables": {},
+        "actuators": {f"ACT_{i}": {"component_type": "Schedule:Compact", "control_type": "Schedule Value",
+                                   "actuator_type": f"SETPOINT {i}"} for i in range(n_actuators)},
+        "path": {"weather_file": os.path.join(directory, "fake.epw"), "idf_file": idf_file, "out_path": out_path}
+    }
+    conf_path = os.path.join(directory, "fake_configuration.json")
+    with open(conf_path, "w", encoding="utf-8") as stream:
+        json.dump(conf, stream)
+    return conf_path
+
+
+def zero_reward(obs):
+    return 0.0, {}
+
+
+@pytest.fixture
+def config_path(tmp_path) -> str:
+    return write_config(str(tmp_path))
+
+
+@pytest.fixture
+def make_env(config_path):
+    """
+    Factory of EplusEnv on the fake api (2 run days, 1 warmup day by default), closed
+    at teardown.
+    """
+    envs = []
+
+    def make(reward_func=zero_reward, run_days: int = 2, warmup_days: int = 1, api=None, **kwargs) -> EplusEnv:
+        api = api or FakeEnergyPlusAPI(run_days=run_days, warmup_days=warmup_days)
+        env = EplusEnv(config_path, reward_func, api=api, **kwargs)
+        envs.append(env)
+        return env
+
+    yield make
+    for env in envs:
+        env.close()
+
+
+# constant action of each recorded episode
+RECORDED_ACTIONS = ([20.0, 24.0], [22.0, 26.0], [18.0, 30.0])
+
+
+def run_episode(env, action):
+    """
+    Reset, then step with a constant action until the episode ends.
+    Returns:
+        int: number of steps.
+    """
+    env.reset()
+    steps = 0
+    terminated = truncated = False
+    while not (terminated or truncated):
+        _, _, terminated, truncated, _ = env.step(action)
+        steps += 1
+    return steps
+
+
+@pytest.fixture
+def recording(make_env, tmp_path) -> str:
+    """
+    Recorder out_dir (npz chunks of 16 rows) of one 1-day episode per RECORDED_ACTIONS.
+    """
+    out_dir = str(tmp_path / "recording")
+    recorder = TrajectoryRecorder(make_env(run_days=1), out_dir, chunk_size=16, file_format="npz")
+    for action in RECORDED_ACTIONS:
+        run_episode(recorder, action)
+    recorder.close()
+    return out_dir
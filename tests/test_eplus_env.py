@@ -0,0 +1,33 @@
+import time
+
+from conftest import run_episode
+
+
+def test_observation_variables_name_every_observation_value(make_env):
+    env = make_env()
+    obs, info = env.reset()
+    assert env.observation_variables == list(env.observation_names)
+    assert len(env.observation_variables) == len(obs)
+    assert env.observation_variables[-len(env.action_variables):] == env.action_variables
+
+
+class SlowAgent:
+    """
+    Steps after the simulation had time to finish the run.
+    """
+
+    def __init__(self, env) -> None:
+        self.env = env
+
+    def reset(self):
+        return self.env.reset()
+
+    def step(self, action):
+        time.sleep(0.005)
+        return self.env.step(action)
+
+
+def test_slow_agent_receives_the_last_observation(make_env):
+    fast = run_episode(make_env(run_days=1, simulator_name="fast-"), [21.0, 24.0])
+    slow = run_episode(SlowAgent(make_env(run_days=1, simulator_name="slow-")), [21.0, 24.0])
+    assert slow == fast == 24
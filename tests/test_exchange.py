@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from gym_energyplus.simulators.exchange import SimulationStatus, StepMailbox
+
+
+def blocked(call):
+    """
+    Run call in a thread, returns the thread and the list its result is appended to.
+    The thread is checked to be blocked before returning.
+    """
+    result = []
+    thread = threading.Thread(target=lambda: result.append(call()), daemon=True)
+    thread.start()
+    thread.join(0.05)
+    assert thread.is_alive(), "call returned without waiting"
+    return thread, result
+
+
+@pytest.mark.parametrize("stop, status", [
+    (StepMailbox.finish, SimulationStatus.FINISHED),
+    (StepMailbox.fail, SimulationStatus.FAILED),
+    (StepMailbox.close, SimulationStatus.CLOSED),
+])
+def test_stopping_wakes_up_a_waiting_agent(stop, status):
+    mailbox = StepMailbox()
+    thread, result = blocked(mailbox.get)
+    stop(mailbox)
+    thread.join(1.0)
+    assert not thread.is_alive()
+    assert result == [None]
+    assert mailbox.status is status
+
+
+@pytest.mark.parametrize("stop", [StepMailbox.finish, StepMailbox.fail, StepMailbox.close])
+def test_stopping_wakes_up_a_waiting_simulator(stop):
+    mailbox = StepMailbox()
+    assert mailbox.publish(1, {})
+    # the slot is full, the next observation waits for the agent
+    thread, result = blocked(lambda: mailbox.publish(2, {}))
+    stop(mailbox)
+    thread.join(1.0)
+    assert result == [False]
+
+    mailbox = StepMailbox()
+    thread, result = blocked(mailbox.wait_action)
+    stop(mailbox)
+    thread.join(1.0)
+    assert result == [None]
+
+
+def test_step_hands_the_action_over_and_waits_for_the_next_observation():
+    mailbox = StepMailbox()
+    thread, result = blocked(lambda: mailbox.step("action"))
+    assert mailbox.wait_action(timeout=1.0) == "action"
+    assert mailbox.publish("obs", {"t": 1})
+    thread.join(1.0)
+    assert result == [("obs", {"t": 1})]
+    # no new action: the simulator keeps the previous actuator values
+    assert mailbox.take_action() is None
+
+
+def test_get_times_out_and_clear_runs_again():
+    mailbox = StepMailbox()
+    assert mailbox.get(timeout=0.01) is None
+    assert mailbox.status is SimulationStatus.RUNNING
+
+    mailbox.publish("obs", {})
+    mailbox.put_action("action")
+    mailbox.finish()
+    # an observation published before the end is still delivered
+    assert mailbox.get() == ("obs", {})
+    mailbox.clear()
+    assert mailbox.status is SimulationStatus.RUNNING
+    assert mailbox.take_action() is None
+    assert mailbox.get(timeout=0.01) is None
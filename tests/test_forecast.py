@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pytest
+
+from gym_energyplus.util.constant import DATA_WEATHER_PATH
+from gym_energyplus.wrappers.forecast import WeatherForecast
+
+WEATHER_FILE = os.path.join(DATA_WEATHER_PATH, "USA_NY_New.York-John.F.Kennedy.Intl.AP.744860_TMY3.epw")
+
+
+def test_forecast_group_only_in_the_wrapper_schema(make_env):
+    env = make_env(run_days=1)
+    assert "forecast" not in env.schema.slices
+
+    wrapped = WeatherForecast(env, horizon=3, fields=("dry_bulb_temperature",), weather_file=WEATHER_FILE)
+    assert "forecast" not in env.schema.slices
+    assert list(wrapped.schema.slices) == list(env.schema.slices) + ["forecast"]
+    assert wrapped.forecast_slice == slice(env.schema.size, env.schema.size + 3)
+
+    obs, info = wrapped.reset()
+    assert obs.shape == (wrapped.schema.size,)
+    hour = wrapped.hour_of_year(info)
+    np.testing.assert_allclose(obs[wrapped.forecast_slice], wrapped.weather.hourly(np.arange(hour + 1, hour + 4),
+                                                                                   ["dry_bulb_temperature"])[:, 0])
+
+
+@pytest.mark.parametrize("noise", ["gaussian", "random_walk"])
+def test_noise_models(make_env, noise):
+    scale = np.array([0.5, 2.0])
+    wrapped = WeatherForecast(make_env(run_days=1), horizon=6, fields=("dry_bulb_temperature", "relative_humidity"),
+                              weather_file=WEATHER_FILE, noise=noise, noise_scale=scale, seed=0)
+    windows = wrapped._windows.copy()
+    clean = wrapped._windows[101]
+    errors = np.stack([wrapped.forecast(100) - clean for _ in range(4000)])
+
+    leads = np.arange(1, 7)[:, None]
+    expected = scale * (np.sqrt(leads) if noise == "random_walk" else np.ones_like(leads))
+    np.testing.assert_allclose(errors.std(axis=0), expected, rtol=0.06)
+    np.testing.assert_allclose(errors.mean(axis=0), 0.0, atol=0.1 * expected.max())
+    # the EPW windows are read, never written
+    np.testing.assert_array_equal(wrapped._windows, windows)
+
+    # seeded draws are reproduced
+    again = WeatherForecast(make_env(run_days=1, simulator_name="again-"), horizon=6,
+                            fields=("dry_bulb_temperature", "relative_humidity"), weather_file=WEATHER_FILE,
+                            noise=noise, noise_scale=scale, seed=0)
+    np.testing.assert_array_equal(again.forecast(100) - clean, errors[0])
+
+
+def test_unknown_noise_model(make_env):
+    with pytest.raises(ValueError, match="unknown noise model"):
+        WeatherForecast(make_env(run_days=1), weather_file=WEATHER_FILE, noise="uniform")
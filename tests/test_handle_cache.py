@@ -0,0 +1,101 @@
+import logging
+import os
+
+import pytest
+
+from conftest import run_episode
+from gym_energyplus.generator.generator import Generator
+from gym_energyplus.simulators.fake_api import FakeEnergyPlusAPI
+from gym_energyplus.simulators.handle_cache import HandleCache, energyplus_build
+
+ACTION = [21.0, 24.0]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch) -> HandleCache:
+    """
+    Handle cache of the envs of a test, in its own directory.
+    """
+    cache = HandleCache(str(tmp_path / "handles"))
+    monkeypatch.setattr("gym_energyplus.env.eplus_env.HandleCache", lambda: cache)
+    return cache
+
+
+def resolved_catalog(env) -> bool:
+    # the api data catalog is only dumped when the handles are resolved
+    return os.path.exists(os.path.join(env.energyplus_simulator.current_path, "data_available.txt"))
+
+
+def test_cached_handles_skip_resolution(make_env, cache, caplog):
+    first = make_env(run_days=1, handle_cache=True, simulator_name="first-")
+    run_episode(first, ACTION)
+    assert resolved_catalog(first)
+    key = first.energyplus_simulator.handle_cache_key
+    assert cache.load(key) is not None
+    assert os.path.exists(cache.catalog_path(key))
+
+    caplog.set_level(logging.INFO)
+    second = make_env(run_days=1, handle_cache=True, simulator_name="second-")
+    assert run_episode(second, ACTION) == 24
+    assert second.energyplus_simulator.handle_cache_key == key
+    assert not resolved_catalog(second)
+    assert "handlers are ready (cached)." in caplog.text
+    assert second.energyplus_simulator.var_handlers == first.energyplus_simulator.var_handlers
+
+
+def test_stale_entry_is_resolved_again(make_env, cache, caplog):
+    first = make_env(run_days=1, handle_cache=True, simulator_name="first-")
+    run_episode(first, ACTION)
+    key = first.energyplus_simulator.handle_cache_key
+    handlers = cache.load(key)
+    resolved = dict(handlers["var_handlers"])
+    # another build of the same model numbers its handles differently
+    handlers["var_handlers"] = {name: handle + 100 for name, handle in resolved.items()}
+    cache.save(key, handlers)
+
+    second = make_env(run_days=1, handle_cache=True, simulator_name="second-")
+    assert run_episode(second, ACTION) == 24
+    assert "is stale, resolving handlers." in caplog.text
+    assert resolved_catalog(second)
+    assert second.energyplus_simulator.var_handlers == resolved
+    # the entry is replaced by the resolved handles
+    assert cache.load(key)["var_handlers"] == resolved
+
+
+def test_key_inputs(config_path, tmp_path):
+    generator = Generator()
+    generator.load_by_data(config_path)
+    cache = HandleCache(str(tmp_path / "handles"))
+    build = energyplus_build(FakeEnergyPlusAPI())
+    assert build.startswith("api:")
+
+    # design day runs: no weather file
+    assert not os.path.exists(generator.weather_file)
+    key = cache.key(generator, build)
+    assert cache.key(generator, "idd:other") != key
+    with open(generator.weather_file, "w", encoding="utf-8") as stream:
+        stream.write("weather")
+    assert cache.key(generator, build) != key
+
+    generator.meters["METER_1"] = {"meter_name": "Meter1:Electricity"}
+    assert cache.key(generator, build) != key
+    generator.idf_file = str(tmp_path / "missing.idf")
+    with pytest.raises(FileNotFoundError):
+        cache.key(generator, build)
+
+
+def test_energyplus_build_of_an_install(tmp_path):
+    install = tmp_path / "EnergyPlus-23-1-0"
+    install.mkdir()
+    library = install / "libenergyplusapi.so"
+    library.write_text("")
+    assert energyplus_build(None, str(library)) is None
+    idd = tmp_path / "Energy+.idd"
+    idd.write_text("!IDD_Version 23.1.0\n")
+    # next to the install directory, or the IDD of the generator
+    assert energyplus_build(None, str(install)) == energyplus_build(None, str(library), str(idd))
+    assert energyplus_build(None, str(install)).startswith("idd:")
+    generator_build = energyplus_build(None, str(library), str(idd))
+    # the IDD of the install comes first
+    (install / "Energy+.idd").write_text("!IDD_Version 23.2.0\n")
+    assert energyplus_build(None, str(library), str(idd)) == energyplus_build(None, str(library)) != generator_build
@@ -0,0 +1,145 @@
+import shutil
+
+import pytest
+from eppy.modeleditor import IDF
+
+from gym_energyplus.generator.idf_cache import IDFCache
+
+MINI_IDD = """!IDD_Version 23.1.0
+\\group Simulation Parameters
+
+Version,
+      \\unique-object
+  A1 ; \\field Version Identifier
+      \\default 23.1
+
+Timestep,
+      \\unique-object
+  N1 ; \\field Number of Timesteps per Hour
+      \\default 6
+
+Zone,
+  A1 , \\field Name
+      \\required-field
+  N1 , \\field Direction of Relative North
+      \\default 0
+  N2 ; \\field Multiplier
+      \\default 1
+"""
+
+MINI_IDF = """Version, 23.1;
+Timestep, 4;
+Zone,
+    ZONE ONE,                !- Name
+    0,                       !- Direction of Relative North
+    1;                       !- Multiplier
+"""
+
+
+class CountingCache(IDFCache):
+    """
+    IDFCache counting the parsed models it stores, i.e. its misses.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        super().__init__(cache_dir)
+        self.saved = 0
+
+    def save(self, key, idf) -> None:
+        self.saved += 1
+        super().save(key, idf)
+
+
+def new_process(monkeypatch) -> None:
+    # eppy keeps its IDD on the IDF class, unset as in a new process
+    for attr in ("iddname", "idd_info", "block", "idd_index", "idd_version"):
+        monkeypatch.setattr(IDF, attr, None, raising=False)
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    new_process(monkeypatch)
+    idd_file = tmp_path / "mini.idd"
+    idd_file.write_text(MINI_IDD)
+    idf_file = tmp_path / "mini.idf"
+    idf_file.write_text(MINI_IDF)
+    return str(idf_file), str(idd_file)
+
+
+def test_round_trip(files, tmp_path, monkeypatch):
+    idf_file, idd_file = files
+    cache = CountingCache(str(tmp_path / "idf"))
+    parsed = cache.get(idf_file, idd_file)
+    assert cache.saved == 1
+
+    new_process(monkeypatch)
+    idf = cache.get(idf_file, idd_file)
+    # loaded from the entry
+    assert cache.saved == 1
+    assert IDF.getiddname() == idd_file
+    assert idf.idfstr() == parsed.idfstr()
+    assert idf.idfobjects["TIMESTEP"][0].Number_of_Timesteps_per_Hour == 4
+
+    # the loaded model is editable, new objects take the IDD defaults
+    idf.idfobjects["ZONE"][0].Multiplier = 2
+    zone = idf.newidfobject("ZONE", Name="ZONE TWO")
+    assert zone.Multiplier == 1
+    out_file = str(tmp_path / "edited.idf")
+    idf.saveas(out_file)
+    edited = IDF(out_file)
+    assert [z.Name for z in edited.idfobjects["ZONE"]] == ["ZONE ONE", "ZONE TWO"]
+    assert edited.idfobjects["ZONE"][0].Multiplier == 2
+
+
+def test_edited_file_gets_a_new_key(files, tmp_path):
+    idf_file, idd_file = files
+    cache = CountingCache(str(tmp_path / "idf"))
+    key = cache.key(idf_file, idd_file)
+    cache.get(idf_file, idd_file)
+    with open(idf_file, "w", encoding="utf-8") as stream:
+        stream.write(MINI_IDF.replace("Timestep, 4;", "Timestep, 6;"))
+    assert cache.key(idf_file, idd_file) != key
+    idf = cache.get(idf_file, idd_file)
+    assert cache.saved == 2
+    assert idf.idfobjects["TIMESTEP"][0].Number_of_Timesteps_per_Hour == 6
+
+
+@pytest.mark.parametrize("damage", ["truncate", "garbage"])
+def test_corrupt_entry_is_parsed_again(files, tmp_path, monkeypatch, damage):
+    idf_file, idd_file = files
+    cache = CountingCache(str(tmp_path / "idf"))
+    cache.get(idf_file, idd_file)
+    path = cache.entry_path(cache.key(idf_file, idd_file))
+    with open(path, "rb") as stream:
+        content = stream.read()
+    with open(path, "wb") as stream:
+        stream.write(content[:len(content) // 2] if damage == "truncate" else b"not a pickle")
+
+    new_process(monkeypatch)
+    idf = cache.get(idf_file, idd_file)
+    assert cache.saved == 2
+    assert idf.idfobjects["ZONE"][0].Name == "ZONE ONE"
+    # the entry is replaced
+    assert cache.load(cache.key(idf_file, idd_file), idd_file) is not None
+
+
+def test_another_idd_already_set(files, tmp_path):
+    idf_file, idd_file = files
+    cache = CountingCache(str(tmp_path / "idf"))
+    cache.get(idf_file, idd_file)
+
+    # the same IDD at another path is accepted
+    copy = str(tmp_path / "copy.idd")
+    shutil.copy(idd_file, copy)
+    assert cache.get(idf_file, copy).idfobjects["ZONE"][0].Name == "ZONE ONE"
+
+    other = str(tmp_path / "other.idd")
+    with open(other, "w", encoding="utf-8") as stream:
+        stream.write(MINI_IDD.replace("\\default 6", "\\default 1"))
+    with pytest.raises(RuntimeError, match="already uses the IDD"):
+        # miss
+        cache.get(idf_file, other)
+    cache.save(cache.key(idf_file, other), IDF(idf_file))
+    with pytest.raises(RuntimeError, match="already uses the IDD"):
+        # hit
+        cache.get(idf_file, other)
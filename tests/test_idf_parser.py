@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from gym_energyplus.util.idf_parser import IDFIndex, load_index, parse_object
+
+IDF = """! header comment, with a comma, and a semicolon;
+Version,23.1;  ! trailing comment
+
+Timestep
+    ,                        !- class name and delimiter on separate lines
+    4
+    ;                        !- Number of Timesteps per Hour
+
+RunPeriod,
+    Winter Run,              !- Name
+    1,                       !- Begin Month
+    2,                       !- Begin Day of Month
+    ,                        !- Begin Year
+    3, 31,                   !- End Month, End Day of Month
+    ,                        !- End Year
+    Tuesday;                 !- Day of Week for Start Day
+
+runperiod, Summer, 6, 1, 2017, 6, 30, 2017, UseWeatherFile;
+
+Zone,Main Zone,0,
+  0,0,0;Zone,  Attic  ;
+"""
+
+
+@pytest.fixture
+def idf_path(tmp_path) -> str:
+    path = str(tmp_path / "model.idf")
+    with open(path, "w", encoding="utf-8") as stream:
+        stream.write(IDF)
+    return path
+
+
+def test_objects_across_lines_and_comments(idf_path):
+    index = IDFIndex(idf_path)
+    assert index.classes() == ["Version", "Timestep", "RunPeriod", "Zone"]
+    assert len(index) == 6
+    assert [obj.fields for obj in index.objects("Zone")] == [["Main Zone", "0", "0", "0", "0"], ["Attic"]]
+    winter = index.objects("RunPeriod")[0]
+    assert winter.fields == ["Winter Run", "1", "2", "", "3", "31", "", "Tuesday"]
+    # byte ranges cover the object text
+    with open(idf_path, "rb") as stream:
+        stream.seek(winter.start)
+        assert parse_object(stream.read(winter.end - winter.start)) == ("RunPeriod", winter.fields)
+
+
+def test_get_is_case_insensitive(idf_path):
+    index = IDFIndex(idf_path)
+    assert "RUNPERIOD" in index and "zone" in index
+    assert index.count("RUNPERIOD") == 2
+    assert index.names("zone") == ["Main Zone", "Attic"]
+    assert index.get("runPERIOD", "summer").fields[:3] == ["Summer", "6", "1"]
+    assert index.get("ZONE", "ATTIC").name == "Attic"
+    assert index.get("Zone").name == "Main Zone"
+    assert index.get("Zone", "Cellar") is None
+    assert index.get("Building") is None
+    assert index.classes("run*") == ["RunPeriod"]
+
+
+def test_timestep_and_run_periods(idf_path):
+    index = IDFIndex(idf_path)
+    assert index.timestep() == 4
+    winter, summer = index.run_periods()
+    assert winter == {"name": "Winter Run", "begin_month": 1, "begin_day": 2, "begin_year": None,
+                      "end_month": 3, "end_day": 31, "end_year": None, "start_day_of_week": "tuesday"}
+    assert (summer["begin_year"], summer["end_year"]) == (2017, 2017)
+    assert summer["start_day_of_week"] is None
+
+
+def test_load_index_follows_the_file(idf_path):
+    index = load_index(idf_path)
+    assert load_index(idf_path) is index
+    with open(idf_path, "w", encoding="utf-8") as stream:
+        stream.write(IDF.replace("    4\n", "    6\n") + "Zone, Cellar;\n")
+    stat = os.stat(idf_path)
+    # another mtime even on coarse clocks
+    os.utime(idf_path, ns=(stat.st_atime_ns, index.mtime_ns + 1_000_000_000))
+    assert index.is_stale()
+    reindexed = load_index(idf_path)
+    assert reindexed is not index
+    assert reindexed.timestep() == 6
+    assert reindexed.names("Zone") == ["Main Zone", "Attic", "Cellar"]
@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+
+ACTION = [21.0, 24.0]
+CALLBACK = "callback.end_zone_timestep_after_zone_reporting"
+
+
+def wait_for(predicate, timeout: float = 5.0) -> None:
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.001)
+
+
+def launch_standby(env):
+    """
+    Reset, then step once so that the next episode starts ahead (prefetch_at=0).
+    """
+    env.reset()
+    env.step(ACTION)
+    standby = env._standby
+    assert standby is not None
+    # parked at its first observation
+    wait_for(lambda: standby.mailbox._has_obs)
+    return standby
+
+
+def test_reset_swaps_in_the_prefetched_episode(make_env):
+    env = make_env(prefetch=True, prefetch_at=0.0)
+    standby = launch_standby(env)
+    assert env.is_running
+
+    obs, info = env.reset()
+    assert env.energyplus_simulator is standby
+    assert env.stats["prefetched_resets"] == 1
+    assert info["clock"].sim_time == 1.0
+    assert obs.shape == (env.schema.size,)
+
+
+def test_stopping_the_current_run_keeps_the_standby_callbacks(make_env):
+    env = make_env(prefetch=True, prefetch_at=0.0)
+    launch_standby(env)
+    previous = env.energyplus_simulator
+
+    # the current run is stopped mid-episode while the standby is live
+    env.reset()
+    assert not previous.is_running
+    assert previous.energyplus_thread is None
+
+    # the standby kept its callbacks: the episode advances past the next day (the fake
+    # api looks callbacks up daily) and actions reach the actuators
+    times = []
+    for _ in range(30):
+        obs, reward, terminated, truncated, info = env.step(ACTION)
+        assert not (terminated or truncated)
+        times.append(info["clock"].sim_time)
+    assert np.all(np.diff(times) > 0)
+    actuators = env.schema.slices["actuators"]
+    np.testing.assert_allclose(obs[actuators], ACTION)
+
+
+def test_standby_warmup_is_profiled_in_its_own_episode(make_env):
+    env = make_env(prefetch=True, prefetch_at=0.0, profile=True, warmup_days=2)
+    launch_standby(env)
+    env.reset()
+    finished = env.profiler.episodes[-1]["sections"][CALLBACK]["count"]
+    current = env.profiler.summary()["sections"][CALLBACK]["count"]
+    # 48 warmup timesteps each, the first episode ran only a few steps past its warmup
+    assert finished < 48 + 10
+    assert current >= 48
+
+
+def test_close_with_a_live_standby(make_env):
+    env = make_env(prefetch=True, prefetch_at=0.0)
+    standby = launch_standby(env)
+    current = env.energyplus_simulator
+    env.close()
+    assert env._standby is None
+    assert not standby.is_running
+    assert not current.is_running
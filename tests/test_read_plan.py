@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from gym_energyplus.simulators.read_plan import ObservationReducer
+
+# temperature, meter, setpoint over two windows of 3 zone timesteps
+TRAJECTORY = np.array([
+    [20.0, 100.0, 21.0],
+    [22.0, 300.0, 22.0],
+    [24.0, 200.0, 23.0],
+    [19.0, 0.0, 24.0],
+    [18.0, 50.0, 25.0],
+    [17.0, 10.0, 26.0],
+])
+# by hand: mean of the temperatures, sum of the meter, last setpoint
+EXPECTED = np.array([
+    [22.0, 600.0, 23.0],
+    [18.0, 60.0, 26.0],
+])
+
+
+def test_windows_are_reduced_by_rule():
+    reducer = ObservationReducer(["temperature", "meter", "setpoint"], 3, {"temperature": "mean", "meter": "sum"})
+    reduced = []
+    for values in TRAJECTORY:
+        if reducer.add(values):
+            reduced.append(reducer.reduce(values).copy())
+    np.testing.assert_allclose(reduced, EXPECTED)
+    assert reducer.count == 0
+
+
+def test_default_rule_and_reset():
+    reducer = ObservationReducer(["temperature", "meter", "setpoint"], 3, {"setpoint": "last"}, default_rule="sum")
+    assert not reducer.add(TRAJECTORY[0])
+    reducer.reset()
+    for values in TRAJECTORY[3:]:
+        full = reducer.add(values)
+    assert full
+    np.testing.assert_allclose(reducer.reduce(TRAJECTORY[5]), [54.0, 60.0, 26.0])
+
+
+def test_output_slots_rotate():
+    reducer = ObservationReducer(["meter"], 1, {"meter": "sum"}, n_slots=2)
+    reducer.add(np.array([1.0]))
+    first = reducer.reduce(np.array([1.0]))
+    reducer.add(np.array([2.0]))
+    second = reducer.reduce(np.array([2.0]))
+    # the previous observation is still valid while the next one is written
+    assert first is not second
+    assert first[0] == 1.0 and second[0] == 2.0
+
+
+def test_unknown_rule():
+    with pytest.raises(ValueError):
+        ObservationReducer(["meter"], 2, {"meter": "max"})
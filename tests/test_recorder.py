@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from conftest import run_episode
+from gym_energyplus.wrappers.recorder import CLOCK_COLUMNS, TrajectoryRecorder, load_recording
+
+ACTIONS = ([20.0, 24.0], [22.0, 26.0])
+
+
+def comfort_reward(obs):
+    comfort = -abs(obs["VAR_0"] - 22.0)
+    return comfort, {"comfort": comfort}
+
+
+@pytest.mark.parametrize("file_format", ["npz", "parquet"])
+def test_recording_round_trip(make_env, tmp_path, file_format):
+    if file_format == "parquet":
+        pytest.importorskip("pyarrow")
+    out_dir = str(tmp_path / "recording")
+    # 2 episodes of 25 rows: three full chunks and a partial one
+    recorder = TrajectoryRecorder(make_env(comfort_reward, run_days=1), out_dir, chunk_size=16,
+                                  file_format=file_format, max_pending=1)
+    rows = []
+    for episode, action in enumerate(ACTIONS):
+        obs, info = recorder.reset()
+        rows.append((obs, None, np.nan, False, episode, dict(info)))
+        terminated = truncated = False
+        while not (terminated or truncated):
+            obs, reward, terminated, truncated, info = recorder.step(action)
+            rows.append((obs, action, reward, terminated, episode, dict(info)))
+    recorder.close()
+
+    schema, columns = load_recording(out_dir)
+    assert schema["obs"] == list(recorder.schema.names)
+    # numeric info entries of the first step, the reward terms among them
+    assert schema["info"] == ["time_elapsed(hour)", "comfort"]
+    assert schema["obs_groups"] == {group: [group_slice.start, group_slice.stop]
+                                    for group, group_slice in recorder.schema.slices.items()}
+    assert recorder.stats["chunks_written"] == 4
+    assert len(columns["reward"]) == len(rows) == 50
+
+    np.testing.assert_allclose(columns["obs"], [row[0] for row in rows], rtol=1e-6)
+    # NaN action and reward on reset rows
+    resets = np.array([row[1] is None for row in rows])
+    assert np.isnan(columns["action"][resets]).all()
+    np.testing.assert_allclose(columns["action"][~resets], [row[1] for row in rows if row[1] is not None])
+    np.testing.assert_allclose(columns["reward"], [row[2] for row in rows])
+    np.testing.assert_array_equal(columns["terminated"], [row[3] for row in rows])
+    np.testing.assert_array_equal(columns["episode"], [row[4] for row in rows])
+    np.testing.assert_array_equal(columns["timestep"], [row[5]["timestep"] for row in rows])
+    np.testing.assert_array_equal(columns["sim_time"], [row[5]["clock"].sim_time for row in rows])
+    np.testing.assert_array_equal(columns["clock"],
+                                  [[getattr(row[5]["clock"], field) for field in CLOCK_COLUMNS] for row in rows])
+    np.testing.assert_allclose(columns["info"], [[row[5].get(key, np.nan) for key in schema["info"]] for row in rows])
+
+
+def test_held_reset_rows_keep_their_episode(make_env, tmp_path):
+    out_dir = str(tmp_path / "recording")
+    recorder = TrajectoryRecorder(make_env(comfort_reward, run_days=1), out_dir, chunk_size=16, file_format="npz")
+    # both reset rows are held until the first step fixes the info columns
+    recorder.reset()
+    n_steps = run_episode(recorder, ACTIONS[0])
+    recorder.close()
+
+    _, columns = load_recording(out_dir)
+    np.testing.assert_array_equal(columns["episode"], [0] + [1] * (n_steps + 1))
+    resets = np.isnan(columns["action"]).all(axis=1)
+    np.testing.assert_array_equal(np.flatnonzero(resets), [0, 1])
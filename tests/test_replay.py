@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from gym_energyplus.env.replay_env import ReplayEplusEnv
+from gym_energyplus.wrappers.recorder import load_recording
+
+from conftest import RECORDED_ACTIONS
+
+
+def test_open_loop_replays_episodes_as_recorded(recording):
+    _, columns = load_recording(recording)
+    env = ReplayEplusEnv(recording)
+    assert len(env.episodes) == len(RECORDED_ACTIONS)
+    for e, (start, stop) in enumerate(env.episodes):
+        obs, info = env.reset()
+        assert env.current == e
+        np.testing.assert_array_equal(obs, columns["obs"][start])
+        rows = []
+        terminated = False
+        while not terminated:
+            # the action is ignored
+            obs, reward, terminated, truncated, info = env.step([0.0, 0.0])
+            rows.append(obs)
+        np.testing.assert_array_equal(np.stack(rows), columns["obs"][start + 1:stop])
+
+
+def test_match_follows_the_closest_recorded_action(recording):
+    _, columns = load_recording(recording)
+    env = ReplayEplusEnv(recording, mode="match")
+    env.reset(options={"episode": 0})
+    for t, target in enumerate([1, 2, 2, 0], start=1):
+        action = np.asarray(RECORDED_ACTIONS[target]) + 0.1
+        obs, reward, terminated, truncated, info = env.step(action)
+        assert env.current == target
+        row = env.episodes[target, 0] + t
+        np.testing.assert_array_equal(columns["action"][row], RECORDED_ACTIONS[target])
+        np.testing.assert_array_equal(obs, columns["obs"][row])
+        assert reward == columns["reward"][row]
+
+
+def test_match_rejects_non_finite_actions(recording):
+    env = ReplayEplusEnv(recording, mode="match")
+    env.reset()
+    with pytest.raises(ValueError):
+        env.step([np.nan, 24.0])
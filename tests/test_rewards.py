@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from gym_energyplus.simulators.clock import ClockSnapshot
+from gym_energyplus.simulators.read_plan import ObservationView
+from gym_energyplus.util.rewards import ExpReward, HourlyLinearReward, LinearReward, NormalizedLinearReward
+
+NAMES = ["VAR_0", "VAR_1", "METER_0", "month", "day_of_month", "hour"]
+REWARD_ARGS = (["VAR_0", "VAR_1"], ["METER_0"], (20.0, 23.5), (23.0, 26.0))
+
+
+def trajectory(n: int = 200, seed: int = 0) -> np.ndarray:
+    """
+    Hourly observations across the summer boundaries, temperatures in and out of comfort.
+    """
+    rng = np.random.default_rng(seed)
+    obs = np.zeros((n, len(NAMES)))
+    obs[:, 0:2] = rng.uniform(15.0, 30.0, (n, 2))
+    obs[:, 2] = rng.uniform(0.0, 5000.0, n)
+    # 5/31 .. 6/2 and 9/29 .. 10/1, hour by hour
+    days = np.array([(5, 31), (6, 1), (6, 2), (9, 29), (9, 30), (10, 1)])
+    obs[:, 3:5] = days[(np.arange(n) // 24) % len(days)]
+    obs[:, 5] = np.arange(n) % 24
+    return obs
+
+
+@pytest.mark.parametrize("make_reward", [
+    lambda: LinearReward(*REWARD_ARGS),
+    lambda: ExpReward(*REWARD_ARGS),
+    lambda: HourlyLinearReward(*REWARD_ARGS),
+    lambda: NormalizedLinearReward(*REWARD_ARGS),
+    # running maxima updated along the trajectory
+    lambda: NormalizedLinearReward(*REWARD_ARGS, max_energy_penalty=-4000.0),
+])
+def test_batch_matches_per_step_calls(make_reward):
+    obs = trajectory()
+    rewards, terms = make_reward().batch(obs, NAMES)
+
+    reward = make_reward()
+    for t, row in enumerate(obs):
+        expected, expected_terms = reward(dict(zip(NAMES, row)))
+        assert rewards[t] == pytest.approx(expected)
+        for key, value in expected_terms.items():
+            assert np.broadcast_to(terms[key], len(obs))[t] == pytest.approx(value), key
+
+
+def test_batch_calendar_arrays_match_the_clock():
+    obs = trajectory()
+    month, day, hour = (obs[:, i].astype(int) for i in (3, 4, 5))
+    names = NAMES[:3]
+    reward = HourlyLinearReward(*REWARD_ARGS)
+    rewards, _ = reward.batch(obs[:, :3], names, month=month, day=day, hour=hour)
+
+    index = {name: i for i, name in enumerate(names)}
+    for t in range(len(obs)):
+        clock = ClockSnapshot(month=month[t], day=day[t], hour=hour[t])
+        expected, _ = reward(ObservationView(index, obs[t, :3], clock))
+        assert rewards[t] == pytest.approx(expected)
+
+
+def test_batch_requires_a_calendar():
+    with pytest.raises(ValueError):
+        LinearReward(*REWARD_ARGS).batch(trajectory()[:, :3], NAMES[:3])
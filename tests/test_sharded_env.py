@@ -0,0 +1,64 @@
+import json
+
+import numpy as np
+import pytest
+
+from gym_energyplus.env.sharded_env import ShardError, ShardedEvaluation
+from gym_energyplus.simulators.fake_api import FakeEnergyPlusAPI
+
+from conftest import zero_reward
+
+RUN_PERIOD = """
+RunPeriod,
+    RUN PERIOD 1,            !- Name
+    1,                       !- Begin Month
+    1,                       !- Begin Day of Month
+    ,                        !- Begin Year
+    1,                       !- End Month
+    4,                       !- End Day of Month
+    ,                        !- End Year
+    Sunday;                  !- Day of Week for Start Day
+"""
+
+
+class ConstantPolicy:
+
+    def __call__(self, obs):
+        return [21.0, 24.0]
+
+
+class FailingPolicy:
+
+    def __call__(self, obs):
+        raise ValueError("policy failed")
+
+
+@pytest.fixture
+def sharded_config(config_path):
+    with open(config_path, encoding="utf-8") as stream:
+        conf = json.load(stream)
+    with open(conf["path"]["idf_file"], "a", encoding="utf-8") as stream:
+        stream.write(RUN_PERIOD)
+    return config_path
+
+
+def evaluation(config):
+    env_kwargs = {"api": FakeEnergyPlusAPI(warmup_days=1, read_run_period=True)}
+    return ShardedEvaluation(config, zero_reward, n_shards=2, env_kwargs=env_kwargs, start_method="fork")
+
+
+def test_evaluations_sharing_a_configuration(sharded_config):
+    first = evaluation(sharded_config).run(ConstantPolicy())
+    # a second instance writes its outputs next to the first one's
+    second = evaluation(sharded_config).run(ConstantPolicy())
+    # 4 days of hourly rows, the first row of each segment included
+    assert len(first["reward"]) == len(second["reward"]) == 4 * 24
+    np.testing.assert_array_equal(first["sim_time"], second["sim_time"])
+    np.testing.assert_array_equal(first["shard"][[0, -1]], [0, 1])
+
+
+def test_failing_segments_are_reported_with_their_index(sharded_config):
+    with pytest.raises(ShardError) as info:
+        evaluation(sharded_config).run(FailingPolicy())
+    assert info.value.shards == [0]
+    assert "segment 0" in str(info.value)
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from gym_energyplus.env.observation_schema import ObservationSchema
+from gym_energyplus.env.surrogate_env import SurrogateVecEnv
+from gym_energyplus.simulators.surrogate import ARXSurrogate
+from gym_energyplus.wrappers.recorder import load_recording
+
+
+def recorded_schema(schema) -> ObservationSchema:
+    groups = {group: schema["obs"][start:stop] for group, (start, stop) in schema["obs_groups"].items()}
+    return ObservationSchema(groups, schema["action"])
+
+
+@pytest.fixture
+def fitted(recording):
+    schema, columns = load_recording(recording)
+    surrogate = ARXSurrogate(recorded_schema(schema), lags=2).fit(columns)
+    return surrogate, columns
+
+
+def test_fit_and_score(fitted):
+    surrogate, columns = fitted
+    assert np.isfinite(surrogate.weights).all()
+    rmse = surrogate.score(columns)
+    assert list(rmse) == list(surrogate.schema.names[surrogate.state_slice])
+    state = columns["obs"][:, surrogate.state_slice]
+    # one-step predictions of the smooth fake signals are far better than their spread
+    assert all(rmse[name] < 0.2 * std for name, std in zip(rmse, state.std(axis=0)))
+    # one initial history per episode, the calendar of the longest one
+    assert surrogate.initial_states.shape == (3, 2, surrogate.schema.size)
+    assert len(surrogate.calendar) == np.bincount(columns["episode"]).max()
+
+
+def test_fit_skips_non_finite_transitions(fitted, recording):
+    surrogate, columns = fitted
+    # the three episodes recorded as one: reset rows (NaN actions) inside the episode
+    merged = dict(columns, episode=np.zeros_like(columns["episode"]))
+    refit = ARXSurrogate(surrogate.schema, lags=2).fit(merged)
+    assert np.isfinite(refit.weights).all()
+    assert all(np.isfinite(value) for value in refit.score(merged).values())
+
+    no_action = dict(columns, action=np.full_like(columns["action"], np.nan))
+    with pytest.raises(ValueError):
+        ARXSurrogate(surrogate.schema).fit(no_action)
+
+
+def test_save_load_round_trip(fitted, tmp_path):
+    surrogate, columns = fitted
+    path = str(tmp_path / "surrogate.npz")
+    surrogate.save(path)
+    loaded = ARXSurrogate.load(path)
+    assert loaded.schema.names == surrogate.schema.names
+    assert loaded.schema.slices == surrogate.schema.slices
+
+    rng = np.random.default_rng(0)
+    history = rng.normal(20.0, 2.0, (5, 2, surrogate.n_state))
+    action = rng.uniform(18.0, 30.0, (5, surrogate.schema.action_size))
+    calendar = np.array([[1, 1, h] for h in range(5)])
+    np.testing.assert_array_equal(loaded.predict(history, action, calendar),
+                                  surrogate.predict(history, action, calendar))
+
+
+def test_vec_env_auto_reset(fitted):
+    surrogate, _ = fitted
+    env = SurrogateVecEnv(surrogate, n_envs=4, episode_length=3, seed=0)
+    obs, infos = env.reset()
+    assert obs.shape == (4, surrogate.schema.size)
+    initial = {tuple(row) for row in surrogate.initial_states[:, 0].astype(np.float32)}
+    assert {tuple(row) for row in obs} <= initial
+
+    actions = np.tile([21.0, 24.0], (4, 1))
+    for step in range(1, 4):
+        next_obs, rewards, terminated, truncated, infos = env.step(actions)
+        np.testing.assert_array_equal(rewards, 0.0)
+        assert not terminated.any()
+        if step < 3:
+            assert not truncated.any() and "final_observation" not in infos
+            np.testing.assert_allclose(next_obs[:, env._action_slice], actions)
+            obs = next_obs
+    assert truncated.all()
+    np.testing.assert_array_equal(infos["final_index"], np.arange(4))
+    assert infos["final_observation"].shape == (4, surrogate.schema.size)
+    np.testing.assert_allclose(infos["final_observation"][:, env._action_slice], actions)
+    # the returned observations start the next episodes
+    assert {tuple(row) for row in next_obs} <= initial
+    next_obs, *_ = env.step(actions)
+    assert env._timestep.tolist() == [1] * 4
+
+
+def test_vec_env_checks_the_schema(fitted):
+    surrogate, _ = fitted
+    schema = surrogate.schema
+    groups = {group: list(schema.names[group_slice]) for group, group_slice in schema.slices.items()}
+    assert SurrogateVecEnv(surrogate, n_envs=2, schema=ObservationSchema(groups, schema.action_names))
+    with pytest.raises(ValueError):
+        SurrogateVecEnv(surrogate, n_envs=2, schema=ObservationSchema(groups, schema.action_names[::-1]))
+    groups["meters"] = groups["meters"] + ["METER_X"]
+    with pytest.raises(ValueError):
+        SurrogateVecEnv(surrogate, n_envs=2, schema=ObservationSchema(groups, schema.action_names))
+    with pytest.raises(ValueError):
+        SurrogateVecEnv(ARXSurrogate(schema), n_envs=2)
@@ -0,0 +1,58 @@
+from gym_energyplus.generator.training_idf import output_files_fields, training_idf
+from gym_energyplus.util.idf_parser import IDFIndex
+
+IDD_23 = """!IDD_Version 23.1.0
+Output:SQLite,
+  A1 ; \\field Option Type
+OutputControl:Files,
+       \\memo Conditionally turn on/off output from EnergyPlus.
+       \\unique-object
+  A1 , \\field Output CSV
+       \\type choice
+  A2 , \\field Output MTR
+  A3 ; \\field Output Space Sizing
+OutputControl:Timestamp,
+  A1 ; \\field ISO 8601 Format
+"""
+IDD_9_2 = """!IDD_Version 9.2.0
+Output:SQLite,
+  A1 ; \\field Option Type
+"""
+IDF = """Version,23.1;
+Output:Variable,*,Site Outdoor Air Drybulb Temperature,Hourly;
+Output:SQLite,SimpleAndTabular;
+OutputControl:Files,Yes,Yes,Yes;
+Timestep,4;
+"""
+VARIABLES = {"OAT": {"variable_name": "Site Outdoor Air Drybulb Temperature", "variable_key": "Environment"}}
+
+
+def write(path, content):
+    path.write_text(content, encoding="ISO-8859-1")
+    return str(path)
+
+
+def test_output_files_fields_follow_the_idd(tmp_path):
+    assert output_files_fields(write(tmp_path / "23.idd", IDD_23)) == (
+        "Output CSV", "Output MTR", "Output Space Sizing")
+    assert output_files_fields(write(tmp_path / "9.idd", IDD_9_2)) is None
+    assert output_files_fields(str(tmp_path / "missing.idd")) is None
+
+
+def test_training_variant_turns_off_the_files_of_the_idd(tmp_path):
+    idf = write(tmp_path / "model.idf", IDF)
+    variant = training_idf(idf, VARIABLES, str(tmp_path / "cache"), write(tmp_path / "23.idd", IDD_23))
+    index = IDFIndex(variant)
+    assert [obj.fields for obj in index.objects("OutputControl:Files")] == [["No", "No", "No"]]
+    assert index.count("Output:SQLite") == 0
+    assert [obj.fields for obj in index.objects("Output:Variable")] == [
+        ["Environment", "Site Outdoor Air Drybulb Temperature", "Timestep"]]
+    assert index.count("Timestep") == 1
+
+
+def test_training_variant_without_output_control_files(tmp_path):
+    idf = write(tmp_path / "model.idf", IDF)
+    variant = training_idf(idf, VARIABLES, str(tmp_path / "cache"), write(tmp_path / "9.idd", IDD_9_2))
+    index = IDFIndex(variant)
+    assert index.count("OutputControl:Files") == 0
+    assert index.count("Output:Variable") == 1
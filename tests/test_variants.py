@@ -0,0 +1,31 @@
+import os
+
+from gym_energyplus.generator.variants import generate_variants, variant_key
+from gym_energyplus.util.idf_parser import IDFIndex
+
+IDF = """Version,23.1;
+Schedule:Constant,HTGSETP_SCH,Temperature,20;   ! heating
+Schedule:Constant,CLGSETP_SCH,Temperature,26;
+Timestep,4;
+"""
+
+
+def values(variant):
+    return {obj.name: obj.fields[2] for obj in IDFIndex(variant).objects("Schedule:Constant")}
+
+
+def test_later_overrides_win_and_are_keyed_by_order(tmp_path):
+    idf = tmp_path / "model.idf"
+    idf.write_text(IDF, encoding="ISO-8859-1")
+    class_first = {"Schedule:Constant": {2: 18}, "Schedule:Constant/CLGSETP_SCH": {2: 24}}
+    object_first = {"Schedule:Constant/CLGSETP_SCH": {2: 24}, "Schedule:Constant": {2: 18}}
+    assert variant_key(str(idf), class_first) != variant_key(str(idf), object_first)
+
+    first, second, again = generate_variants(str(idf), [class_first, object_first, class_first],
+                                             str(tmp_path / "variants"), max_workers=1)
+    assert values(first) == {"HTGSETP_SCH": "18", "CLGSETP_SCH": "24"}
+    assert values(second) == {"HTGSETP_SCH": "18", "CLGSETP_SCH": "18"}
+    assert again == first
+    assert len(os.listdir(tmp_path / "variants")) == 2
+    # untouched objects are copied as is
+    assert IDFIndex(first).timestep() == 4
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from conftest import run_episode, zero_reward
+from gym_energyplus.env.vec_env import VecEplusEnv, WorkerError
+from gym_energyplus.simulators.fake_api import FakeEnergyPlusAPI
+
+ACTION = [21.0, 24.0]
+
+
+def failing_reward(obs):
+    raise RuntimeError("reward failed")
+
+
+def make_vec_env(config_path, reward_func=zero_reward, n_envs=2):
+    # forked workers inherit the fake api without pickling it
+    env_kwargs = {"api": FakeEnergyPlusAPI(run_days=1, warmup_days=1)}
+    return VecEplusEnv(config_path, reward_func, n_envs=n_envs, env_kwargs=env_kwargs, start_method="fork")
+
+
+def test_auto_reset_keeps_the_final_observation(config_path, make_env):
+    # reference episode in process, same model and action
+    env = make_env(run_days=1)
+    n_steps = run_episode(env, ACTION)
+    env.reset()
+    for _ in range(n_steps):
+        last_obs, _, _, _, last_info = env.step(ACTION)
+    first_obs, first_info = env.reset()
+
+    vec_env = make_vec_env(config_path)
+    try:
+        obs, infos = vec_env.reset()
+        assert obs.shape == (2, vec_env.observation_size)
+        actions = np.tile(ACTION, (2, 1))
+        for step in range(n_steps):
+            obs, rewards, terminated, truncated, infos = vec_env.step(actions)
+            done = terminated | truncated
+            if step < n_steps - 1:
+                assert not done.any()
+                assert all("final_observation" not in info for info in infos)
+        assert done.all()
+        for index, info in enumerate(infos):
+            np.testing.assert_allclose(info["final_observation"], last_obs, rtol=1e-6)
+            assert info["final_info"]["clock"].as_dict() == last_info["clock"].as_dict()
+            # the returned observation starts the next episode
+            np.testing.assert_allclose(obs[index], first_obs, rtol=1e-6)
+            assert info["clock"].sim_time == first_info["clock"].sim_time
+    finally:
+        vec_env.close()
+
+
+def test_worker_error_carries_the_worker_index(config_path):
+    vec_env = make_vec_env(config_path, failing_reward)
+    try:
+        vec_env.reset()
+        with pytest.raises(WorkerError) as excinfo:
+            vec_env.step(np.tile(ACTION, (2, 1)))
+        assert excinfo.value.index in (0, 1)
+        assert "reward failed" in excinfo.value.details
+        assert vec_env.failed
+        # the pipes of failed workers are not used again
+        with pytest.raises(RuntimeError, match="failed, close the environment"):
+            vec_env.step(np.tile(ACTION, (2, 1)))
+    finally:
+        vec_env.close()
@@ -0,0 +1,94 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from gym_energyplus.util.constant import DATA_WEATHER_PATH
+from gym_energyplus.util.weather import HEADER_LINES, NUMERIC_FIELDS, EPWWeather, parse_epw
+
+WEATHER_FILE = os.path.join(DATA_WEATHER_PATH, "USA_NY_New.York-John.F.Kennedy.Intl.AP.744860_TMY3.epw")
+
+
+@pytest.fixture
+def epw_file(tmp_path) -> str:
+    path = str(tmp_path / "weather.epw")
+    shutil.copy(WEATHER_FILE, path)
+    return path
+
+
+def rewrite_records(path: str, edit) -> None:
+    with open(path, "r", encoding="ISO-8859-1") as stream:
+        lines = stream.read().splitlines()
+    with open(path, "w", encoding="ISO-8859-1") as stream:
+        stream.write("\n".join(lines[:HEADER_LINES] + edit(lines[HEADER_LINES:])) + "\n")
+
+
+def test_parse_epw():
+    parsed = parse_epw(WEATHER_FILE)
+    assert parsed["data"].shape == (8760, len(NUMERIC_FIELDS)) == (8760, 34)
+    assert parsed["records_per_hour"] == 1
+    assert parsed["location"]["wmo"] == "744860"
+    assert parsed["location"]["latitude"] == pytest.approx(40.65)
+    assert set(parsed["header"]) >= {"LOCATION", "DATA PERIODS"}
+    month, day, hour = (parsed["data"][:, NUMERIC_FIELDS.index(field)] for field in ("month", "day", "hour"))
+    assert (month[0], day[0], hour[0]) == (1, 1, 1)
+    assert (month[-1], day[-1], hour[-1]) == (12, 31, 24)
+
+
+def test_cache_hit_is_memory_mapped(epw_file, tmp_path):
+    cache_dir = str(tmp_path / "weather_cache")
+    parsed = EPWWeather(epw_file, cache_dir)
+    assert isinstance(parsed.data, np.ndarray) and parsed.data.flags.writeable
+    cached = EPWWeather(epw_file, cache_dir)
+    assert isinstance(cached.data.base, np.memmap)
+    assert not cached.data.flags.writeable
+    np.testing.assert_array_equal(cached.data, parse_epw(epw_file)["data"])
+    assert cached.location == parsed.location
+    assert cached.records_per_hour == parsed.records_per_hour
+
+
+def test_edited_file_misses_the_cache(epw_file, tmp_path):
+    cache_dir = str(tmp_path / "weather_cache")
+    before = EPWWeather(epw_file, cache_dir)["dry_bulb_temperature"][0]
+
+    def warmer_first_hour(records):
+        fields = records[0].split(",")
+        fields[6] = str(float(fields[6]) + 10.0)
+        return [",".join(fields)] + records[1:]
+
+    rewrite_records(epw_file, warmer_first_hour)
+    after = EPWWeather(epw_file, cache_dir)
+    assert after["dry_bulb_temperature"][0] == pytest.approx(before + 10.0)
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_hour_of_year():
+    weather = EPWWeather(WEATHER_FILE, cache_dir=None)
+    assert weather.n_hours == 8760
+    assert weather.hour_of_year(1, 1, 0) == 0
+    assert weather.hour_of_year(12, 31, 23) == 8759
+    assert weather.hour_of_year(3, 1, 0) == 59 * 24
+    hours = weather.hour_of_year(np.array([1, 2, 12]), np.array([1, 1, 31]), np.array([0, 5, 23]))
+    np.testing.assert_array_equal(hours, [0, 31 * 24 + 5, 8759])
+    # the record of the clock hour h is the one of the EPW hour h + 1
+    assert tuple(weather.at(7, 4, 13, ["month", "day", "hour"])) == (7, 4, 14)
+
+
+def test_hour_of_year_of_a_leap_year(epw_file):
+    # a day more, as a leap year file
+    rewrite_records(epw_file, lambda records: records + records[-24:])
+    weather = EPWWeather(epw_file, cache_dir=None)
+    assert weather.n_hours == 8784
+    assert weather.hour_of_year(2, 28, 0) == 58 * 24
+    assert weather.hour_of_year(3, 1, 0) == 60 * 24
+    assert weather.hour_of_year(12, 31, 23) == 8783
+    np.testing.assert_array_equal(weather.hour_of_year(np.array([1, 3]), np.array([1, 1]), np.array([0, 0])),
+                                  [0, 60 * 24])
+
+
+def test_hourly_wraps_around_the_year():
+    weather = EPWWeather(WEATHER_FILE, cache_dir=None)
+    np.testing.assert_array_equal(weather.hourly(8760), weather.data[0])
+    rows = weather.hourly(np.array([8758, 8759, 8760, 8761]), ["dry_bulb_temperature"])
+    np.testing.assert_array_equal(rows[:, 0], weather["dry_bulb_temperature"][[8758, 8759, 0, 1]])